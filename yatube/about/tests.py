@@ -1,5 +1,7 @@
 from django.test import TestCase, Client
 
+from core.testing import max_queries
+
 
 class StaticURLTests(TestCase):
     def setUp(self):
@@ -28,3 +30,10 @@ class StaticURLTests(TestCase):
             with self.subTest(address=address):
                 response = self.guest_client.get(address)
                 self.assertTemplateUsed(response, template)
+
+    @max_queries(0)
+    def test_pages_do_not_query_database(self):
+        """Статические страницы не обращаются к базе."""
+        for address in ('/about/author/', '/about/tech/'):
+            with self.subTest(address=address):
+                self.guest_client.get(address)
@@ -0,0 +1,75 @@
+"""Замеры производительности yatube.
+
+Каждый модуль запускается из каталога с manage.py, например:
+    python -m benchmarks.conditional_get
+
+Замеры работают на отдельной тестовой базе, которая создаётся
+перед запуском и удаляется после него.
+"""
+import contextlib
+import json
+import os
+import statistics
+import time
+
+
+def setup():
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
+    import django
+    django.setup()
+
+
+@contextlib.contextmanager
+def benchmark_database(keepdb=False):
+    """Создаёт тестовую базу на время замера."""
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+
+    setup_test_environment()
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, keepdb=keepdb)
+    try:
+        yield connection
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0,
+                                            keepdb=keepdb)
+
+
+class Timer:
+    """Копит длительности и отдаёт перцентили в миллисекундах."""
+
+    def __init__(self):
+        self.samples = []
+
+    @contextlib.contextmanager
+    def __call__(self):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.samples.append(time.perf_counter() - start)
+
+    def summary(self):
+        if not self.samples:
+            return {'count': 0}
+        samples = sorted(self.samples)
+
+        def percentile(p):
+            return round(
+                samples[min(len(samples) - 1, int(len(samples) * p))]
+                * 1000, 3
+            )
+        return {
+            'count': len(samples),
+            'mean_ms': round(statistics.mean(samples) * 1000, 3),
+            'p50_ms': percentile(0.5),
+            'p95_ms': percentile(0.95),
+            'p99_ms': percentile(0.99),
+        }
+
+
+def report(name, results, stream=None):
+    """Печатает результат замера одной строкой JSON."""
+    line = json.dumps({'benchmark': name, **results}, ensure_ascii=False)
+    print(line, file=stream)
+    return line
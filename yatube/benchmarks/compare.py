@@ -0,0 +1,44 @@
+"""Сравнивает два результата benchmarks.views.
+
+Для каждой пары «страница, глубина» печатает p50 и p95 обоих
+запусков, их отношение и изменение числа запросов:
+    python -m benchmarks.compare before.json after.json
+"""
+import argparse
+import json
+
+
+def load(path):
+    with open(path, encoding='utf-8') as source:
+        data = json.load(source)
+    return {(row['view'], row['depth']): row for row in data['results']}
+
+
+def ratio(before, after):
+    if not before:
+        return '-'
+    return f'{after / before:.2f}x'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('before')
+    parser.add_argument('after')
+    options = parser.parse_args()
+    before, after = load(options.before), load(options.after)
+    print(f'{"страница":<24}{"глубина":>8}{"p50":>20}{"p95":>20}'
+          f'{"запросы":>10}')
+    for key in [key for key in before if key in after]:
+        old, new = before[key], after[key]
+        p50 = f'{old["p50_ms"]}→{new["p50_ms"]}'
+        p95 = f'{old["p95_ms"]}→{new["p95_ms"]}'
+        print(
+            f'{key[0]:<24}{key[1]:>8}'
+            f'{p50:>14} {ratio(old["p50_ms"], new["p50_ms"]):>5}'
+            f'{p95:>14} {ratio(old["p95_ms"], new["p95_ms"]):>5}'
+            f'{old["queries"]:>5}→{new["queries"]:<4}'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+"""Сколько запросов к лентам и постам обрывается ответом 304.
+
+Читатели ходят по случайным страницам и помнят ETag каждой, а
+писатель время от времени публикует пост. Замер печатает долю
+ответов 304, их время и число SQL-запросов в сравнении с полными
+ответами.
+
+    python -m benchmarks.conditional_get --requests 2000 --write-rate 0.02
+"""
+import argparse
+import random
+
+from . import Timer, benchmark_database, report, setup
+
+
+def seed(posts, groups, authors):
+    from posts.models import Group, Post, User
+
+    User.objects.bulk_create(
+        [User(username=f'author{i}') for i in range(authors)]
+    )
+    users = list(User.objects.all())
+    Group.objects.bulk_create(
+        [Group(title=f'Группа {i}', slug=f'group-{i}', description='')
+         for i in range(groups)]
+    )
+    groups = list(Group.objects.all())
+    Post.objects.bulk_create(
+        [Post(text=f'Пост номер {i}', author=random.choice(users),
+              group=random.choice(groups))
+         for i in range(posts)],
+        batch_size=500
+    )
+    return users, groups
+
+
+def run(options):
+    from django.db import connection
+    from django.test import Client
+    from django.test.utils import CaptureQueriesContext, override_settings
+    from django.urls import reverse
+
+    from posts.models import Post
+
+    random.seed(options.seed)
+    users, groups = seed(options.posts, options.groups, options.authors)
+    post_ids = list(Post.objects.values_list('pk', flat=True))
+    urls = (
+        [reverse('posts:index')]
+        + [reverse('posts:group_list', args=[group.slug])
+           for group in groups]
+        + [reverse('posts:profile', args=[user.username])
+           for user in users]
+        + [reverse('posts:post_detail', args=[pk])
+           for pk in random.sample(post_ids, min(50, len(post_ids)))]
+    )
+    client = Client()
+    etags = {}
+    timers = {200: Timer(), 304: Timer()}
+    queries = {200: 0, 304: 0}
+    writes = 0
+    with override_settings(POSTS_CONDITIONAL_GET=True):
+        for _ in range(options.requests):
+            if random.random() < options.write_rate:
+                Post.objects.create(
+                    text='Новый пост', author=random.choice(users),
+                    group=random.choice(groups)
+                )
+                writes += 1
+            url = random.choice(urls)
+            headers = {}
+            if url in etags:
+                headers['HTTP_IF_NONE_MATCH'] = etags[url]
+            timer = Timer()
+            with CaptureQueriesContext(connection) as context, timer():
+                response = client.get(url, **headers)
+            status = response.status_code
+            timers[status].samples.extend(timer.samples)
+            queries[status] += len(context.captured_queries)
+            etags[url] = response['ETag']
+    total = sum(len(timer.samples) for timer in timers.values())
+    not_modified = len(timers[304].samples)
+    return {
+        'requests': total,
+        'writes': writes,
+        'not_modified': not_modified,
+        'short_circuited_share': round(not_modified / total, 3),
+        'full': timers[200].summary(),
+        'conditional': timers[304].summary(),
+        'queries_per_full': round(
+            queries[200] / max(1, len(timers[200].samples)), 2
+        ),
+        'queries_per_304': round(
+            queries[304] / max(1, len(timers[304].samples)), 2
+        ),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--posts', type=int, default=5000)
+    parser.add_argument('--groups', type=int, default=20)
+    parser.add_argument('--authors', type=int, default=50)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--write-rate', type=float, default=0.02)
+    parser.add_argument('--seed', type=int, default=1)
+    options = parser.parse_args()
+    setup()
+    with benchmark_database():
+        report('conditional_get', run(options))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+"""Синтетические данные размера боевой базы.
+
+Авторы и группы получают посты по закону Ципфа: несколько очень
+активных авторов и больших групп и длинный хвост редких. Часть постов
+без группы, даты публикации идут по возрастанию за последние годы.
+Тексты берутся из заранее сгенерированного Faker набора абзацев,
+а вставка идёт пачками через bulk_create.
+
+Заполнить базу из настроек проекта:
+    python -m benchmarks.dataset --size 100k
+"""
+import argparse
+import itertools
+import random
+import sys
+from datetime import timedelta
+
+from . import setup
+
+SIZES = {'10k': 10_000, '100k': 100_000, '1m': 1_000_000}
+BATCH_SIZE = 5000
+TEXT_POOL = 2000
+NO_GROUP_SHARE = 0.2
+PERIOD = timedelta(days=3 * 365)
+
+
+def zipf_weights(number, exponent=1.1):
+    return [1 / (rank ** exponent) for rank in range(1, number + 1)]
+
+
+def default_authors(posts):
+    return max(10, posts // 50)
+
+
+def default_groups(posts):
+    return max(5, posts // 5000)
+
+
+def generate(posts, authors=None, groups=None, seed=1, stream=None):
+    """Создаёт авторов, группы и посты; возвращает (авторы, группы).
+
+    Производные данные (счётчики, поисковый индекс) пересчитываются
+    один раз в конце, как это делает import_posts.
+    """
+    from django.db import transaction
+    from django.utils import timezone
+    from faker import Faker
+
+    from posts import cards, search, stats
+    from posts.management.commands.import_posts import keep_pub_date
+    from posts.models import Group, Post, User
+
+    random.seed(seed)
+    fake = Faker('ru_RU')
+    fake.seed_instance(seed)
+    authors = authors or default_authors(posts)
+    groups = groups or default_groups(posts)
+
+    User.objects.bulk_create(
+        [User(username=f'bench_{i}_{fake.user_name()}'[:150],
+              first_name=fake.first_name(), last_name=fake.last_name())
+         for i in range(authors)],
+        batch_size=BATCH_SIZE
+    )
+    Group.objects.bulk_create(
+        [Group(title=fake.catch_phrase()[:200], slug=f'bench-group-{i}',
+               description=fake.paragraph())
+         for i in range(groups)]
+    )
+    author_ids = list(User.objects.filter(
+        username__startswith='bench_'
+    ).order_by('pk').values_list('pk', flat=True))
+    group_ids = list(Group.objects.filter(
+        slug__startswith='bench-group-'
+    ).order_by('pk').values_list('pk', flat=True))
+    author_weights = list(itertools.accumulate(zipf_weights(len(author_ids))))
+    group_weights = list(itertools.accumulate(zipf_weights(len(group_ids))))
+    texts = [
+        '\n\n'.join(fake.paragraphs(random.randint(1, 4)))
+        for _ in range(TEXT_POOL)
+    ]
+
+    start = timezone.now() - PERIOD
+    step = PERIOD / posts
+    created = 0
+    while created < posts:
+        batch = []
+        for number in range(created, min(posts, created + BATCH_SIZE)):
+            group_id = None
+            if random.random() >= NO_GROUP_SHARE:
+                group_id = random.choices(
+                    group_ids, cum_weights=group_weights
+                )[0]
+            post = Post(
+                text=random.choice(texts),
+                author_id=random.choices(
+                    author_ids, cum_weights=author_weights
+                )[0],
+                group_id=group_id,
+                pub_date=start + step * number,
+            )
+            post.render_text()
+            batch.append(post)
+        with transaction.atomic(), keep_pub_date():
+            Post.objects.bulk_create(batch)
+        created += len(batch)
+        if stream is not None:
+            print(f'{created}/{posts}', file=stream)
+
+    stats.rebuild()
+    cards.rebuild()
+    if search.available():
+        search.rebuild()
+    return author_ids, group_ids
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--size', choices=SIZES, default='10k')
+    parser.add_argument('--authors', type=int)
+    parser.add_argument('--groups', type=int)
+    parser.add_argument('--seed', type=int, default=1)
+    options = parser.parse_args()
+    setup()
+    generate(SIZES[options.size], options.authors, options.groups,
+             options.seed, stream=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
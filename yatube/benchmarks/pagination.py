@@ -0,0 +1,74 @@
+"""Размер и время рендеринга навигации по страницам.
+
+Тег page_range, который выводит номера страниц в
+includes/paginator.html, рендерится для лент разной длины на первой,
+средней и последней странице. Для сравнения рядом рендерится прежний
+цикл со ссылкой на каждую страницу из paginator.page_range. Базы
+не нужно: пагинатор строится над range() нужной длины.
+
+    python -m benchmarks.pagination --pages 10 1000 200000
+"""
+import argparse
+
+from . import Timer, report, setup
+
+FULL_RANGE_TEMPLATE = '''
+{% for i in page_obj.paginator.page_range %}
+  {% if page_obj.number == i %}
+    <li class="page-item active">
+      <span class="page-link">{{ i }}</span>
+    </li>
+  {% else %}
+    <li class="page-item">
+      <a class="page-link" href="?{{ page_query }}page={{ i }}">{{ i }}</a>
+    </li>
+  {% endif %}
+{% endfor %}
+'''
+
+
+def measure(template, context, repeat):
+    timer = Timer()
+    for _ in range(repeat):
+        with timer():
+            html = template.render(context)
+    return {'bytes': len(html.encode()), **timer.summary()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        '--pages', type=int, nargs='+', default=[10, 1000, 200000]
+    )
+    parser.add_argument('--per-page', type=int, default=10)
+    parser.add_argument('--repeat', type=int, default=20)
+    options = parser.parse_args()
+    setup()
+    from django.core.paginator import Paginator
+    from django.template import Context, Template
+
+    templates = {
+        'full_range': Template(FULL_RANGE_TEMPLATE),
+        'windowed': Template('{% load pagination %}{% page_range page_obj %}'),
+    }
+    for num_pages in options.pages:
+        paginator = Paginator(
+            range(num_pages * options.per_page), options.per_page
+        )
+        for position, number in (
+            ('first', 1), ('middle', num_pages // 2 or 1), ('last', num_pages)
+        ):
+            context = Context({
+                'page_obj': paginator.page(number), 'page_query': ''
+            })
+            for name, template in templates.items():
+                report('pagination', {
+                    'template': name,
+                    'pages': num_pages,
+                    'position': position,
+                    **measure(template, context, options.repeat),
+                })
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+"""Лента популярного: хранимый рейтинг против подсчёта на лету.
+
+На синтетическом наборе постов записываются просмотры, после чего
+замеряются:
+  * полный пересчёт рейтинга (popularity.refresh(full=True));
+  * инкрементальный пересчёт после --changed новых просмотров;
+  * чтение первой и последней страницы /popular/ из PostPopularity;
+  * тот же топ, посчитанный запросом к posts_post на лету — просмотры
+    и свежесть без активности групп, то есть даже дешевле настоящего.
+
+    python -m benchmarks.popular --size 100k
+"""
+import argparse
+import random
+
+from . import Timer, benchmark_database, report, setup
+from .dataset import SIZES, generate
+
+ON_THE_FLY_SQL = '''
+SELECT p.id FROM posts_post p
+LEFT JOIN posts_postviewcount v ON v.post_id = p.id
+ORDER BY LN(1 + COALESCE(v.count, 0))
+    + CAST(strftime('%%s', p.pub_date) AS REAL) / %s DESC, p.id DESC
+LIMIT %s OFFSET %s
+'''
+
+
+def measure(func, repeat):
+    timer = Timer()
+    for _ in range(repeat):
+        with timer():
+            func()
+    return timer.summary()
+
+
+def age():
+    """Сдвигает прошлые изменения и прошлый прогон на час назад.
+
+    Иначе все посты свежего набора попадают в запас OVERLAP
+    и инкрементальный пересчёт становится полным.
+    """
+    from datetime import timedelta
+
+    from django.utils import timezone
+
+    from posts.models import Post, PostPopularity, PostViewCount
+
+    hour_ago = timezone.now() - timedelta(hours=1)
+    Post.objects.update(updated=hour_ago - timedelta(hours=1))
+    PostViewCount.objects.update(updated=hour_ago - timedelta(hours=1))
+    PostPopularity.objects.update(refreshed=hour_ago)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--size', choices=SIZES, default='10k')
+    parser.add_argument('--viewed', type=float, default=0.2)
+    parser.add_argument('--changed', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=1)
+    options = parser.parse_args()
+    setup()
+    from django.conf import settings
+    from django.db import connection
+
+    from posts import popularity, view_counts
+    from posts.models import Post
+
+    random.seed(options.seed)
+    with benchmark_database():
+        generate(SIZES[options.size])
+        ids = list(Post.objects.values_list('pk', flat=True))
+        viewed = random.sample(ids, int(len(ids) * options.viewed))
+        for start in range(0, len(viewed), 500):
+            view_counts.write({
+                pk: random.randint(1, 1000)
+                for pk in viewed[start:start + 500]
+            })
+        timer = Timer()
+        with timer():
+            refreshed = popularity.refresh(full=True)
+        report('popular', {
+            'case': 'full_refresh', 'posts': refreshed, **timer.summary()
+        })
+
+        timer = Timer()
+        for _ in range(options.repeat):
+            age()
+            view_counts.write({
+                pk: 1 for pk in random.sample(ids, options.changed)
+            })
+            with timer():
+                refreshed = popularity.refresh()
+        report('popular', {
+            'case': 'incremental_refresh', 'posts': refreshed,
+            **timer.summary(),
+        })
+        per_page = settings.POST_COUNT
+        last = settings.POSTS_POPULAR_LIMIT - per_page
+        for page, offset in (('first', 0), ('last', last)):
+            report('popular', {
+                'case': 'stored', 'page': page,
+                **measure(lambda: list(
+                    popularity.top()[offset:offset + per_page]
+                ), options.repeat),
+            })
+
+            def on_the_fly():
+                with connection.cursor() as cursor:
+                    cursor.execute(ON_THE_FLY_SQL, [
+                        settings.POSTS_POPULAR_RECENCY, per_page, offset
+                    ])
+                    cursor.fetchall()
+
+            report('popular', {
+                'case': 'on_the_fly', 'page': page,
+                **measure(on_the_fly, options.repeat),
+            })
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+"""Смешанная нагрузка чтения и записи на файловую базу SQLite.
+
+Несколько потоков одновременно открывают ленты и посты, а часть
+запросов публикует новый пост через post_create. Замер идёт дважды
+на одной и той же базе: с настройками SQLite по умолчанию
+(журнал отката, соединение на каждый запрос) и с боевым профилем
+SQLITE_PRODUCTION_PRAGMAS и CONN_MAX_AGE. Печатается пропускная
+способность, перцентили чтения и записи и число ошибок
+«database is locked».
+
+    python -m benchmarks.sqlite_concurrency --threads 8 --seconds 10
+"""
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+
+from . import Timer, report, setup
+
+BASELINE_PRAGMAS = {'journal_mode': 'DELETE'}
+
+
+def prepare(path, posts):
+    from django.core.management import call_command
+    from django.db import connections
+
+    from .dataset import generate
+
+    connections.databases['default']['NAME'] = path
+    connections.close_all()
+    call_command('migrate', verbosity=0)
+    author_ids, group_ids = generate(posts)
+    connections.close_all()
+    return author_ids
+
+
+def worker(options, urls, author_id, stop, results):
+    from django.db import OperationalError, close_old_connections
+    from django.test import Client
+    from django.urls import reverse
+
+    from posts.models import User
+
+    client = Client()
+    client.force_login(User.objects.get(pk=author_id))
+    close_old_connections()
+    reads, writes, errors = Timer(), Timer(), 0
+    while not stop.is_set():
+        try:
+            if random.random() < options.write_rate:
+                with writes():
+                    client.post(
+                        reverse('posts:post_create'), {'text': 'Новый пост'}
+                    )
+            else:
+                with reads():
+                    client.get(random.choice(urls))
+        except OperationalError:
+            errors += 1
+        # Тестовый клиент не шлёт request_finished, закрываем сами:
+        # с CONN_MAX_AGE=0 соединение живёт один запрос.
+        close_old_connections()
+    results.append((reads, writes, errors))
+
+
+def run_profile(options, urls, author_ids, pragmas, conn_max_age):
+    from django.db import connections
+    from django.test.utils import override_settings
+
+    connections.databases['default']['CONN_MAX_AGE'] = conn_max_age
+    connections.close_all()
+    results = []
+    stop = threading.Event()
+    with override_settings(SQLITE_PRAGMAS=pragmas):
+        threads = [
+            threading.Thread(
+                target=worker,
+                args=(options, urls, random.choice(author_ids), stop,
+                      results)
+            )
+            for _ in range(options.threads)
+        ]
+        for thread in threads:
+            thread.start()
+        time.sleep(options.seconds)
+        stop.set()
+        for thread in threads:
+            thread.join()
+    connections.close_all()
+    reads, writes = Timer(), Timer()
+    for thread_reads, thread_writes, _ in results:
+        reads.samples += thread_reads.samples
+        writes.samples += thread_writes.samples
+    total = len(reads.samples) + len(writes.samples)
+    return {
+        'requests_per_second': round(total / options.seconds, 1),
+        'locked_errors': sum(errors for _, _, errors in results),
+        'reads': reads.summary(),
+        'writes': writes.summary(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--posts', type=int, default=10000)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--write-rate', type=float, default=0.1)
+    parser.add_argument('--seed', type=int, default=1)
+    options = parser.parse_args()
+    setup()
+    from django.conf import settings
+    from django.test.utils import setup_test_environment
+    from django.urls import reverse
+
+    setup_test_environment()
+    random.seed(options.seed)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'benchmark.sqlite3')
+        author_ids = prepare(path, options.posts)
+        urls = [reverse('posts:index')] + [
+            reverse('posts:index') + f'?page={page}' for page in range(2, 20)
+        ]
+        for name, pragmas, conn_max_age in (
+            ('default', BASELINE_PRAGMAS, 0),
+            ('production', settings.SQLITE_PRODUCTION_PRAGMAS, 600),
+        ):
+            report('sqlite_concurrency', {
+                'profile': name,
+                'threads': options.threads,
+                'write_rate': options.write_rate,
+                **run_profile(
+                    options, urls, author_ids, pragmas, conn_max_age
+                ),
+            })
+
+
+if __name__ == '__main__':
+    main()
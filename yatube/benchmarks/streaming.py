@@ -0,0 +1,107 @@
+"""Время до первого байта и пик памяти лент с потоковой отдачей.
+
+Ленты index, group_list и profile открываются с крупной страницей
+(--per-page) в обычном режиме и с POSTS_STREAMING_FEEDS. Для
+каждого режима печатаются перцентили времени до первого куска ответа
+и до последнего, а также пик памяти Python на запрос по tracemalloc:
+RSS процесса только растёт и не показывает пик одного запроса.
+Кэш карточек сбрасывается перед каждым запросом, чтобы страница
+рендерилась целиком.
+
+    python -m benchmarks.streaming --size 10k --per-page 200
+"""
+import argparse
+import random
+import time
+import tracemalloc
+
+from . import Timer, benchmark_database, report, setup
+from .dataset import SIZES, generate
+
+
+def fetch(client, url):
+    """Возвращает (время до первого байта, полное время) в секундах."""
+    started = time.perf_counter()
+    response = client.get(url)
+    if not response.streaming:
+        elapsed = time.perf_counter() - started
+        return elapsed, elapsed
+    chunks = iter(response.streaming_content)
+    next(chunks, b'')
+    first_byte = time.perf_counter() - started
+    for _ in chunks:
+        pass
+    return first_byte, time.perf_counter() - started
+
+
+def peak_memory(client, url):
+    tracemalloc.start()
+    try:
+        response = client.get(url)
+        if response.streaming:
+            for _ in response.streaming_content:
+                pass
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run(options, urls, streaming):
+    from django.core.cache import cache
+    from django.test import Client
+    from django.test.utils import override_settings
+
+    client = Client()
+    first_byte, total = Timer(), Timer()
+    peaks = []
+    with override_settings(
+        POSTS_STREAMING_FEEDS=streaming, POST_COUNT=options.per_page
+    ):
+        for _ in range(options.requests):
+            url = random.choice(urls)
+            cache.clear()
+            ttfb, elapsed = fetch(client, url)
+            first_byte.samples.append(ttfb)
+            total.samples.append(elapsed)
+        for url in urls:
+            cache.clear()
+            peaks.append(peak_memory(client, url))
+    return {
+        'mode': 'streaming' if streaming else 'buffered',
+        'per_page': options.per_page,
+        'first_byte': first_byte.summary(),
+        'total': total.summary(),
+        'peak_memory_kib': round(max(peaks) / 1024, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--size', choices=SIZES, default='10k')
+    parser.add_argument('--per-page', type=int, default=200)
+    parser.add_argument('--requests', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=1)
+    options = parser.parse_args()
+    setup()
+    with benchmark_database():
+        from django.urls import reverse
+
+        from posts.models import Group, User
+
+        random.seed(options.seed)
+        author_ids, group_ids = generate(SIZES[options.size])
+        urls = [
+            reverse('posts:index'),
+            reverse('posts:group_list', args=[
+                Group.objects.get(pk=group_ids[0]).slug
+            ]),
+            reverse('posts:profile', args=[
+                User.objects.get(pk=author_ids[0]).username
+            ]),
+        ]
+        for streaming in (False, True):
+            report('streaming', run(options, urls, streaming))
+
+
+if __name__ == '__main__':
+    main()
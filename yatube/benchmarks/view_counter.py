@@ -0,0 +1,149 @@
+"""Пропускная способность post_detail со счётчиком просмотров.
+
+Несколько потоков открывают случайные посты на файловой базе SQLite
+с боевым профилем SQLITE_PRODUCTION_PRAGMAS. Замер идёт для счётчика
+выключенного, буферизованного в памяти и в кэше (сброс раз
+в --flush-interval секунд) и для наивной записи UPDATE на каждый
+просмотр. Печатается пропускная способность, перцентили, число ошибок
+«database is locked» и сколько просмотров дошло до базы.
+
+Счётчику 'cache' нужен кэш без вытеснения (проверка posts.E001).
+Здесь вместо Redis стоит отдельный LocMem с MAX_ENTRIES, которого
+хватает на все ключи замера, так что до базы доходят все просмотры.
+
+    python -m benchmarks.view_counter --threads 8 --seconds 10
+"""
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+
+from . import Timer, report, setup
+from .sqlite_concurrency import prepare
+
+
+def worker(urls, stop, results):
+    from django.db import OperationalError, close_old_connections
+    from django.test import Client
+
+    client = Client()
+    reads, errors = Timer(), 0
+    while not stop.is_set():
+        try:
+            with reads():
+                client.get(random.choice(urls))
+        except OperationalError:
+            errors += 1
+        close_old_connections()
+    results.append((reads, errors))
+
+
+# Отдельный кэш счётчика: LocMem с лимитом по умолчанию (300 ключей)
+# вытеснял бы приращения, и до базы доходила бы только часть просмотров.
+VIEW_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'views': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'benchmark-views',
+        'OPTIONS': {'MAX_ENTRIES': 10 ** 7},
+    },
+}
+
+
+def run_profile(options, urls, counter):
+    from django.db import connections
+    from django.db.models import Sum
+    from django.test.utils import override_settings
+
+    from posts.models import PostViewCount
+
+    PostViewCount.objects.all().delete()
+    connections.close_all()
+    results = []
+    stop = threading.Event()
+    with override_settings(
+        POSTS_VIEW_COUNTER=counter, CACHES=VIEW_CACHES,
+        POSTS_VIEW_CACHE='views',
+    ):
+        threads = [
+            threading.Thread(target=worker, args=(urls, stop, results))
+            for _ in range(options.threads)
+        ]
+        for thread in threads:
+            thread.start()
+        time.sleep(options.seconds)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        # Остаток буфера — то, что ушло бы в базу при остановке
+        # процесса.
+        from posts import view_counts
+        view_counts.flush()
+    reads = Timer()
+    for thread_reads, _ in results:
+        reads.samples += thread_reads.samples
+    counted = PostViewCount.objects.aggregate(total=Sum('count'))['total']
+    connections.close_all()
+    return {
+        'requests_per_second': round(
+            len(reads.samples) / options.seconds, 1
+        ),
+        'locked_errors': sum(errors for _, errors in results),
+        'requests': len(reads.samples),
+        'views_counted': counted or 0,
+        'reads': reads.summary(),
+    }
+
+
+def direct(post_id):
+    """Наивный счётчик: отдельная запись в базу на каждый просмотр."""
+    from posts import view_counts
+    view_counts.write({post_id: 1})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--posts', type=int, default=10000)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--flush-interval', type=float, default=1)
+    parser.add_argument('--seed', type=int, default=1)
+    options = parser.parse_args()
+    setup()
+    from django.conf import settings
+    from django.db import connections
+    from django.test.utils import override_settings, setup_test_environment
+    from django.urls import reverse
+
+    from posts import view_counts
+    from posts.models import Post
+
+    setup_test_environment()
+    random.seed(options.seed)
+    with tempfile.TemporaryDirectory() as directory, override_settings(
+        SQLITE_PRAGMAS=settings.SQLITE_PRODUCTION_PRAGMAS,
+        POSTS_VIEW_FLUSH_INTERVAL=options.flush_interval,
+    ):
+        path = os.path.join(directory, 'benchmark.sqlite3')
+        prepare(path, options.posts)
+        connections.databases['default']['CONN_MAX_AGE'] = 600
+        ids = list(Post.objects.values_list('pk', flat=True)[:1000])
+        urls = [reverse('posts:post_detail', args=[pk]) for pk in ids]
+        record = view_counts.record
+        for name, counter in (
+            ('off', None), ('memory', 'memory'), ('cache', 'cache'),
+            ('direct', 'memory'),
+        ):
+            view_counts.record = direct if name == 'direct' else record
+            report('view_counter', {
+                'counter': name,
+                'threads': options.threads,
+                **run_profile(options, urls, counter),
+            })
+        view_counts.record = record
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,167 @@
+"""Задержка и число SQL-запросов каждой страницы приложения posts.
+
+На синтетической базе нужного размера (см. benchmarks.dataset)
+ленты index, group_list и profile открываются на нескольких глубинах
+страниц, для групп и профилей берутся самый большой и самый маленький
+из них. post_detail открывается для случайных постов. Для каждой пары
+«страница, глубина» сохраняются перцентили задержки и число запросов.
+
+Результат пишется в JSON, чтобы запуски можно было сравнить:
+    python -m benchmarks.views --size 100k --output before.json
+    python -m benchmarks.views --size 100k --output after.json \\
+        --set POSTS_PAGE_CACHE=true
+    python -m benchmarks.compare before.json after.json
+"""
+import argparse
+import json
+import platform
+import random
+import sys
+from datetime import datetime
+
+from . import Timer, benchmark_database, report, setup
+from .dataset import SIZES, generate
+
+DEPTHS = ('1', '10', '100', '1000', 'last')
+
+
+def parse_override(value):
+    name, _, raw = value.partition('=')
+    try:
+        return name, json.loads(raw)
+    except ValueError:
+        return name, raw
+
+
+def targets(author_ids, group_ids):
+    """Страницы для замера: (имя, URL, число постов в ленте)."""
+    from django.db.models import Count
+    from django.urls import reverse
+
+    from posts.models import Group, Post, User
+
+    groups = list(
+        Group.objects.filter(pk__in=group_ids)
+        .annotate(posts_number=Count('posts')).order_by('-posts_number')
+    )
+    authors = list(
+        User.objects.filter(pk__in=author_ids)
+        .annotate(posts_number=Count('posts')).order_by('-posts_number')
+    )
+    yield 'index', reverse('posts:index'), Post.objects.count()
+    for label, group in (('largest', groups[0]), ('smallest', groups[-1])):
+        yield (f'group_list:{label}', reverse('posts:group_list',
+               args=[group.slug]), group.posts_number)
+    for label, author in (('largest', authors[0]), ('smallest', authors[-1])):
+        yield (f'profile:{label}', reverse('posts:profile',
+               args=[author.username]), author.posts_number)
+
+
+def depth_pages(depth, posts_number, per_page):
+    last = max(1, -(-posts_number // per_page))
+    if depth == 'last':
+        return last
+    page = int(depth)
+    return page if page <= last else None
+
+
+def measure(client, url, repeats):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    timer = Timer()
+    queries = []
+    client.get(url)
+    for _ in range(repeats):
+        with CaptureQueriesContext(connection) as context, timer():
+            response = client.get(url)
+        queries.append(len(context.captured_queries))
+    return {
+        'status': response.status_code,
+        'queries': max(queries),
+        **timer.summary(),
+    }
+
+
+def run(options):
+    import django
+    from django.conf import settings
+    from django.core.cache import cache
+    from django.test import Client
+    from django.urls import reverse
+
+    from posts.models import Post
+
+    posts = SIZES[options.size]
+    author_ids, group_ids = generate(posts, seed=options.seed)
+    random.seed(options.seed)
+    client = Client()
+    results = []
+    for name, url, posts_number in targets(author_ids, group_ids):
+        for depth in DEPTHS:
+            page = depth_pages(depth, posts_number, settings.POST_COUNT)
+            if page is None:
+                continue
+            cache.clear()
+            results.append({
+                'view': name,
+                'depth': depth,
+                'page': page,
+                **measure(client, f'{url}?page={page}', options.repeats),
+            })
+    post_ids = random.sample(
+        list(Post.objects.values_list('pk', flat=True)), options.details
+    )
+    timer = Timer()
+    queries = 0
+    for pk in post_ids:
+        url = reverse('posts:post_detail', args=[pk])
+        result = measure(client, url, 1)
+        timer.samples.append(result['p50_ms'] / 1000)
+        queries = max(queries, result['queries'])
+    results.append({
+        'view': 'post_detail', 'depth': 'random', 'queries': queries,
+        **timer.summary(),
+    })
+    return {
+        'size': options.size,
+        'posts': posts,
+        'overrides': dict(options.overrides),
+        'started': options.started,
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'database': settings.DATABASES['default']['ENGINE'],
+        'results': results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument('--size', choices=SIZES, default='10k')
+    parser.add_argument('--repeats', type=int, default=20)
+    parser.add_argument('--details', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument(
+        '--set', dest='overrides', action='append', default=[],
+        type=parse_override, metavar='NAME=VALUE',
+        help='Переопределить настройку на время замера, значение в JSON.'
+    )
+    parser.add_argument('--output', help='Куда сохранить результат.')
+    options = parser.parse_args()
+    options.started = datetime.now().isoformat(timespec='seconds')
+    setup()
+    from django.test.utils import override_settings
+
+    with benchmark_database(), override_settings(**dict(options.overrides)):
+        results = run(options)
+    if options.output:
+        with open(options.output, 'w', encoding='utf-8') as output:
+            json.dump(results, output, ensure_ascii=False, indent=2)
+    for row in results['results']:
+        report('views', {'size': options.size, **row}, stream=sys.stdout)
+
+
+if __name__ == '__main__':
+    main()
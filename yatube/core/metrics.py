@@ -0,0 +1,145 @@
+"""Метрики запросов в памяти процесса.
+
+MetricsMiddleware (core/middleware.py) для каждого запроса замеряет
+общее время, время и число SQL-запросов, время рендеринга шаблонов
+и размер ответа и складывает их в гистограммы с меткой view — именем
+URL вроде posts:index. Страница /metrics/ отдаёт их в текстовом
+формате Prometheus.
+
+Гистограммы живут в памяти процесса: при нескольких воркерах
+каждый отдаёт свои, и Prometheus складывает их сам.
+
+Приложения добавляют свои показатели через register(): сборщик
+вызывается на каждый запрос /metrics/ и возвращает кортежи
+(имя, описание, тип, метки, значение).
+"""
+import threading
+from bisect import bisect_left
+
+PREFIX = 'yatube_'
+SECONDS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10
+)
+QUERIES = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+BYTES = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+METRICS = {
+    'request_duration_seconds': (
+        'Время обработки запроса целиком.', SECONDS
+    ),
+    'db_duration_seconds': ('Время SQL-запросов за запрос.', SECONDS),
+    'db_queries': ('Число SQL-запросов за запрос.', QUERIES),
+    'template_duration_seconds': (
+        'Время рендеринга шаблонов за запрос.', SECONDS
+    ),
+    'response_size_bytes': ('Размер тела ответа.', BYTES),
+}
+
+_lock = threading.Lock()
+_histograms = {}
+_responses = {}
+_collectors = []
+current = threading.local()
+
+
+class Histogram:
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class RequestMetrics:
+    """Счётчики одного запроса, которые копят обёртки БД и шаблонов."""
+    __slots__ = ('db_time', 'queries', 'template_time', 'rendering')
+
+    def __init__(self):
+        self.db_time = 0
+        self.queries = 0
+        self.template_time = 0
+        self.rendering = False
+
+
+def observe(view, status, values):
+    """Добавляет замеры одного запроса; values — {метрика: значение}."""
+    with _lock:
+        for name, value in values.items():
+            key = (name, view)
+            histogram = _histograms.get(key)
+            if histogram is None:
+                histogram = _histograms[key] = Histogram(METRICS[name][1])
+            histogram.observe(value)
+        _responses[view, status] = _responses.get((view, status), 0) + 1
+
+
+def register(collector):
+    if collector not in _collectors:
+        _collectors.append(collector)
+
+
+def reset():
+    with _lock:
+        _histograms.clear()
+        _responses.clear()
+
+
+def _labels(**labels):
+    return ','.join(
+        '{}="{}"'.format(
+            name, str(value).replace('\\', r'\\').replace('"', r'\"')
+        )
+        for name, value in labels.items()
+    )
+
+
+def render():
+    """Все метрики в текстовом формате Prometheus."""
+    with _lock:
+        histograms = {
+            key: (list(histogram.counts), histogram.sum, histogram.count)
+            for key, histogram in _histograms.items()
+        }
+        responses = dict(_responses)
+    lines = [
+        f'# HELP {PREFIX}responses_total Число ответов.',
+        f'# TYPE {PREFIX}responses_total counter',
+    ]
+    for (view, status), number in sorted(responses.items()):
+        lines.append(
+            f'{PREFIX}responses_total{{{_labels(view=view, status=status)}}}'
+            f' {number}'
+        )
+    for name, (help_text, buckets) in METRICS.items():
+        metric = PREFIX + name
+        lines.append(f'# HELP {metric} {help_text}')
+        lines.append(f'# TYPE {metric} histogram')
+        for (key_name, view), (counts, total, count) in sorted(
+            histograms.items()
+        ):
+            if key_name != name:
+                continue
+            cumulative = 0
+            for bound, number in zip(buckets + ('+Inf',), counts):
+                cumulative += number
+                labels = _labels(view=view, le=bound)
+                lines.append(f'{metric}_bucket{{{labels}}} {cumulative}')
+            lines.append(f'{metric}_sum{{{_labels(view=view)}}} {total}')
+            lines.append(f'{metric}_count{{{_labels(view=view)}}} {count}')
+    described = set()
+    for collector in _collectors:
+        for name, help_text, kind, labels, value in collector():
+            metric = PREFIX + name
+            if metric not in described:
+                described.add(metric)
+                lines.append(f'# HELP {metric} {help_text}')
+                lines.append(f'# TYPE {metric} {kind}')
+            lines.append(f'{metric}{{{_labels(**labels)}}} {value}')
+    return '\n'.join(lines) + '\n'
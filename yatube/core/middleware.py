@@ -0,0 +1,89 @@
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from . import metrics, routers
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+PIN_COOKIE = 'pin_primary'
+
+
+class MetricsMiddleware:
+    """Замеряет каждый запрос и складывает результат в core.metrics.
+
+    Стоит первым в MIDDLEWARE, чтобы время включало остальные
+    middleware. Время шаблонов копит бэкенд
+    core.template_backends.TimedDjangoTemplates.
+    """
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request_metrics = metrics.RequestMetrics()
+        metrics.current.request = request_metrics
+
+        def record_query(execute, sql, params, many, context):
+            started = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                request_metrics.db_time += time.perf_counter() - started
+                request_metrics.queries += 1
+
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(record_query)
+                    )
+                response = self.get_response(request)
+        finally:
+            metrics.current.request = None
+        values = {
+            'request_duration_seconds': time.perf_counter() - started,
+            'db_duration_seconds': request_metrics.db_time,
+            'db_queries': request_metrics.queries,
+            'template_duration_seconds': request_metrics.template_time,
+        }
+        if not response.streaming:
+            values['response_size_bytes'] = len(response.content)
+        match = request.resolver_match
+        view = match.view_name if match else 'unresolved'
+        metrics.observe(view, response.status_code, values)
+        return response
+
+
+class ReplicaRoutingMiddleware:
+    """Разрешает чтение с реплик и привязывает писавших к основной базе.
+
+    Стоит до SessionMiddleware, чтобы сессия и пользователь читались
+    из той же базы, что и остальные данные запроса.
+    """
+
+    def __init__(self, get_response):
+        if not settings.DATABASE_REPLICAS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        routers.start_request(
+            request.method in SAFE_METHODS
+            and PIN_COOKIE not in request.COOKIES
+        )
+        try:
+            response = self.get_response(request)
+        finally:
+            written = routers.finish_request()
+        if written:
+            response.set_cookie(
+                PIN_COOKIE, '1', max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True, samesite='Lax'
+            )
+        return response
@@ -0,0 +1,47 @@
+"""Чтение с реплик и запись на основную базу.
+
+Запросы на чтение уходят на реплики из DATABASE_REPLICAS, только
+если ReplicaRoutingMiddleware разрешила это для текущего HTTP-запроса:
+в безопасных методах и без куки привязки к основной базе. Команды,
+shell и POST-запросы читают с основной базы.
+
+После записи middleware ставит куку на REPLICA_PIN_SECONDS, и
+следующие запросы этого браузера тоже читают с основной базы, пока
+реплики не догонят её.
+"""
+import random
+import threading
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+_state = threading.local()
+
+
+def start_request(use_replica):
+    _state.use_replica = use_replica
+    _state.written = False
+
+
+def finish_request():
+    """Заканчивает запрос; возвращает True, если в нём была запись."""
+    written = getattr(_state, 'written', False)
+    _state.use_replica = False
+    _state.written = False
+    return written
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        replicas = settings.DATABASE_REPLICAS
+        if replicas and getattr(_state, 'use_replica', False):
+            return random.choice(replicas)
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        _state.written = True
+        # Явно, иначе Django запишет объект туда, откуда его прочитал.
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
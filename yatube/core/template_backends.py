@@ -0,0 +1,36 @@
+import time
+
+from django.template import TemplateDoesNotExist
+from django.template.backends.django import DjangoTemplates, Template, reraise
+
+from . import metrics
+
+
+class TimedTemplate(Template):
+    """Шаблон, который добавляет время рендеринга к метрикам запроса."""
+
+    def render(self, context=None, request=None):
+        request_metrics = getattr(metrics.current, 'request', None)
+        if request_metrics is None or request_metrics.rendering:
+            return super().render(context, request)
+        # Вложенные render_to_string уже входят во время внешнего.
+        request_metrics.rendering = True
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            request_metrics.template_time += time.perf_counter() - started
+            request_metrics.rendering = False
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return TimedTemplate(
+                self.engine.get_template(template_name), self
+            )
+        except TemplateDoesNotExist as exc:
+            reraise(exc, self)
@@ -0,0 +1,53 @@
+from django import template
+
+register = template.Library()
+
+# Сколько номеров показывать вокруг текущей страницы и с краёв.
+ON_EACH_SIDE = 3
+ON_ENDS = 1
+
+
+def elided_page_range(number, num_pages, on_each_side=ON_EACH_SIDE,
+                      on_ends=ON_ENDS):
+    """Номера страниц для навигации; None — место для многоточия.
+
+    Вместо всех num_pages номеров отдаёт первые и последние on_ends
+    страниц и окно on_each_side вокруг текущей, так что размер
+    навигации не зависит от длины ленты.
+    """
+    if num_pages <= (on_each_side + on_ends) * 2 + 1:
+        return list(range(1, num_pages + 1))
+    pages = []
+    window_start = max(number - on_each_side, 1)
+    window_end = min(number + on_each_side, num_pages)
+    # Многоточие заменяет хотя бы две страницы, иначе проще
+    # показать номер.
+    if window_start > on_ends + 2:
+        pages += range(1, on_ends + 1)
+        pages.append(None)
+        pages += range(window_start, window_end + 1)
+    else:
+        pages += range(1, window_end + 1)
+    if window_end < num_pages - on_ends - 1:
+        pages.append(None)
+        pages += range(num_pages - on_ends + 1, num_pages + 1)
+    else:
+        pages += range(window_end + 1, num_pages + 1)
+    return pages
+
+
+@register.inclusion_tag('includes/page_range.html', takes_context=True)
+def page_range(context, page_obj):
+    """Ссылки на страницы вокруг текущей, первую и последнюю.
+
+    Если количество записей приближённое, последняя страница
+    неизвестна: навигация доходит до следующей за текущей.
+    """
+    num_pages = page_obj.paginator.num_pages
+    if getattr(page_obj.paginator, 'is_approximate', False):
+        num_pages = page_obj.number + page_obj.has_next()
+    return {
+        'page_obj': page_obj,
+        'page_query': context.get('page_query', ''),
+        'pages': elided_page_range(page_obj.number, num_pages),
+    }
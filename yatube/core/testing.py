@@ -0,0 +1,73 @@
+"""Бюджет SQL-запросов для тестов страниц.
+
+    with max_queries(3):
+        self.client.get(url)
+
+или декоратором над тестом:
+
+    @max_queries(3)
+    def test_index(self):
+        ...
+
+Если страница сделала больше запросов, тест падает со списком
+всех запросов; для каждого указано, из какой строки какого шаблона
+он был вызван, так что N+1 в шаблоне видно сразу.
+"""
+import sys
+from contextlib import ContextDecorator
+
+from django.db import connections
+from django.template.base import Node
+
+
+def template_stack():
+    """Цепочка тегов шаблонов, внутри которых сейчас идёт рендеринг."""
+    stack = []
+    frame = sys._getframe(1)
+    while frame is not None:
+        node = frame.f_locals.get('self')
+        if frame.f_code.co_name == 'render_annotated' and isinstance(
+            node, Node
+        ):
+            stack.append(
+                f'{node.origin.template_name or node.origin.name}:'
+                f'{node.token.lineno} '
+                f'{node.token.contents}'
+            )
+        frame = frame.f_back
+    stack.reverse()
+    return stack
+
+
+class max_queries(ContextDecorator):
+    """Падает, если внутри блока выполнено больше limit запросов."""
+
+    def __init__(self, limit, using='default'):
+        self.limit = limit
+        self.using = using
+
+    def _recreate_cm(self):
+        # Декоратор получает свежий экземпляр на каждый вызов теста.
+        return type(self)(self.limit, self.using)
+
+    def record(self, execute, sql, params, many, context):
+        self.queries.append((sql, params, template_stack()))
+        return execute(sql, params, many, context)
+
+    def __enter__(self):
+        self.queries = []
+        self.wrapper = connections[self.using].execute_wrapper(self.record)
+        self.wrapper.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.wrapper.__exit__(exc_type, exc_value, traceback)
+        if exc_type is not None or len(self.queries) <= self.limit:
+            return False
+        lines = [
+            f'{len(self.queries)} запросов при бюджете {self.limit}:'
+        ]
+        for number, (sql, params, stack) in enumerate(self.queries, 1):
+            lines.append(f'{number}. {sql} {params or ""}'.rstrip())
+            lines.extend(f'       в {place}' for place in stack)
+        raise AssertionError('\n'.join(lines))
@@ -0,0 +1,178 @@
+from http import HTTPStatus
+from unittest import skipUnless
+
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import connection
+from django.template import Context, Template
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Group, Post, User
+
+from . import metrics, routers
+from .middleware import PIN_COOKIE
+from .templatetags.pagination import elided_page_range
+from .testing import max_queries
+
+
+class MaxQueriesTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        for i in range(3):
+            Group.objects.create(title=f'Группа {i}', slug=f'group-{i}')
+
+    def test_within_budget(self):
+        with max_queries(1):
+            list(Group.objects.all())
+
+    def test_report_names_template(self):
+        """Сообщение содержит SQL и строку шаблона с запросом."""
+        template = Template(
+            '{% for group in groups %}\n{{ group.posts.count }}{% endfor %}'
+        )
+        with self.assertRaises(AssertionError) as error:
+            with max_queries(2):
+                template.render(Context({'groups': Group.objects.all()}))
+        message = str(error.exception)
+        self.assertIn('4 запросов при бюджете 2', message)
+        self.assertIn('FROM "posts_post"', message)
+        self.assertIn(':2 group.posts.count', message)
+
+    def test_decorator(self):
+        @max_queries(0)
+        def query():
+            Group.objects.count()
+
+        with self.assertRaises(AssertionError):
+            query()
+
+
+class MetricsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.staff = User.objects.create_user(
+            username='Admin', is_staff=True
+        )
+        cls.url = reverse('metrics')
+
+    def setUp(self):
+        metrics.reset()
+        self.staff_client = Client()
+        self.staff_client.force_login(self.staff)
+
+    def test_request_is_measured(self):
+        """Запрос попадает в гистограммы с именем URL в метке."""
+        self.client.get(reverse('posts:index'))
+        text = self.staff_client.get(self.url).content.decode()
+        view = 'view="posts:index"'
+        self.assertIn(
+            f'yatube_responses_total{{{view},status="200"}} 1', text
+        )
+        self.assertIn(f'yatube_db_queries_count{{{view}}} 1', text)
+        self.assertIn(f'yatube_db_queries_bucket{{{view},le="2"}} 1', text)
+        for name in metrics.METRICS:
+            with self.subTest(name=name):
+                self.assertIn(f'yatube_{name}_sum{{{view}}}', text)
+
+    def test_endpoint_is_private(self):
+        """Без staff и доверенного адреса метрик не видно."""
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+        with override_settings(METRICS_ALLOWED_IPS=('127.0.0.1',)):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
+
+@override_settings(DATABASE_REPLICAS=['replica'])
+class ReplicaRoutingTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Anonimus')
+
+    def setUp(self):
+        self.router = routers.PrimaryReplicaRouter()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_reads_go_to_replica_only_in_requests(self):
+        """Вне разрешённого запроса чтение идёт с основной базы."""
+        self.assertEqual(self.router.db_for_read(Post), 'default')
+        routers.start_request(use_replica=True)
+        self.addCleanup(routers.finish_request)
+        self.assertEqual(self.router.db_for_read(Post), 'replica')
+        self.assertEqual(self.router.db_for_write(Post), 'default')
+
+    def test_write_pins_to_primary(self):
+        """После записи браузер читает с основной базы."""
+        response = self.authorized_client.post(
+            reverse('posts:post_create'), {'text': 'Новый пост'}
+        )
+        self.assertIn(PIN_COOKIE, response.cookies)
+        self.assertEqual(
+            response.cookies[PIN_COOKIE]['max-age'],
+            settings.REPLICA_PIN_SECONDS
+        )
+        # Реплики с таким алиасом нет: запрос упал бы, читая с неё.
+        response = self.authorized_client.get(reverse('posts:index'))
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+
+@skipUnless('replica' in settings.DATABASES, 'нужен YATUBE_REPLICA_DB')
+class TwoDatabasesTest(TestCase):
+    """Основная база и реплика — два файла SQLite без репликации."""
+    databases = {'default', 'replica'}
+
+    def test_pinned_reader_sees_own_write(self):
+        user = User.objects.create_user(username='Anonimus')
+        client = Client()
+        client.force_login(user)
+        client.post(reverse('posts:post_create'), {'text': 'Новый пост'})
+        self.assertFalse(
+            Client().get(reverse('posts:index')).context['page_obj']
+        )
+        self.assertTrue(
+            client.get(reverse('posts:index')).context['page_obj']
+        )
+
+
+class SqlitePragmasTest(TestCase):
+    @override_settings(SQLITE_PRAGMAS={'cache_size': -1234})
+    def test_pragmas_applied_to_new_connection(self):
+        """Новое соединение получает прагмы из SQLITE_PRAGMAS."""
+        new_connection = connection.copy()
+        self.addCleanup(new_connection.close)
+        with new_connection.cursor() as cursor:
+            cursor.execute('PRAGMA cache_size')
+            self.assertEqual(cursor.fetchone()[0], -1234)
+
+
+class PaginationTagTest(TestCase):
+    def test_elided_page_range(self):
+        cases = {
+            (1, 5): [1, 2, 3, 4, 5],
+            (1, 200000): [1, 2, 3, 4, None, 200000],
+            (100, 200000): [
+                1, None, 97, 98, 99, 100, 101, 102, 103, None, 200000
+            ],
+            (200000, 200000): [1, None, 199997, 199998, 199999, 200000],
+        }
+        for (number, num_pages), pages in cases.items():
+            with self.subTest(number=number, num_pages=num_pages):
+                self.assertEqual(
+                    elided_page_range(number, num_pages), pages
+                )
+
+    def test_navigation_size_does_not_grow(self):
+        """Навигация по 200 тысячам страниц — десяток ссылок."""
+        page_obj = Paginator(range(2000000), 10).page(1000)
+        html = Template(
+            "{% include 'includes/paginator.html' %}"
+        ).render(Context({'page_obj': page_obj, 'page_query': 'q=a&'}))
+        self.assertEqual(html.count('class="page-item'), 15)
+        self.assertIn('href="?q=a&amp;page=200000">200000', html)
+        self.assertIn('<span class="page-link">1000</span>', html)
@@ -0,0 +1,22 @@
+from django.contrib import admin
+
+from .models import Job
+
+
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'task', 'status', 'attempts', 'run_at', 'created')
+    list_filter = ('status', 'task')
+    # Аргументы задач правятся только кодом, который их ставит.
+    readonly_fields = (
+        'task', 'payload', 'locked_by', 'locked_at', 'last_error', 'created'
+    )
+    actions = ('retry',)
+
+    def retry(self, request, queryset):
+        queryset.update(
+            status=Job.QUEUED, attempts=0, locked_by='', locked_at=None
+        )
+    retry.short_description = 'Запустить заново'
+
+
+admin.site.register(Job, JobAdmin)
@@ -0,0 +1,68 @@
+import os
+import signal
+import socket
+import threading
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+
+from jobs import queue
+
+
+class Command(BaseCommand):
+    help = 'Выполняет задачи из очереди jobs в нескольких потоках.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--threads', type=int, default=settings.JOBS_WORKER_THREADS,
+            help='Сколько потоков забирают задачи одновременно.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.JOBS_BATCH_SIZE,
+            help='Сколько задач поток забирает за раз.'
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Выполнить готовые задачи и выйти, а не ждать новых.'
+        )
+
+    def work(self, name, options, stop):
+        try:
+            while not stop.is_set():
+                close_old_connections()
+                done = queue.run_once(name, options['batch_size'])
+                if done:
+                    self.stdout.write(f'{name}: выполнено задач: {done}')
+                elif options['once']:
+                    break
+                else:
+                    stop.wait(settings.JOBS_POLL_INTERVAL)
+        finally:
+            connection.close()
+
+    def handle(self, *args, **options):
+        stop = threading.Event()
+        signal.signal(signal.SIGTERM, lambda *args: stop.set())
+        prefix = f'{socket.gethostname()}:{os.getpid()}'
+        if options['threads'] == 1:
+            try:
+                self.work(f'{prefix}:0', options, stop)
+            except KeyboardInterrupt:
+                pass
+            return
+        threads = [
+            threading.Thread(
+                target=self.work, args=(f'{prefix}:{number}', options, stop)
+            )
+            for number in range(options['threads'])
+        ]
+        for thread in threads:
+            thread.start()
+        try:
+            for thread in threads:
+                thread.join()
+        except KeyboardInterrupt:
+            stop.set()
+            for thread in threads:
+                thread.join()
@@ -0,0 +1,178 @@
+"""Очередь отложенных задач в основной базе, без внешнего брокера.
+
+Задача — функция, зарегистрированная декоратором @task в модуле tasks
+любого приложения. enqueue() записывает строку Job в той же
+транзакции, что и остальные изменения запроса, а обработчики
+(manage.py run_worker) забирают строки пачками и выполняют.
+
+Задачи с batch=True получают сразу список аргументов всех взятых
+задач этого типа и возвращают по ошибке или None на каждую, так что
+например письма уходят через одно SMTP-соединение.
+
+Упавшая задача возвращается в очередь с растущей задержкой:
+JOBS_RETRY_DELAY * 2 ** (попытка - 1), но не больше
+JOBS_RETRY_MAX_DELAY. После max_attempts попыток она остаётся
+в состоянии failed с текстом последней ошибки.
+"""
+import json
+import logging
+import traceback
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+_tasks = {}
+
+
+class Task:
+    def __init__(self, func, name, max_attempts, batch):
+        self.func = func
+        self.name = name
+        self.max_attempts = max_attempts
+        self.batch = batch
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def enqueue(self, **kwargs):
+        return enqueue(self.name, **kwargs)
+
+
+def task(name=None, max_attempts=None, batch=False):
+    """Регистрирует функцию как задачу очереди."""
+    def decorator(func):
+        registered = Task(
+            func, name or f'{func.__module__}.{func.__name__}',
+            max_attempts or settings.JOBS_MAX_ATTEMPTS, batch
+        )
+        _tasks[registered.name] = registered
+        return registered
+    return decorator
+
+
+def get_task(name):
+    return _tasks[name]
+
+
+def enqueue(name, run_at=None, **kwargs):
+    """Ставит задачу в очередь; аргументы должны сериализоваться в JSON."""
+    return Job.objects.create(
+        task=name,
+        payload=json.dumps(kwargs, ensure_ascii=False),
+        max_attempts=get_task(name).max_attempts,
+        run_at=run_at or timezone.now(),
+    )
+
+
+def retry_delay(attempts):
+    return timedelta(seconds=min(
+        settings.JOBS_RETRY_DELAY * 2 ** (attempts - 1),
+        settings.JOBS_RETRY_MAX_DELAY
+    ))
+
+
+def claim(worker, limit):
+    """Забирает до limit готовых к запуску задач для обработчика worker.
+
+    Задачи, которые висят в running дольше JOBS_LOCK_TIMEOUT, считаются
+    брошенными упавшим обработчиком и забираются снова.
+    """
+    now = timezone.now()
+    stale = now - timedelta(seconds=settings.JOBS_LOCK_TIMEOUT)
+    due = Job.objects.filter(status=Job.QUEUED, run_at__lte=now)
+    abandoned = Job.objects.filter(status=Job.RUNNING, locked_at__lt=stale)
+    ids = list(
+        due.order_by('run_at').values_list('pk', flat=True)[:limit]
+    ) + list(abandoned.values_list('pk', flat=True)[:limit])
+    if not ids:
+        return []
+    with transaction.atomic():
+        # Условие на состояние повторяется: из двух обработчиков,
+        # выбравших одни и те же строки, их получит только один.
+        (due | abandoned).filter(pk__in=ids).update(
+            status=Job.RUNNING, locked_by=worker, locked_at=now,
+            attempts=F('attempts') + 1
+        )
+        return list(Job.objects.filter(
+            pk__in=ids, status=Job.RUNNING, locked_by=worker, locked_at=now
+        ))
+
+
+def fail(job, error):
+    job.last_error = ''.join(
+        traceback.format_exception(type(error), error, error.__traceback__)
+    )
+    job.locked_by = ''
+    job.locked_at = None
+    if job.attempts >= job.max_attempts:
+        job.status = Job.FAILED
+        logger.error('Задача %s не выполнена: %s', job, error)
+    else:
+        job.status = Job.QUEUED
+        job.run_at = timezone.now() + retry_delay(job.attempts)
+        logger.warning('Задача %s упала, повтор в %s', job, job.run_at)
+    job.save(update_fields=[
+        'status', 'run_at', 'last_error', 'locked_by', 'locked_at'
+    ])
+
+
+def _run_batch(registered, jobs):
+    try:
+        errors = list(registered([job.kwargs for job in jobs]))
+    except Exception as error:
+        errors = [error] * len(jobs)
+    done = []
+    for job, error in zip(jobs, errors):
+        if error is None:
+            done.append(job.pk)
+        else:
+            fail(job, error)
+    return done
+
+
+def _run_each(registered, jobs):
+    done = []
+    for job in jobs:
+        try:
+            registered(**job.kwargs)
+        except Exception as error:
+            fail(job, error)
+        else:
+            done.append(job.pk)
+    return done
+
+
+def execute(jobs):
+    """Выполняет взятые задачи; пакетные — одним вызовом на тип."""
+    by_task = defaultdict(list)
+    for job in jobs:
+        by_task[job.task].append(job)
+    done = []
+    for name, task_jobs in by_task.items():
+        try:
+            registered = get_task(name)
+        except KeyError as error:
+            for job in task_jobs:
+                fail(job, error)
+            continue
+        if registered.batch:
+            done += _run_batch(registered, task_jobs)
+        else:
+            done += _run_each(registered, task_jobs)
+    # Выполненные задачи удаляются одним запросом.
+    Job.objects.filter(pk__in=done).delete()
+
+
+def run_once(worker, limit=None):
+    """Забирает и выполняет одну пачку; возвращает число задач."""
+    jobs = claim(worker, limit or settings.JOBS_BATCH_SIZE)
+    execute(jobs)
+    return len(jobs)
@@ -0,0 +1,40 @@
+"""Отправка писем через очередь.
+
+Письма одной пачки уходят через одно соединение JOBS_EMAIL_BACKEND,
+ошибка одного письма не мешает остальным.
+"""
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+
+from .queue import task
+
+
+@task(name='jobs.send_email', batch=True)
+def send_email(messages):
+    connection = get_connection(settings.JOBS_EMAIL_BACKEND)
+    connection.open()
+    errors = []
+    try:
+        for message in messages:
+            email = EmailMultiAlternatives(
+                message['subject'], message['body'], message['from_email'],
+                message['to'], connection=connection
+            )
+            if message.get('html'):
+                email.attach_alternative(message['html'], 'text/html')
+            try:
+                email.send()
+            except Exception as error:
+                errors.append(error)
+            else:
+                errors.append(None)
+    finally:
+        connection.close()
+    return errors
+
+
+def enqueue_email(subject, body, from_email, to, html=None):
+    return send_email.enqueue(
+        subject=subject, body=body, from_email=from_email, to=list(to),
+        html=html
+    )
@@ -0,0 +1,116 @@
+import re
+from datetime import timedelta
+from io import StringIO
+
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.models import User
+
+from . import queue
+from .models import Job
+from .tasks import enqueue_email
+
+WORKER = 'test-worker'
+USER_EMAIL = 'anonimus@example.com'
+LOCMEM_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+
+calls = []
+
+
+@queue.task(name='jobs.tests.record')
+def record(value):
+    calls.append(value)
+
+
+@queue.task(name='jobs.tests.broken', max_attempts=2)
+def broken():
+    raise ValueError('сломалось')
+
+
+@override_settings(JOBS_EMAIL_BACKEND=LOCMEM_BACKEND)
+class QueueTest(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_job_runs_and_is_removed(self):
+        record.enqueue(value=1)
+        queue.enqueue(
+            'jobs.tests.record', value=2,
+            run_at=timezone.now() + timedelta(hours=1)
+        )
+        self.assertEqual(queue.run_once(WORKER), 1)
+        self.assertEqual(calls, [1])
+        self.assertEqual(Job.objects.get().kwargs, {'value': 2})
+
+    @override_settings(JOBS_RETRY_DELAY=10)
+    def test_retry_with_backoff_then_fail(self):
+        job = broken.enqueue()
+        before = timezone.now()
+        with self.assertLogs('jobs.queue', 'WARNING'):
+            queue.run_once(WORKER)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.QUEUED)
+        self.assertEqual(job.attempts, 1)
+        self.assertGreaterEqual(job.run_at, before + timedelta(seconds=10))
+        self.assertIn('сломалось', job.last_error)
+        Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+        with self.assertLogs('jobs.queue', 'ERROR'):
+            queue.run_once(WORKER)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertEqual(queue.run_once(WORKER), 0)
+
+    @override_settings(JOBS_LOCK_TIMEOUT=60)
+    def test_abandoned_job_is_reclaimed(self):
+        job = record.enqueue(value=3)
+        Job.objects.filter(pk=job.pk).update(
+            status=Job.RUNNING, locked_by='dead',
+            locked_at=timezone.now() - timedelta(minutes=5)
+        )
+        self.assertEqual(queue.run_once(WORKER), 1)
+        self.assertEqual(calls, [3])
+
+    def test_emails_are_sent_in_one_batch(self):
+        for number in range(3):
+            enqueue_email(
+                f'Тема {number}', 'Текст', None, [USER_EMAIL], '<p>Текст</p>'
+            )
+        with self.assertNumQueries(7):
+            # Выбор, захват в точке сохранения, чтение задач и удаление
+            # всех выполненных — сколько бы писем ни было в пачке.
+            queue.run_once(WORKER)
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(
+            mail.outbox[0].alternatives, [('<p>Текст</p>', 'text/html')]
+        )
+        self.assertFalse(Job.objects.exists())
+
+
+@override_settings(JOBS_EMAIL_BACKEND=LOCMEM_BACKEND)
+class PasswordResetQueueTest(TestCase):
+    def test_reset_email_goes_through_queue(self):
+        User.objects.create_user(
+            username='Anonimus', email=USER_EMAIL, password='password'
+        )
+        self.client.post(
+            reverse('users:password_reset'), {'email': USER_EMAIL}
+        )
+        self.assertEqual(mail.outbox, [])
+        job = Job.objects.get()
+        self.assertEqual(job.task, 'users.send_password_reset')
+        # Ссылка с токеном не хранится в очереди и не видна в админке.
+        self.assertNotIn('/auth/reset/', job.payload)
+        call_command(
+            'run_worker', once=True, threads=1, stdout=StringIO()
+        )
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, [USER_EMAIL])
+        link = re.search(r'/auth/reset/\S+/', mail.outbox[0].body)[0]
+        response = self.client.get(link)
+        self.assertRedirects(
+            response, link.rsplit('/', 2)[0] + '/set-password/'
+        )
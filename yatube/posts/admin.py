@@ -1,6 +1,48 @@
+from django import forms
 from django.contrib import admin
+from django.contrib.admin.widgets import AutocompleteSelect
 
-from .models import Group, Post
+from . import search
+from .models import Follow, Group, Post
+from .paginators import EstimatedCountPaginator
+
+
+class PreloadedAutocompleteSelect(AutocompleteSelect):
+    """Autocomplete, который может взять выбранный объект из формы.
+
+    Обычный AutocompleteSelect ищет подпись выбранного значения
+    отдельным запросом, и в списке постов это запрос на каждую строку.
+    """
+    selected = None
+
+    def optgroups(self, name, value, attr=None):
+        selected = self.selected
+        if selected is None or [str(v) for v in value] != [str(selected.pk)]:
+            return super().optgroups(name, value, attr)
+        default = (None, [], 0)
+        if not self.is_required:
+            default[1].append(self.create_option(name, '', '', False, 0))
+        default[1].append(self.create_option(
+            name, selected.pk,
+            self.choices.field.label_from_instance(selected),
+            True, len(default[1])
+        ))
+        return [default]
+
+
+class PostChangeListForm(forms.ModelForm):
+    """Форма строки списка постов.
+
+    Передаёт виджетам уже загруженные через list_select_related
+    объекты, чтобы страница не делала запросов на каждую строку.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        for name, field in self.fields.items():
+            widget = getattr(field.widget, 'widget', field.widget)
+            if isinstance(widget, PreloadedAutocompleteSelect):
+                widget.selected = getattr(self.instance, name)
 
 
 class PostAdmin(admin.ModelAdmin):
@@ -11,11 +53,51 @@ class PostAdmin(admin.ModelAdmin):
         'author',
         'group',
     )
+    list_select_related = ('author', 'group')
     search_fields = ('text',)
     list_filter = ('pub_date',)
     list_editable = ('group',)
+    autocomplete_fields = ('author', 'group')
+    date_hierarchy = 'pub_date'
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     empty_value_display = '-пусто-'
 
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if db_field.name in self.get_autocomplete_fields(request):
+            kwargs.setdefault('widget', PreloadedAutocompleteSelect(
+                db_field.remote_field, self.admin_site,
+                using=kwargs.get('using')
+            ))
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
+    def get_changelist_form(self, request, **kwargs):
+        kwargs.setdefault('form', PostChangeListForm)
+        return super().get_changelist_form(request, **kwargs)
+
+    def get_search_results(self, request, queryset, search_term):
+        # Поиск по тексту идёт через полнотекстовый индекс,
+        # а не через LIKE '%...%' по всей таблице.
+        if not search_term.strip() or not search.available():
+            return super().get_search_results(
+                request, queryset, search_term
+            )
+        queryset = search.filter_posts(queryset, search_term)
+        return queryset, False
+
+
+class GroupAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'title', 'slug', 'post_count')
+    search_fields = ('title', 'slug')
+    prepopulated_fields = {'slug': ('title',)}
+
+
+class FollowAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'user', 'author')
+    list_select_related = ('user', 'author')
+    raw_id_fields = ('user', 'author')
+
 
 admin.site.register(Post, PostAdmin)
-admin.site.register(Group)
+admin.site.register(Group, GroupAdmin)
+admin.site.register(Follow, FollowAdmin)
@@ -0,0 +1,60 @@
+"""Системные проверки настроек posts."""
+from django.conf import settings
+from django.core import checks
+
+# Бэкенды, которые живут в памяти одного процесса.
+PROCESS_LOCAL_CACHE_BACKENDS = (
+    'django.core.cache.backends.dummy.DummyCache',
+    'django.core.cache.backends.locmem.LocMemCache',
+)
+# Бэкенды, которые при переполнении или по своему лимиту выбрасывают
+# ключи без предупреждения.
+EVICTING_CACHE_BACKENDS = (
+    'django.core.cache.backends.db.DatabaseCache',
+    'django.core.cache.backends.dummy.DummyCache',
+    'django.core.cache.backends.filebased.FileBasedCache',
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.memcached.MemcachedCache',
+    'django.core.cache.backends.memcached.PyLibMCCache',
+)
+
+
+@checks.register(checks.Tags.caches)
+def check_view_counter_cache(app_configs, **kwargs):
+    """Счётчик просмотров 'cache' держит приращения только в кэше."""
+    if settings.POSTS_VIEW_COUNTER != 'cache':
+        return []
+    alias = settings.POSTS_VIEW_CACHE
+    backend = settings.CACHES.get(alias, {}).get('BACKEND')
+    if backend is None:
+        return [checks.Error(
+            f'POSTS_VIEW_CACHE = {alias!r}: такого кэша нет в CACHES.',
+            id='posts.E001',
+        )]
+    if backend in EVICTING_CACHE_BACKENDS:
+        return [checks.Error(
+            f'Кэш {alias!r} ({backend}) может вытеснять ключи, '
+            f'и непереданные в базу просмотры потеряются.',
+            hint='Укажите в POSTS_VIEW_CACHE кэш, который не вытесняет '
+                 'ключи (Redis с maxmemory-policy noeviction), '
+                 "или используйте POSTS_VIEW_COUNTER = 'memory'.",
+            id='posts.E001',
+        )]
+    return []
+
+
+@checks.register(checks.Tags.caches)
+def check_conditional_get_cache(app_configs, **kwargs):
+    """Отметки изменений лент должны видеть все процессы."""
+    if not settings.POSTS_CONDITIONAL_GET:
+        return []
+    backend = settings.CACHES['default']['BACKEND']
+    if backend in PROCESS_LOCAL_CACHE_BACKENDS:
+        return [checks.Error(
+            f'POSTS_CONDITIONAL_GET с кэшем {backend}: отметку изменения '
+            f'ленты увидит только процесс, который обработал запись, '
+            f'остальные будут отвечать 304 на устаревшие страницы.',
+            hint='Настройте общий кэш default (Memcached, Redis).',
+            id='posts.E002',
+        )]
+    return []
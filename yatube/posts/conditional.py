@@ -0,0 +1,126 @@
+"""Условные GET-запросы (ETag / Last-Modified) для лент и поста.
+
+Валидатор ленты собирается из самой новой записи области (один
+запрос по индексу), количества постов, если оно лежит в кэше
+(POSTS_COUNT_CACHE), и времени последнего изменения области. Время
+изменения хранится в кэше, его сдвигают все пути записи: сигналы
+постов, групп, пользователей и подписок и команда import_posts.
+Поэтому правка текста, удаление поста или переименование автора
+и группы тоже меняют валидатор. Кэш для этого должен быть общим
+для всех процессов: с LocMem отметку увидел бы только процесс,
+обработавший запись (проверка posts.E002). Если валидатор совпал,
+клиент получает 304, а запрос страницы и отрисовка шаблона
+не выполняются.
+"""
+import hashlib
+import time
+from datetime import datetime, timezone
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from . import counts
+from .models import Post
+
+CHANGED_KEY = 'posts:changed:{}'
+
+
+def touch(scopes):
+    """Отмечает области (см. posts.counts) как изменённые сейчас."""
+    now = time.time()
+    cache.set_many(
+        {CHANGED_KEY.format(scope): now for scope in scopes}, None
+    )
+
+
+def changed_at(scope):
+    """Время последнего изменения области.
+
+    Если отметки в кэше нет, считаем, что область изменилась
+    только что: лишний полный ответ лучше устаревшего 304.
+    """
+    key = CHANGED_KEY.format(scope)
+    value = cache.get(key)
+    if value is None:
+        value = time.time()
+        cache.add(key, value, None)
+    return value
+
+
+def _validators(request, parts, timestamps):
+    raw = ':'.join(map(str, (request.user.pk, *parts)))
+    etag = hashlib.md5(raw.encode()).hexdigest()
+    last_modified = datetime.fromtimestamp(max(timestamps), timezone.utc)
+    return etag, last_modified
+
+
+def feed_validators(request, queryset, scope):
+    """ETag и Last-Modified ленты queryset из области scope."""
+    newest = queryset.order_by('-pub_date', '-id').values_list(
+        'pub_date', 'id'
+    ).first()
+    count = None
+    if settings.POSTS_COUNT_CACHE:
+        count = counts.get_count(queryset, scope)
+    changed = changed_at(scope)
+    timestamps = [changed]
+    if newest is not None:
+        timestamps.append(newest[0].timestamp())
+    return _validators(request, (scope, newest, count, changed), timestamps)
+
+
+def post_validators(request, post_id):
+    """Валидаторы страницы поста; None, если поста нет."""
+    row = Post.objects.filter(pk=post_id).values_list(
+        'updated', 'author_id', 'group_id', 'view_count__updated'
+    ).first()
+    if row is None:
+        return None
+    updated, author_id, group_id, views_updated = row
+    # Страница поста показывает счётчик и имя автора, название группы:
+    # их изменения отмечены во временах областей автора и группы.
+    # Число просмотров меняется при сбросе счётчика в PostViewCount.
+    timestamps = [
+        updated.timestamp(), changed_at(counts.author_scope(author_id))
+    ]
+    if views_updated is not None:
+        timestamps.append(views_updated.timestamp())
+    if group_id is not None:
+        timestamps.append(changed_at(counts.group_scope(group_id)))
+    return _validators(request, (post_id, *timestamps), timestamps)
+
+
+def conditional_page(validators_func):
+    """Отвечает 304, если у клиента актуальная версия страницы.
+
+    validators_func(request, **kwargs) возвращает пару
+    (etag, last_modified) или None, если проверка невозможна.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if (
+                not settings.POSTS_CONDITIONAL_GET
+                or request.method not in ('GET', 'HEAD')
+            ):
+                return view(request, *args, **kwargs)
+            validators = validators_func(request, **kwargs)
+            if validators is None:
+                return view(request, *args, **kwargs)
+            etag, last_modified = validators
+            etag = quote_etag(etag)
+            timestamp = int(last_modified.timestamp())
+            response = get_conditional_response(
+                request, etag=etag, last_modified=timestamp
+            )
+            if response is None:
+                response = view(request, *args, **kwargs)
+            if response.status_code in (200, 304):
+                response.setdefault('ETag', etag)
+                response.setdefault('Last-Modified', http_date(timestamp))
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,80 @@
+"""Кэшируемое количество постов в лентах.
+
+Счётчики хранятся в кэше отдельно для каждой области видимости:
+вся лента, лента группы и лента автора. Сигналы модели Post
+(см. posts/signals.py) сдвигают их на ±1, так что COUNT(*)
+выполняется только при холодном кэше.
+
+С POSTS_COUNT_APPROXIMATE_THRESHOLD подсчёт останавливается на
+threshold + 1 записи. Такое число только говорит «больше порога»:
+оно не кэшируется и не сдвигается, а пагинатор с ним не ограничивает
+номер страницы (см. posts.paginators.ApproximateCountMixin).
+"""
+from django.conf import settings
+from django.core.cache import cache
+
+ALL = 'all'
+CACHE_KEY = 'posts:count:{}'
+
+
+def group_scope(group_id):
+    return f'group:{group_id}'
+
+
+def author_scope(author_id):
+    return f'author:{author_id}'
+
+
+def post_scopes(group_id, author_id):
+    """Области, в которые попадает пост с такими группой и автором."""
+    scopes = [ALL, author_scope(author_id)]
+    if group_id is not None:
+        scopes.append(group_scope(group_id))
+    return scopes
+
+
+def count_queryset(queryset):
+    """Считает записи, останавливаясь на пороге приближённого режима."""
+    queryset = queryset.order_by()
+    threshold = settings.POSTS_COUNT_APPROXIMATE_THRESHOLD
+    if threshold is None:
+        return queryset.count()
+    return queryset[:threshold + 1].count()
+
+
+def is_approximate(count):
+    """True, если count — не точное количество, а «больше порога»."""
+    threshold = settings.POSTS_COUNT_APPROXIMATE_THRESHOLD
+    return threshold is not None and count > threshold
+
+
+def get_count(queryset, scope):
+    """Количество постов в области scope, по возможности из кэша."""
+    key = CACHE_KEY.format(scope)
+    count = cache.get(key)
+    if count is None:
+        count = count_queryset(queryset)
+        if not is_approximate(count):
+            cache.add(key, count, settings.POSTS_COUNT_CACHE_TIMEOUT)
+    return count
+
+
+def change(scopes, delta):
+    """Сдвигает закэшированные счётчики; холодные ключи пропускает.
+
+    Счётчик, перешедший порог, удаляется: в кэше лежат только точные
+    значения не больше порога.
+    """
+    for scope in scopes:
+        key = CACHE_KEY.format(scope)
+        try:
+            count = cache.incr(key, delta)
+        except ValueError:
+            continue
+        if is_approximate(count):
+            cache.delete(key)
+
+
+def reset(scopes):
+    """Сбрасывает счётчики: следующий запрос посчитает их заново."""
+    cache.delete_many([CACHE_KEY.format(scope) for scope in scopes])
@@ -0,0 +1,37 @@
+"""Версии закэшированных карточек постов (includes/post_card.html).
+
+Карточка печатает имя автора, название и slug группы, а пост при их
+смене не сохраняется. Поэтому в ключ фрагмента кроме id и времени
+изменения поста входит версия автора и группы: сигналы User и Group
+сдвигают её при переименовании, и все карточки автора или группы
+собираются заново без перебора их постов. Обе версии читаются одним
+запросом к кэшу.
+"""
+import time
+
+from django.core.cache import cache
+
+from . import counts
+
+VERSION_KEY = 'posts:card-version:{}'
+
+
+def bump(scopes):
+    """Сдвигает версии областей (см. posts.counts)."""
+    now = time.time()
+    cache.set_many({VERSION_KEY.format(scope): now for scope in scopes}, None)
+
+
+def card_version(author_id, group_id):
+    scopes = [counts.author_scope(author_id)]
+    if group_id is not None:
+        scopes.append(counts.group_scope(group_id))
+    keys = [VERSION_KEY.format(scope) for scope in scopes]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            # Как и у поколений страниц: начинаем с текущего времени,
+            # чтобы вытесненная версия не оживила старые карточки.
+            cache.add(key, time.time(), None)
+            versions[key] = cache.get(key)
+    return ':'.join(str(versions[key]) for key in keys)
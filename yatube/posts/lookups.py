@@ -0,0 +1,217 @@
+"""Кэш групп по slug и авторов по username в памяти процесса.
+
+Лента группы и профиль ищут свой объект на каждый запрос, хотя группы
+почти не меняются, а популярных авторов открывают постоянно. Здесь
+объекты лежат в ограниченном LRU с TTL. Автор хранится вместе со
+статистикой (AuthorStats), поэтому сигналы выбрасывают его из кэша
+не только при сохранении пользователя, но и при новых постах и
+подписках. У автора загружаются только логин, имя и статистика:
+хеш пароля и почта не попадают ни в LRU, ни в общий кэш.
+
+Сигналы чистят кэш только своего процесса. С POSTS_LOOKUP_SHARED_CACHE
+промах в LRU сначала ищется в общем кэше Django, а сигналы удаляют
+ключи и там; чужие LRU устаревают не дольше чем на TTL.
+
+Объекты из кэша общие для всех запросов процесса: их нельзя менять.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import Http404
+
+from .models import Group, User
+
+SHARED_KEY = 'posts:lookup:{}:{}'
+MISSING = object()
+
+
+class LRUCache:
+    """Потокобезопасный LRU с ограничением размера и временем жизни.
+
+    index(value) задаёт второй ключ записи (например, pk объекта),
+    по которому её можно удалить через delete_indexed. Обратный
+    индекс меняется вместе с записями, так что он не больше LRU.
+    """
+
+    def __init__(self, maxsize, ttl, clock=time.monotonic, index=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self.index = index
+        self._data = OrderedDict()
+        self._keys = {}
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+
+    def _forget(self, key, value):
+        if self.index is None:
+            return
+        item_id = self.index(value)
+        keys = self._keys.get(item_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys[item_id]
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None and item[0] > self.clock():
+                self._data.move_to_end(key)
+                self.hits += 1
+                return item[1]
+            if item is not None:
+                del self._data[key]
+                self._forget(key, item[1])
+            self.misses += 1
+            return MISSING
+
+    def set(self, key, value):
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None:
+                self._forget(key, item[1])
+            self._data[key] = (self.clock() + self.ttl, value)
+            self._data.move_to_end(key)
+            if self.index is not None:
+                self._keys.setdefault(self.index(value), set()).add(key)
+            while len(self._data) > self.maxsize:
+                old_key, (_, old_value) = self._data.popitem(last=False)
+                self._forget(old_key, old_value)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            item = self._data.pop(key, None)
+            if item is not None:
+                self._forget(key, item[1])
+
+    def delete_indexed(self, item_id):
+        """Удаляет записи с index(value) == item_id, возвращает их ключи."""
+        with self._lock:
+            keys = self._keys.pop(item_id, set())
+            for key in keys:
+                del self._data[key]
+            return keys
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._keys.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                'size': len(self._data),
+                'indexed': len(self._keys),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / requests if requests else 0,
+            }
+
+
+class Lookup:
+    """Поиск объектов одной модели по ключу через LRU и общий кэш."""
+
+    def __init__(self, name, queryset, field):
+        self.name = name
+        self.queryset = queryset
+        self.field = field
+        # Индекс по pk, чтобы сигналы с одним id находили запись.
+        self.cache = LRUCache(
+            settings.POSTS_LOOKUP_CACHE_SIZE, settings.POSTS_LOOKUP_CACHE_TTL,
+            index=lambda obj: obj.pk
+        )
+
+    def get(self, key):
+        if not settings.POSTS_LOOKUP_CACHE:
+            return self.load(key)
+        obj = self.cache.get(key)
+        if obj is not MISSING:
+            return obj
+        shared_key = SHARED_KEY.format(self.name, key)
+        obj = None
+        if settings.POSTS_LOOKUP_SHARED_CACHE:
+            obj = cache.get(shared_key)
+        if obj is None:
+            obj = self.load(key)
+            if settings.POSTS_LOOKUP_SHARED_CACHE:
+                cache.set(shared_key, obj, settings.POSTS_LOOKUP_CACHE_TTL)
+        self.cache.set(key, obj)
+        return obj
+
+    def load(self, key):
+        try:
+            return self.queryset.get(**{self.field: key})
+        except self.queryset.model.DoesNotExist:
+            raise Http404
+
+    def evict(self, pk, *keys):
+        """Выбрасывает объект pk; keys — его известные ключи, в том
+        числе прежние, если ключ только что сменился."""
+        keys = (set(keys) | self.cache.delete_indexed(pk)) - {None}
+        if not keys and settings.POSTS_LOOKUP_SHARED_CACHE:
+            keys = set(self.queryset.filter(pk=pk).values_list(
+                self.field, flat=True
+            ))
+        for key in keys:
+            self.cache.delete(key)
+        if settings.POSTS_LOOKUP_SHARED_CACHE:
+            cache.delete_many(
+                [SHARED_KEY.format(self.name, key) for key in keys]
+            )
+
+
+groups = Lookup('group', Group.objects.all(), 'slug')
+authors = Lookup(
+    'author',
+    User.objects.select_related('stats').only(
+        'username', 'first_name', 'last_name',
+        'stats__post_count', 'stats__follower_count',
+    ),
+    'username'
+)
+
+
+def get_group(slug):
+    """Группа по slug; Http404, если её нет."""
+    return groups.get(slug)
+
+
+def get_author(username):
+    """Пользователь со статистикой по username; Http404, если его нет."""
+    return authors.get(username)
+
+
+def clear():
+    groups.cache.clear()
+    authors.cache.clear()
+
+
+def stats():
+    return {'group': groups.cache.stats(), 'author': authors.cache.stats()}
+
+
+def collect():
+    """Показатели кэша для core.metrics."""
+    described = (
+        ('hits', 'hits_total', 'Попадания в кэш.', 'counter'),
+        ('misses', 'misses_total', 'Промахи кэша.', 'counter'),
+        ('evictions', 'evictions_total', 'Вытеснения по размеру.',
+         'counter'),
+        ('size', 'size', 'Число записей в LRU.', 'gauge'),
+    )
+    values = stats()
+    for field, metric, help_text, kind in described:
+        for name, cache_stats in values.items():
+            yield (
+                f'lookup_cache_{metric}', help_text, kind,
+                {'cache': name}, cache_stats[field]
+            )
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from posts import view_counts
+
+
+class Command(BaseCommand):
+    help = 'Записывает накопленные в кэше просмотры постов в базу.'
+
+    def handle(self, *args, **options):
+        flushed = view_counts.flush()
+        self.stdout.write(self.style.SUCCESS(
+            f'Записано просмотров: {flushed}'
+        ))
@@ -0,0 +1,115 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from posts.models import Post
+
+
+def _init_worker():
+    import django
+    django.setup()
+
+
+def _generate(post_ids):
+    from posts import thumbnails
+    return thumbnails.generate_for_posts(post_ids)
+
+
+class Command(BaseCommand):
+    help = (
+        'Заранее строит миниатюры картинок всех постов. '
+        'Прогресс сохраняется, прерванный запуск продолжается с места '
+        'остановки.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count(),
+            help='Количество процессов.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=50,
+            help='Сколько постов отдавать процессу за раз.'
+        )
+        parser.add_argument(
+            '--progress-file',
+            default=os.path.join(settings.MEDIA_ROOT, '.thumbnails_progress'),
+            help='Файл, где хранится id последнего обработанного поста.'
+        )
+        parser.add_argument(
+            '--restart', action='store_true',
+            help='Начать заново, не глядя на сохранённый прогресс.'
+        )
+
+    def read_progress(self, path):
+        try:
+            with open(path) as progress:
+                return int(progress.read().strip() or 0)
+        except (OSError, ValueError):
+            return 0
+
+    def write_progress(self, path, last_pk):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path + '.tmp', 'w') as progress:
+            progress.write(str(last_pk))
+        os.replace(path + '.tmp', path)
+
+    def batches(self, start_pk, batch_size):
+        ids = (
+            Post.objects.exclude(image='').filter(pk__gt=start_pk)
+            .order_by('pk').values_list('pk', flat=True)
+        )
+        batch = []
+        for pk in ids.iterator():
+            batch.append(pk)
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def handle(self, *args, **options):
+        path = options['progress_file']
+        start_pk = 0 if options['restart'] else self.read_progress(path)
+        if start_pk:
+            self.stdout.write(f'Продолжаем после поста {start_pk}')
+        batches = list(self.batches(start_pk, options['batch_size']))
+        total = sum(map(len, batches))
+        # Дочерние процессы не должны наследовать открытые соединения.
+        connections.close_all()
+
+        done = failed = 0
+        finished = set()
+        next_batch = 0
+        started = time.monotonic()
+        with ProcessPoolExecutor(
+            max_workers=options['workers'], initializer=_init_worker
+        ) as executor:
+            futures = {
+                executor.submit(_generate, batch): index
+                for index, batch in enumerate(batches)
+            }
+            for future in as_completed(futures):
+                batch_done, batch_failed = future.result()
+                done += batch_done
+                failed += batch_failed
+                finished.add(futures[future])
+                # Сохраняем прогресс только по непрерывному префиксу
+                # пачек, чтобы после перезапуска ничего не пропустить.
+                while next_batch in finished:
+                    next_batch += 1
+                if next_batch:
+                    self.write_progress(path, batches[next_batch - 1][-1])
+                elapsed = time.monotonic() - started
+                self.stdout.write(
+                    f'{done + failed}/{total} картинок, '
+                    f'{(done + failed) / elapsed:.1f} в секунду'
+                )
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово: {done}, с ошибками: {failed}, '
+            f'за {time.monotonic() - started:.1f} с'
+        ))
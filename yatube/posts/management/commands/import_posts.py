@@ -0,0 +1,182 @@
+import csv
+import io
+import json
+import sys
+import time
+from collections import Counter
+from contextlib import contextmanager
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from posts import cards, conditional, counts, search, stats, timeline
+from posts.models import Group, Post, User
+from posts.signals import invalidate_pages
+
+FORMATS = ('ndjson', 'csv')
+
+
+@contextmanager
+def keep_pub_date():
+    """Не даёт auto_now_add затереть pub_date из файла."""
+    field = Post._meta.get_field('pub_date')
+    field.auto_now_add = False
+    try:
+        yield
+    finally:
+        field.auto_now_add = True
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает посты из NDJSON или CSV пачками через bulk_create. '
+        'Поля записи: text, author (username), group (slug, необязательно), '
+        'pub_date (ISO 8601, необязательно).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', help='Файл с постами, «-» — стандартный ввод.'
+        )
+        parser.add_argument(
+            '--format', choices=FORMATS,
+            help='Формат файла; по умолчанию определяется по расширению.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Сколько постов вставлять за одну транзакцию.'
+        )
+
+    def read_rows(self, stream, file_format):
+        if file_format == 'csv':
+            yield from csv.DictReader(stream)
+            return
+        for number, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError as error:
+                raise CommandError(f'Строка {number}: {error}')
+
+    def parse_pub_date(self, value, default):
+        pub_date = parse_datetime(value or '')
+        if pub_date is None:
+            return default
+        if timezone.is_naive(pub_date):
+            pub_date = timezone.make_aware(pub_date)
+        return pub_date
+
+    def resolve_authors(self, rows):
+        """Дополняет карту username -> id авторами из пачки."""
+        missing = {row.get('author') for row in rows} - self.authors.keys()
+        self.authors.update(
+            User.objects.filter(username__in=missing)
+            .values_list('username', 'pk')
+        )
+
+    def build_posts(self, rows):
+        self.resolve_authors(rows)
+        now = timezone.now()
+        posts = []
+        for row in rows:
+            author_id = self.authors.get(row.get('author'))
+            group_slug = row.get('group') or None
+            if author_id is None or (
+                group_slug is not None and group_slug not in self.groups
+            ):
+                self.skipped += 1
+                continue
+            post = Post(
+                text=row.get('text') or '',
+                author_id=author_id,
+                group_id=self.groups.get(group_slug),
+                pub_date=self.parse_pub_date(row.get('pub_date'), now),
+            )
+            post.render_text()
+            posts.append(post)
+        return posts
+
+    def insert(self, posts):
+        if not posts:
+            return
+        with transaction.atomic():
+            Post.objects.bulk_create(posts)
+            # SQLite не возвращает id из bulk_create: запоминаем
+            # верхнюю границу загруженного диапазона.
+            self.until_pk = Post.objects.aggregate(
+                last=Max('pk')
+            )['last']
+        self.group_counts.update(
+            post.group_id for post in posts if post.group_id is not None
+        )
+        self.author_counts.update(post.author_id for post in posts)
+
+    def refresh_derived(self, last_pk):
+        """Один раз обновляет всё, что сигналы обновляют на каждый пост.
+
+        Посты, сохранённые через сайт во время импорта, попадают
+        в тот же диапазон id, но их карточки, строки поиска и ленты
+        уже собрали сигналы: вставки их пропускают, а счётчики
+        сдвигаются только на число загруженных постов.
+        """
+        if self.until_pk is None:
+            return
+        for author_id, number in self.author_counts.items():
+            stats.change_author_count(author_id, number)
+        for group_id, number in self.group_counts.items():
+            stats.change_group_count(group_id, number)
+        timeline.fan_out_after(last_pk, self.until_pk)
+        cards.rebuild(after_pk=last_pk, until_pk=self.until_pk)
+        if search.available():
+            search.rebuild(after_pk=last_pk, until_pk=self.until_pk)
+        scopes = [counts.ALL]
+        scopes += map(counts.author_scope, self.author_counts)
+        scopes += map(counts.group_scope, self.group_counts)
+        counts.reset(scopes)
+        conditional.touch(scopes)
+        invalidate_pages(set(self.group_counts), set(self.author_counts))
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or (
+            'csv' if path.endswith('.csv') else 'ndjson'
+        )
+        batch_size = options['batch_size']
+        self.groups = dict(Group.objects.values_list('slug', 'pk'))
+        self.authors = {}
+        self.group_counts = Counter()
+        self.author_counts = Counter()
+        self.until_pk = None
+        self.skipped = 0
+        last_pk = Post.objects.aggregate(last=Max('pk'))['last'] or 0
+
+        if path == '-':
+            stream = io.TextIOWrapper(sys.stdin.buffer, encoding='utf-8')
+        else:
+            stream = open(path, encoding='utf-8', newline='')
+        imported = 0
+        started = time.monotonic()
+        with stream, keep_pub_date():
+            rows = self.read_rows(stream, file_format)
+            while True:
+                batch = list(islice(rows, batch_size))
+                if not batch:
+                    break
+                posts = self.build_posts(batch)
+                self.insert(posts)
+                imported += len(posts)
+                elapsed = time.monotonic() - started
+                self.stdout.write(
+                    f'{imported} постов, {imported / elapsed:.0f} в секунду'
+                )
+        self.refresh_derived(last_pk)
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Загружено: {imported}, пропущено: {self.skipped}, '
+            f'за {elapsed:.1f} с ({imported / (elapsed or 1):.0f} в секунду)'
+        ))
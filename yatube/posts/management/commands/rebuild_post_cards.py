@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from posts import cards
+
+
+class Command(BaseCommand):
+    help = 'Заново собирает карточки постов для лент (PostCard).'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=5000,
+            help='Диапазон id постов, пересобираемый за одну транзакцию.'
+        )
+
+    def handle(self, *args, **options):
+        written = cards.rebuild(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Собрано карточек: {written}'
+        ))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from posts import stats
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает хранимые счётчики постов групп и авторов.'
+
+    def handle(self, *args, **options):
+        groups, authors = stats.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f'Пересчитано групп: {groups}, авторов: {authors}'
+        ))
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from posts import popularity
+from posts.tasks import refresh_popularity
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает рейтинг популярных постов (PostPopularity).'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full', action='store_true',
+            help='Пересчитать все посты, а не только изменившиеся.'
+        )
+        parser.add_argument(
+            '--enqueue', action='store_true',
+            help='Поставить пересчёт в очередь jobs вместо выполнения.'
+        )
+
+    def handle(self, *args, **options):
+        if options['enqueue']:
+            refresh_popularity.enqueue(full=options['full'])
+            self.stdout.write(self.style.SUCCESS('Пересчёт в очереди'))
+            return
+        refreshed = popularity.refresh(full=options['full'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Пересчитано постов: {refreshed}'
+        ))
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Заполняет сохранённый HTML и выдержку текста постов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Сколько постов обновлять за один запрос.'
+        )
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Перерисовать все посты, а не только незаполненные.'
+        )
+
+    def handle(self, *args, **options):
+        posts = Post.objects.order_by('pk').only('pk', 'text')
+        if not options['all']:
+            posts = posts.filter(text_html='')
+        batch_size = options['batch_size']
+        last_pk = 0
+        rendered = 0
+        while True:
+            batch = list(posts.filter(pk__gt=last_pk)[:batch_size])
+            if not batch:
+                break
+            for post in batch:
+                post.render_text()
+            Post.objects.bulk_update(batch, ['text_html', 'excerpt'])
+            last_pk = batch[-1].pk
+            rendered += len(batch)
+        self.stdout.write(self.style.SUCCESS(
+            f'Обработано постов: {rendered}'
+        ))
@@ -0,0 +1,46 @@
+# Generated by Django 2.2.16 on 2026-10-18 19:46
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0015_follow_timeline'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostCard',
+            fields=[
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='card', serialize=False, to='posts.Post', verbose_name='Пост')),
+                ('pub_date', models.DateTimeField(verbose_name='Дата публикации')),
+                ('updated', models.DateTimeField(verbose_name='Дата изменения')),
+                ('excerpt', models.CharField(blank=True, max_length=300, verbose_name='Начало текста')),
+                ('author_id', models.IntegerField(verbose_name='Автор')),
+                ('author_username', models.CharField(max_length=150, verbose_name='Логин автора')),
+                ('author_full_name', models.CharField(blank=True, max_length=300, verbose_name='Имя автора')),
+                ('group_id', models.IntegerField(blank=True, null=True, verbose_name='Группа')),
+                ('group_slug', models.CharField(blank=True, max_length=50, verbose_name='Slug группы')),
+                ('group_title', models.CharField(blank=True, max_length=200, verbose_name='Название группы')),
+            ],
+            options={
+                'verbose_name': 'Карточка поста',
+                'verbose_name_plural': 'Карточки постов',
+                'ordering': ('-pub_date',),
+            },
+        ),
+        migrations.AddIndex(
+            model_name='postcard',
+            index=models.Index(fields=['pub_date', 'post'], name='card_pub_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='postcard',
+            index=models.Index(fields=['group_id', 'pub_date'], name='card_group_pub_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='postcard',
+            index=models.Index(fields=['author_id', 'pub_date'], name='card_author_pub_date_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 2.2.16 on 2026-10-18 19:55
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0016_post_card'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostViewCount',
+            fields=[
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='view_count', serialize=False, to='posts.Post', verbose_name='Пост')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='Просмотров')),
+            ],
+            options={
+                'verbose_name': 'Просмотры поста',
+                'verbose_name_plural': 'Просмотры постов',
+            },
+        ),
+    ]
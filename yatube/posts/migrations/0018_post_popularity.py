@@ -0,0 +1,41 @@
+# Generated by Django 2.2.16 on 2026-10-18 19:58
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0017_post_view_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostPopularity',
+            fields=[
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='popularity', serialize=False, to='posts.Post', verbose_name='Пост')),
+                ('score', models.FloatField(verbose_name='Рейтинг')),
+                ('views', models.PositiveIntegerField(default=0, verbose_name='Просмотров')),
+                ('group_activity', models.PositiveIntegerField(default=0, verbose_name='Активность группы')),
+                ('refreshed', models.DateTimeField(db_index=True, verbose_name='Дата пересчёта')),
+            ],
+            options={
+                'verbose_name': 'Рейтинг поста',
+                'verbose_name_plural': 'Рейтинги постов',
+            },
+        ),
+        migrations.AddField(
+            model_name='postviewcount',
+            name='updated',
+            field=models.DateTimeField(auto_now=True, db_index=True, verbose_name='Дата изменения'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['updated'], name='post_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='postpopularity',
+            index=models.Index(fields=['score', 'post'], name='popularity_score_idx'),
+        ),
+    ]
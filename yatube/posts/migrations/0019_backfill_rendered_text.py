@@ -0,0 +1,46 @@
+from django.db import migrations
+from django.utils.html import linebreaks
+from django.utils.text import Truncator
+
+EXCERPT_LENGTH = 300
+BATCH_SIZE = 500
+
+
+def render_text(apps, schema_editor):
+    """Заполняет text_html и excerpt постов, созданных до 0013.
+
+    То же, что Post.render_text() и команда render_post_text:
+    у исторической модели в миграции методов нет. Выдержка
+    копируется и в уже собранные карточки PostCard.
+    """
+    Post = apps.get_model('posts', 'Post')
+    PostCard = apps.get_model('posts', 'PostCard')
+    posts = Post.objects.filter(text_html='').order_by('pk').only(
+        'pk', 'text'
+    )
+    last_pk = 0
+    while True:
+        batch = list(posts.filter(pk__gt=last_pk)[:BATCH_SIZE])
+        if not batch:
+            break
+        for post in batch:
+            post.text_html = linebreaks(post.text, autoescape=True)
+            post.excerpt = Truncator(post.text).chars(EXCERPT_LENGTH)
+        Post.objects.bulk_update(batch, ['text_html', 'excerpt'])
+        excerpts = {post.pk: post.excerpt for post in batch}
+        cards = list(PostCard.objects.filter(pk__in=excerpts, excerpt=''))
+        for card in cards:
+            card.excerpt = excerpts[card.pk]
+        PostCard.objects.bulk_update(cards, ['excerpt'])
+        last_pk = batch[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0018_post_popularity'),
+    ]
+
+    operations = [
+        migrations.RunPython(render_text, migrations.RunPython.noop),
+    ]
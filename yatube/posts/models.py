@@ -1,14 +1,26 @@
+from typing import NamedTuple
+
 from django.db import models
 from django.contrib.auth import get_user_model
+from django.utils.functional import cached_property
+from django.utils.html import linebreaks
+from django.utils.text import Truncator
 
 
 User = get_user_model()
 
+EXCERPT_LENGTH = 300
+
 
 class Group(models.Model):
     title = models.CharField(max_length=200)
     slug = models.SlugField(unique=True, max_length=50)
     description = models.TextField()
+    post_count = models.PositiveIntegerField(
+        'Количество постов',
+        default=0,
+        editable=False
+    )
 
     def __str__(self):
         return self.title
@@ -19,10 +31,25 @@ class Post(models.Model):
         'Текст поста',
         help_text='Напишите свой пост'
     )
+    text_html = models.TextField(
+        'Текст поста в HTML',
+        blank=True,
+        editable=False
+    )
+    excerpt = models.CharField(
+        'Начало текста',
+        max_length=EXCERPT_LENGTH,
+        blank=True,
+        editable=False
+    )
     pub_date = models.DateTimeField(
         'Дата публикации',
         auto_now_add=True
     )
+    updated = models.DateTimeField(
+        'Дата изменения',
+        auto_now=True
+    )
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -51,6 +78,285 @@ class Post(models.Model):
         ordering = ('-pub_date',)
         verbose_name = 'Пост'
         verbose_name_plural = 'Посты'
+        # Индексы повторяют выборки лент: общая лента и курсорная
+        # пагинация идут по (pub_date, id), лента группы и профиль
+        # фильтруют по группе или автору и сортируют по pub_date.
+        indexes = (
+            models.Index(
+                fields=('pub_date', 'id'), name='post_pub_date_id_idx'
+            ),
+            models.Index(
+                fields=('group', 'pub_date'), name='post_group_pub_date_idx'
+            ),
+            models.Index(
+                fields=('author', 'pub_date'), name='post_author_pub_date_idx'
+            ),
+            # По нему posts.popularity находит изменённые посты.
+            models.Index(fields=('updated',), name='post_updated_idx'),
+        )
+
+    def __str__(self):
+        return self.text[:15]
+
+    def save(self, *args, **kwargs):
+        self.render_text()
+        super().save(*args, **kwargs)
+
+    def render_text(self):
+        """Готовит HTML тела и короткую выдержку для лент."""
+        self.text_html = linebreaks(self.text, autoescape=True)
+        self.excerpt = Truncator(self.text).chars(EXCERPT_LENGTH)
+
+
+class AuthorStats(models.Model):
+    """Хранимые счётчики автора, чтобы не считать его посты."""
+    author = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+        verbose_name='Автор'
+    )
+    post_count = models.PositiveIntegerField(
+        'Количество постов',
+        default=0
+    )
+    follower_count = models.PositiveIntegerField(
+        'Количество подписчиков',
+        default=0
+    )
+
+    class Meta:
+        verbose_name = 'Статистика автора'
+        verbose_name_plural = 'Статистика авторов'
+
+    def __str__(self):
+        return f'{self.author}: {self.post_count}'
+
+
+class PostViewCount(models.Model):
+    """Сохранённое число просмотров поста.
+
+    Отдельная таблица, а не поле Post: просмотры дописываются пачками
+    (posts.view_counts), и сохранение поста из формы не затирает их
+    значением, прочитанным до редактирования.
+    """
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='view_count',
+        verbose_name='Пост'
+    )
+    count = models.PositiveIntegerField('Просмотров', default=0)
+    updated = models.DateTimeField(
+        'Дата изменения',
+        auto_now=True,
+        db_index=True
+    )
+
+    class Meta:
+        verbose_name = 'Просмотры поста'
+        verbose_name_plural = 'Просмотры постов'
+
+    def __str__(self):
+        return f'{self.post_id}: {self.count}'
+
+
+class PostPopularity(models.Model):
+    """Сохранённый рейтинг поста для ленты популярного.
+
+    Строки пересчитывает posts.popularity только для постов,
+    изменившихся с прошлого прогона, а лента читает первые строки
+    индекса по score.
+    """
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='popularity',
+        verbose_name='Пост'
+    )
+    score = models.FloatField('Рейтинг')
+    views = models.PositiveIntegerField('Просмотров', default=0)
+    group_activity = models.PositiveIntegerField(
+        'Активность группы',
+        default=0
+    )
+    refreshed = models.DateTimeField('Дата пересчёта', db_index=True)
+
+    class Meta:
+        verbose_name = 'Рейтинг поста'
+        verbose_name_plural = 'Рейтинги постов'
+        indexes = (
+            models.Index(
+                fields=('score', 'post'), name='popularity_score_idx'
+            ),
+        )
 
     def __str__(self):
-        return self.text[:15]
\ No newline at end of file
+        return f'{self.post_id}: {self.score:.3f}'
+
+
+class Follow(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='follower',
+        verbose_name='Подписчик'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='following',
+        verbose_name='Автор'
+    )
+
+    class Meta:
+        verbose_name = 'Подписка'
+        verbose_name_plural = 'Подписки'
+        constraints = (
+            models.UniqueConstraint(
+                fields=('user', 'author'), name='unique_follow'
+            ),
+            models.CheckConstraint(
+                check=~models.Q(user=models.F('author')),
+                name='no_self_follow'
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.user} -> {self.author}'
+
+
+class TimelineEntry(models.Model):
+    """Пост в ленте подписок пользователя, разложенный при публикации.
+
+    pub_date и автор копируются из поста, чтобы лента читалась
+    по одному индексу (user, pub_date, post) без соединения с постами,
+    а отписка удаляла записи автора без подзапроса.
+    """
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='timeline',
+        db_index=False,
+        verbose_name='Читатель'
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='timeline_entries',
+        verbose_name='Пост'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+        db_index=False,
+        verbose_name='Автор'
+    )
+    pub_date = models.DateTimeField('Дата публикации')
+
+    class Meta:
+        verbose_name = 'Запись ленты подписок'
+        verbose_name_plural = 'Записи лент подписок'
+        constraints = (
+            models.UniqueConstraint(
+                fields=('user', 'post'), name='unique_timeline_entry'
+            ),
+        )
+        indexes = (
+            models.Index(
+                fields=('user', 'pub_date', 'post'),
+                name='timeline_user_pub_date_idx'
+            ),
+        )
+
+
+class CardAuthor(NamedTuple):
+    username: str
+    full_name: str
+
+    def get_full_name(self):
+        return self.full_name
+
+
+class CardGroup(NamedTuple):
+    slug: str
+    title: str
+
+
+class PostCard(models.Model):
+    """Карточка поста для лент: всё, что печатает post_card.html.
+
+    Имя автора, slug и название группы скопированы из связанных
+    таблиц, так что лента читается из одной таблицы без соединений.
+    Автор и группа хранятся числами, а не внешними ключами: свойства
+    author и group отдают скопированные поля в том же виде, что и у
+    Post. Строки поддерживают сигналы (posts.cards), команда
+    rebuild_post_cards собирает их заново.
+    """
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='card',
+        verbose_name='Пост'
+    )
+    pub_date = models.DateTimeField('Дата публикации')
+    updated = models.DateTimeField('Дата изменения')
+    excerpt = models.CharField(
+        'Начало текста',
+        max_length=EXCERPT_LENGTH,
+        blank=True
+    )
+    author_id = models.IntegerField('Автор')
+    author_username = models.CharField('Логин автора', max_length=150)
+    author_full_name = models.CharField(
+        'Имя автора',
+        max_length=300,
+        blank=True
+    )
+    group_id = models.IntegerField('Группа', blank=True, null=True)
+    group_slug = models.CharField('Slug группы', max_length=50, blank=True)
+    group_title = models.CharField(
+        'Название группы',
+        max_length=200,
+        blank=True
+    )
+
+    class Meta:
+        ordering = ('-pub_date',)
+        verbose_name = 'Карточка поста'
+        verbose_name_plural = 'Карточки постов'
+        indexes = (
+            models.Index(
+                fields=('pub_date', 'post'), name='card_pub_date_idx'
+            ),
+            models.Index(
+                fields=('group_id', 'pub_date'),
+                name='card_group_pub_date_idx'
+            ),
+            models.Index(
+                fields=('author_id', 'pub_date'),
+                name='card_author_pub_date_idx'
+            ),
+        )
+
+    def __str__(self):
+        return self.excerpt[:15]
+
+    @property
+    def id(self):
+        return self.post_id
+
+    @cached_property
+    def author(self):
+        return CardAuthor(self.author_username, self.author_full_name)
+
+    @cached_property
+    def group(self):
+        if self.group_id is None:
+            return None
+        return CardGroup(self.group_slug, self.group_title)
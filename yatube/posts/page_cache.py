@@ -0,0 +1,116 @@
+"""Кэш целых страниц лент для анонимных читателей.
+
+Ключ страницы включает область ленты (вся лента, группа по slug,
+автор по username), номер поколения этой области, путь и токен
+страницы. Сигналы Post, Group и User увеличивают поколение только
+затронутых областей: старые ключи просто перестают читаться и
+истекают по таймауту, остальной сайт остаётся в кэше.
+"""
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+
+ALL = 'all'
+GENERATION_KEY = 'posts:page-gen:{}'
+PAGE_KEY = 'posts:page:{}:{}:{}'
+STATS_KEY = 'posts:page-stats:{}'
+STATS = ('hits', 'misses', 'invalidations')
+PAGE_PARAMS = ('page', 'after', 'before')
+
+
+def global_scope():
+    return ALL
+
+
+def group_scope(slug):
+    return f'group:{slug}'
+
+
+def author_scope(username):
+    return f'author:{username}'
+
+
+def _hash(value):
+    return hashlib.md5(value.encode()).hexdigest()
+
+
+def _count(name, delta=1):
+    key = STATS_KEY.format(name)
+    try:
+        cache.incr(key, delta)
+    except ValueError:
+        cache.add(key, 0, None)
+        cache.incr(key, delta)
+
+
+def get_generation(scope):
+    key = GENERATION_KEY.format(_hash(scope))
+    generation = cache.get(key)
+    if generation is None:
+        # Начинаем с текущего времени, а не с единицы: если ключ
+        # поколения вытеснят из кэша, старые страницы не оживут.
+        generation = int(time.time() * 1000)
+        if not cache.add(key, generation, None):
+            generation = cache.get(key, generation)
+    return generation
+
+
+def invalidate(scopes):
+    """Сдвигает поколения областей, их страницы больше не читаются."""
+    for scope in set(scopes):
+        key = GENERATION_KEY.format(_hash(scope))
+        try:
+            cache.incr(key)
+        except ValueError:
+            get_generation(scope)
+        _count('invalidations')
+
+
+def page_key(request, scope):
+    token = '&'.join(
+        f'{param}={request.GET.get(param, "")}' for param in PAGE_PARAMS
+    )
+    return PAGE_KEY.format(
+        _hash(scope), get_generation(scope),
+        _hash(f'{request.path}?{token}')
+    )
+
+
+def stats():
+    """Счётчики попаданий, промахов и сбросов для мониторинга."""
+    values = cache.get_many([STATS_KEY.format(name) for name in STATS])
+    return {
+        name: values.get(STATS_KEY.format(name), 0) for name in STATS
+    }
+
+
+def cache_anonymous_page(scope_func):
+    """Кэширует страницу ленты для анонимных GET-запросов.
+
+    scope_func получает именованные аргументы представления
+    и возвращает область ленты, от которой зависит страница.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if (
+                not settings.POSTS_PAGE_CACHE
+                or request.method != 'GET'
+                or request.user.is_authenticated
+            ):
+                return view(request, *args, **kwargs)
+            key = page_key(request, scope_func(**kwargs))
+            response = cache.get(key)
+            if response is not None:
+                _count('hits')
+                return response
+            _count('misses')
+            response = view(request, *args, **kwargs)
+            if response.status_code == 200 and not response.streaming:
+                cache.set(key, response, settings.POSTS_PAGE_CACHE_TIMEOUT)
+            return response
+        return wrapper
+    return decorator
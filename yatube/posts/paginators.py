@@ -0,0 +1,283 @@
+import base64
+import collections.abc
+import json
+
+from django.conf import settings
+from django.core.paginator import (
+    EmptyPage, Page, PageNotAnInteger, Paginator,
+)
+from django.db.models import Q, QuerySet
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+
+from . import counts
+
+
+def encode_cursor(pub_date, pk):
+    """Упаковывает ключ (pub_date, id) в непрозрачный токен для URL."""
+    raw = json.dumps([pub_date.isoformat(), pk], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """Распаковывает токен; для битого токена возвращает None."""
+    if not token:
+        return None
+    try:
+        padding = '=' * (-len(token) % 4)
+        raw = base64.urlsafe_b64decode(token + padding).decode()
+        pub_date, pk = json.loads(raw)
+        pub_date = parse_datetime(pub_date)
+        pk = int(pk)
+    except (ValueError, TypeError, UnicodeDecodeError):
+        return None
+    if pub_date is None:
+        return None
+    return pub_date, pk
+
+
+class KeysetPage(collections.abc.Sequence):
+    """Страница курсорной пагинации.
+
+    Повторяет интерфейс django.core.paginator.Page в той части,
+    которая нужна шаблонам ленты.
+    """
+
+    is_keyset = True
+
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __repr__(self):
+        return '<Keyset page after %s>' % self.previous_cursor
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    def _cursor(self, obj):
+        return encode_cursor(
+            *(getattr(obj, field) for field in self.paginator.cursor_fields)
+        )
+
+    @property
+    def next_cursor(self):
+        if not self._has_next or not self.object_list:
+            return None
+        return self._cursor(self.object_list[-1])
+
+    @property
+    def previous_cursor(self):
+        if not self._has_previous or not self.object_list:
+            return None
+        return self._cursor(self.object_list[0])
+
+
+class KeysetPaginator:
+    """Курсорный пагинатор по ключу (pub_date, id).
+
+    В отличие от Paginator не делает ни COUNT(*), ни OFFSET:
+    каждая страница — это один запрос с условием по ключу
+    последней показанной записи и LIMIT per_page + 1, поэтому
+    её стоимость не зависит от глубины.
+    """
+
+    is_keyset = True
+
+    def __init__(self, object_list, per_page, fields=('pub_date', 'id')):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        self.fields = fields
+        # Поля ключа у объектов страницы: fetch() наследника может
+        # выбирать одни объекты, а отдавать другие.
+        self.cursor_fields = fields
+
+    def _filter(self, queryset, cursor, newer):
+        date_field, pk_field = self.fields
+        pub_date, pk = cursor
+        lookup = 'gt' if newer else 'lt'
+        return queryset.filter(
+            Q(**{f'{date_field}__{lookup}': pub_date})
+            | Q(**{date_field: pub_date, f'{pk_field}__{lookup}': pk})
+        )
+
+    def fetch(self, cursor, newer, limit):
+        """Возвращает до limit объектов за курсором.
+
+        Объекты всегда упорядочены от новых к старым, даже если
+        выборка шла в обратную сторону.
+        """
+        date_field, pk_field = self.fields
+        queryset = self.object_list
+        if cursor is not None:
+            queryset = self._filter(queryset, cursor, newer)
+        if newer:
+            ordering = (date_field, pk_field)
+        else:
+            ordering = (f'-{date_field}', f'-{pk_field}')
+        objects = list(queryset.order_by(*ordering)[:limit])
+        if newer:
+            objects.reverse()
+        return objects
+
+    def page(self, after=None, before=None):
+        limit = self.per_page + 1
+        if before is not None:
+            objects = self.fetch(before, True, limit)
+            has_previous = len(objects) > self.per_page
+            objects = objects[-self.per_page:]
+            return KeysetPage(objects, self, True, has_previous)
+        objects = self.fetch(after, False, limit)
+        has_next = len(objects) > self.per_page
+        return KeysetPage(
+            objects[:self.per_page], self, has_next, after is not None
+        )
+
+    def get_page(self, after_token=None, before_token=None):
+        """Аналог Paginator.get_page: битый токен даёт первую страницу."""
+        before = decode_cursor(before_token)
+        if before is not None:
+            page = self.page(before=before)
+            if page:
+                return page
+            return self.page()
+        return self.page(after=decode_cursor(after_token))
+
+
+class ApproximatePage(Page):
+    """Страница ленты, длина которой известна только до порога."""
+
+    def __init__(self, object_list, number, paginator, has_next):
+        super().__init__(object_list, number, paginator)
+        self._has_next = has_next
+
+    def has_next(self):
+        return self._has_next
+
+    def end_index(self):
+        return self.start_index() + len(self) - 1
+
+
+class ApproximateCountMixin:
+    """Пагинация, когда count — не точное число, а «больше порога».
+
+    С таким count номер последней страницы неизвестен: номер страницы
+    не ограничивается сверху, а «следующая» есть, пока за страницей
+    находится ещё хотя бы одна запись.
+    """
+
+    _last_page = None
+
+    @property
+    def is_approximate(self):
+        return counts.is_approximate(self.count)
+
+    @property
+    def num_pages(self):
+        """Число страниц; за порогом — не дальше следующей за открытой."""
+        num_pages = super().num_pages
+        page = self._last_page
+        if page is not None:
+            num_pages = max(num_pages, page.number + page.has_next())
+        return num_pages
+
+    def validate_number(self, number):
+        if not self.is_approximate:
+            return super().validate_number(number)
+        try:
+            if isinstance(number, float) and not number.is_integer():
+                raise ValueError
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger('Номер страницы — не целое число')
+        if number < 1:
+            raise EmptyPage('Номер страницы меньше 1')
+        return number
+
+    def page(self, number):
+        if not self.is_approximate:
+            return super().page(number)
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        top = bottom + self.per_page
+        # Лишняя запись показывает, есть ли следующая страница.
+        objects = list(self.object_list[bottom:top + 1])
+        if not objects:
+            raise EmptyPage('На этой странице нет записей')
+        page_objects = objects[:self.per_page]
+        if isinstance(self.object_list, QuerySet):
+            # Админке нужен queryset страницы: отдаём срез с уже
+            # прочитанными строками, без второго запроса.
+            page_objects = self.object_list[bottom:top]
+            page_objects._result_cache = objects[:self.per_page]
+        self._last_page = ApproximatePage(
+            page_objects, number, self, len(objects) > self.per_page
+        )
+        return self._last_page
+
+    def get_page(self, number):
+        try:
+            return super().get_page(number)
+        except EmptyPage:
+            # Номер за настоящим концом ленты: как и Paginator, отдаём
+            # последнюю известную страницу.
+            return self.page(self.num_pages)
+
+
+class CachedCountPaginator(ApproximateCountMixin, Paginator):
+    """Paginator, который берёт количество постов из posts.counts.
+
+    scope — область ленты (counts.ALL, counts.group_scope(...),
+    counts.author_scope(...)), для которой ведётся счётчик.
+    """
+
+    def __init__(self, object_list, per_page, scope, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.scope = scope
+
+    @cached_property
+    def count(self):
+        return counts.get_count(self.object_list, self.scope)
+
+
+class EstimatedCountPaginator(ApproximateCountMixin, Paginator):
+    """Paginator для админки, который не считает всю таблицу.
+
+    Без фильтров количество берётся из счётчика counts.ALL, который
+    поддерживают сигналы. С фильтрами, поиском и date_hierarchy записи
+    считаются не дальше порога POSTS_ADMIN_COUNT_THRESHOLD, так что
+    стоимость подсчёта не зависит от размера таблицы; страницы за
+    порогом листаются как в лентах (ApproximateCountMixin).
+    """
+
+    @cached_property
+    def _counted(self):
+        """Пара (количество, приближённое ли оно)."""
+        if not self.object_list.query.where:
+            count = counts.get_count(self.object_list, counts.ALL)
+            return count, counts.is_approximate(count)
+        threshold = settings.POSTS_ADMIN_COUNT_THRESHOLD
+        count = self.object_list.order_by()[:threshold + 1].count()
+        return count, count > threshold
+
+    @property
+    def count(self):
+        return self._counted[0]
+
+    @property
+    def is_approximate(self):
+        return self._counted[1]
@@ -0,0 +1,133 @@
+"""Рейтинг популярных постов, который хранится в PostPopularity.
+
+Рейтинг складывается из трёх частей:
+
+    ln(1 + просмотры)
+    + время публикации / POSTS_POPULAR_RECENCY
+    + POSTS_POPULAR_GROUP_WEIGHT * ln(1 + активность группы)
+
+Свежесть входит в рейтинг через время публикации, а не через возраст:
+рейтинг поста не меняется сам по себе с течением времени, и старые
+строки не нужно пересчитывать. Пост, опубликованный на
+POSTS_POPULAR_RECENCY секунд позже, весит как пост с в e раз большим
+числом просмотров. Активность группы — сколько постов в ней вышло
+за последние POSTS_POPULAR_GROUP_WINDOW секунд.
+
+refresh() пересчитывает только посты, которые изменились с прошлого
+прогона: отредактированные и новые (по Post.updated), получившие
+просмотры (по PostViewCount.updated) и свежие посты групп, в которых
+что-то опубликовали. Активность группы, в которой давно ничего не
+выходило, остаётся прежней до полного пересчёта (refresh(full=True)).
+"""
+import math
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Max
+from django.utils import timezone
+
+from .models import Post, PostPopularity, PostViewCount
+
+# Запас к времени прошлого прогона: изменения, записанные
+# в транзакциях, которые завершились уже после его начала.
+OVERLAP = timedelta(minutes=1)
+BATCH_SIZE = 500
+
+
+def group_window():
+    return timedelta(seconds=settings.POSTS_POPULAR_GROUP_WINDOW)
+
+
+def score(views, pub_date, group_activity):
+    return (
+        math.log1p(views)
+        + pub_date.timestamp() / settings.POSTS_POPULAR_RECENCY
+        + settings.POSTS_POPULAR_GROUP_WEIGHT * math.log1p(group_activity)
+    )
+
+
+def last_refresh():
+    return PostPopularity.objects.aggregate(
+        last=Max('refreshed')
+    )['last']
+
+
+def changed_posts(since, now):
+    """id постов, рейтинг которых мог измениться после since."""
+    changed = Post.objects.filter(updated__gte=since)
+    ids = set(changed.values_list('pk', flat=True))
+    ids.update(PostViewCount.objects.filter(
+        updated__gte=since
+    ).values_list('post_id', flat=True))
+    groups = changed.filter(group__isnull=False).values('group')
+    ids.update(Post.objects.filter(
+        group__in=groups,
+        pub_date__gte=now - group_window()
+    ).values_list('pk', flat=True))
+    return sorted(ids)
+
+
+def group_activity(group_ids, now):
+    return dict(
+        Post.objects.filter(
+            group__in=group_ids,
+            pub_date__gte=now - group_window()
+        ).order_by().values_list('group').annotate(Count('pk'))
+    )
+
+
+def update(post_ids, now):
+    """Пересчитывает рейтинг постов post_ids одной пачкой."""
+    rows = list(Post.objects.filter(pk__in=post_ids).values_list(
+        'pk', 'pub_date', 'group', 'view_count__count'
+    ))
+    activity = group_activity(
+        {group for _, _, group, _ in rows if group is not None}, now
+    )
+    entries = []
+    for pk, pub_date, group, views in rows:
+        views = views or 0
+        active = activity.get(group, 0)
+        entries.append(PostPopularity(
+            post_id=pk, score=score(views, pub_date, active),
+            views=views, group_activity=active, refreshed=now
+        ))
+    with transaction.atomic():
+        PostPopularity.objects.filter(post__in=post_ids).delete()
+        PostPopularity.objects.bulk_create(entries)
+    return len(entries)
+
+
+def refresh(full=False, batch_size=BATCH_SIZE):
+    """Обновляет рейтинг; возвращает число пересчитанных постов.
+
+    Без full пересчитываются только изменившиеся посты, а при пустой
+    таблице — все.
+    """
+    now = timezone.now()
+    since = None if full else last_refresh()
+    if since is None:
+        ids = list(Post.objects.order_by('pk').values_list('pk', flat=True))
+    else:
+        ids = changed_posts(since - OVERLAP, now)
+    total = 0
+    for start in range(0, len(ids), batch_size):
+        total += update(ids[start:start + batch_size], now)
+    return total
+
+
+def top(limit=None):
+    """Посты в порядке рейтинга, не больше limit.
+
+    Запрос идёт по индексу popularity_score_idx с конца и читает
+    только limit строк.
+    """
+    posts = Post.objects.filter(popularity__isnull=False).select_related(
+        'author', 'group'
+    ).defer('text', 'text_html').order_by(
+        # Выражение, а не строка '-popularity__post': строка
+        # развернулась бы в Post.Meta.ordering и лишнее соединение.
+        '-popularity__score', F('popularity__post').desc()
+    )
+    return posts[:limit or settings.POSTS_POPULAR_LIMIT]
@@ -0,0 +1,133 @@
+"""Полнотекстовый поиск по постам на SQLite FTS5.
+
+Текст постов копируется в виртуальную таблицу posts_post_fts,
+rowid которой совпадает с id поста. Сигналы обновляют строку при
+сохранении и удалении поста, команда rebuild_search_index
+заполняет таблицу заново.
+"""
+from django.db import connection, transaction
+
+from .models import Post
+
+TABLE = 'posts_post_fts'
+
+
+def available():
+    return connection.vendor == 'sqlite'
+
+
+def build_query(text):
+    """Превращает ввод пользователя в безопасный запрос FTS5.
+
+    Каждое слово берётся в кавычки, поэтому операторы и спецсимволы
+    FTS5 в тексте не ломают запрос; слова объединяются через AND.
+    """
+    words = text.split()
+    return ' '.join(
+        '"{}"*'.format(word.replace('"', '""')) for word in words
+    )
+
+
+def index_post(post_id, text):
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {TABLE} WHERE rowid = %s', [post_id])
+        cursor.execute(
+            f'INSERT INTO {TABLE} (rowid, text) VALUES (%s, %s)',
+            [post_id, text]
+        )
+
+
+def remove_post(post_id):
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {TABLE} WHERE rowid = %s', [post_id])
+
+
+@transaction.atomic
+def rebuild(after_pk=None, until_pk=None):
+    """Заполняет индекс из posts_post.
+
+    Без after_pk индекс строится с нуля, иначе в него добавляются
+    посты с id больше after_pk и не больше until_pk, которых в индексе
+    ещё нет: сохранённые через сайт во время импорта сигнал уже
+    проиндексировал. Возвращает число строк.
+    """
+    sql = (
+        f'INSERT INTO {TABLE} (rowid, text) '
+        f'SELECT id, text FROM {Post._meta.db_table} p WHERE id > %s'
+    )
+    params = [after_pk or 0]
+    with connection.cursor() as cursor:
+        if after_pk is None:
+            cursor.execute(f'DELETE FROM {TABLE}')
+        else:
+            sql += (
+                f' AND NOT EXISTS (SELECT 1 FROM {TABLE} '
+                f'WHERE rowid = p.id)'
+            )
+        if until_pk is not None:
+            sql += ' AND id <= %s'
+            params.append(until_pk)
+        cursor.execute(sql, params)
+        return cursor.rowcount
+
+
+def filter_posts(queryset, text):
+    """Оставляет в queryset только посты, подходящие под запрос.
+
+    RawSQL в filter(pk__in=...) оборачивается во вторые скобки,
+    и SQLite принимает подзапрос за скалярный, поэтому условие
+    добавляется через extra().
+    """
+    table = queryset.model._meta.db_table
+    return queryset.extra(
+        where=[
+            f'{table}.id IN '
+            f'(SELECT rowid FROM {TABLE} WHERE {TABLE} MATCH %s)'
+        ],
+        params=[build_query(text)],
+    )
+
+
+class SearchResults:
+    """Ленивый результат поиска, отсортированный по релевантности.
+
+    Поддерживает count() и срезы, поэтому его можно отдать Paginator:
+    каждая страница — это один запрос к индексу с LIMIT/OFFSET
+    и один запрос за самими постами.
+    """
+
+    def __init__(self, text, queryset=None):
+        self.query = build_query(text)
+        if queryset is None:
+            queryset = Post.objects.all()
+        self.queryset = queryset
+
+    def count(self):
+        if not self.query:
+            return 0
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT COUNT(*) FROM {TABLE} WHERE {TABLE} MATCH %s',
+                [self.query]
+            )
+            return cursor.fetchone()[0]
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice):
+            return self[key:key + 1][0]
+        if not self.query:
+            return []
+        offset = key.start or 0
+        limit = -1 if key.stop is None else key.stop - offset
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid FROM {TABLE} WHERE {TABLE} MATCH %s '
+                f'ORDER BY rank LIMIT %s OFFSET %s',
+                [self.query, limit, offset]
+            )
+            ids = [row[0] for row in cursor.fetchall()]
+        posts = self.queryset.in_bulk(ids)
+        return [posts[pk] for pk in ids if pk in posts]
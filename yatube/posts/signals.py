@@ -0,0 +1,261 @@
+import logging
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import (
+    post_delete, post_init, post_save, pre_delete
+)
+from django.dispatch import receiver
+
+from . import (
+    cards, conditional, counts, fragments, lookups, page_cache, search,
+    stats, thumbnails, timeline
+)
+from .models import AuthorStats, Follow, Group, Post, User
+
+logger = logging.getLogger(__name__)
+
+
+def invalidate_pages(group_ids, author_ids):
+    """Сбрасывает кэш страниц общей ленты, групп и авторов."""
+    if not settings.POSTS_PAGE_CACHE:
+        return
+    scopes = [page_cache.global_scope()]
+    scopes += map(page_cache.group_scope, Group.objects.filter(
+        pk__in=group_ids
+    ).values_list('slug', flat=True))
+    scopes += map(page_cache.author_scope, User.objects.filter(
+        pk__in=author_ids
+    ).values_list('username', flat=True))
+    page_cache.invalidate(scopes)
+
+
+@receiver(post_init, sender=Post)
+def remember_scope(sender, instance, **kwargs):
+    """Запоминает группу и автора, с которыми пост был загружен."""
+    instance._loaded_group_id = instance.__dict__.get('group_id')
+    instance._loaded_author_id = instance.__dict__.get('author_id')
+    image = instance.__dict__.get('image')
+    instance._loaded_image = getattr(image, 'name', image)
+
+
+@receiver(post_save, sender=Post)
+def update_on_save(sender, instance, created, **kwargs):
+    scopes = counts.post_scopes(instance.group_id, instance.author_id)
+    if created:
+        conditional.touch(scopes)
+        counts.change(scopes, 1)
+        stats.change_author_count(instance.author_id, 1)
+        stats.change_group_count(instance.group_id, 1)
+    else:
+        old_scopes = counts.post_scopes(
+            instance._loaded_group_id, instance._loaded_author_id
+        )
+        conditional.touch(set(old_scopes) | set(scopes))
+        counts.change(set(old_scopes) - set(scopes), -1)
+        counts.change(set(scopes) - set(old_scopes), 1)
+        if instance._loaded_author_id != instance.author_id:
+            stats.change_author_count(instance._loaded_author_id, -1)
+            stats.change_author_count(instance.author_id, 1)
+        if instance._loaded_group_id != instance.group_id:
+            stats.change_group_count(instance._loaded_group_id, -1)
+            stats.change_group_count(instance.group_id, 1)
+    author_ids = {instance._loaded_author_id, instance.author_id} - {None}
+    if created or len(author_ids) > 1:
+        # В кэше автор лежит вместе со статистикой.
+        for author_id in author_ids:
+            lookups.authors.evict(author_id)
+    invalidate_pages(
+        {instance._loaded_group_id, instance.group_id} - {None}, author_ids
+    )
+    instance._loaded_group_id = instance.group_id
+    instance._loaded_author_id = instance.author_id
+
+
+@receiver(post_save, sender=Post)
+def update_card(sender, instance, **kwargs):
+    cards.save_post(instance)
+
+
+@receiver(post_save, sender=Post)
+def update_search_index(sender, instance, update_fields, **kwargs):
+    if update_fields and 'text' not in update_fields:
+        return
+    if search.available():
+        search.index_post(instance.pk, instance.text)
+
+
+def follower_count(author_id):
+    return AuthorStats.objects.filter(author_id=author_id).values_list(
+        'follower_count', flat=True
+    ).first() or 0
+
+
+@receiver(post_save, sender=Post)
+def fan_out_to_timelines(sender, instance, created, **kwargs):
+    if created:
+        timeline.fan_out(instance, follower_count(instance.author_id))
+
+
+@receiver(post_save, sender=Post)
+def generate_thumbnails(sender, instance, created, **kwargs):
+    image = instance.image
+    if not settings.POSTS_EAGER_THUMBNAILS or not image:
+        return
+    if not created and image.name == instance._loaded_image:
+        return
+    instance._loaded_image = image.name
+
+    def generate():
+        try:
+            thumbnails.generate(image)
+        except Exception:
+            # Картинку всё равно отрисует {% thumbnail %} при показе.
+            logger.exception('Не удалось подготовить миниатюры %s', image)
+
+    transaction.on_commit(generate)
+
+
+@receiver(post_delete, sender=Post)
+def update_on_delete(sender, instance, **kwargs):
+    scopes = counts.post_scopes(instance.group_id, instance.author_id)
+    conditional.touch(scopes)
+    counts.change(scopes, -1)
+    stats.change_author_count(instance.author_id, -1)
+    stats.change_group_count(instance.group_id, -1)
+    lookups.authors.evict(instance.author_id)
+    invalidate_pages({instance.group_id} - {None}, {instance.author_id})
+    if search.available():
+        search.remove_post(instance.pk)
+
+
+@receiver(post_init, sender=Group)
+def remember_slug(sender, instance, **kwargs):
+    """Запоминает slug, с которым группа была загружена."""
+    instance._loaded_slug = instance.__dict__.get('slug')
+
+
+def group_authors(group_id):
+    """id и логины авторов, у которых есть посты в группе."""
+    return list(User.objects.filter(
+        posts__group_id=group_id
+    ).distinct().values_list('pk', 'username'))
+
+
+@receiver(post_save, sender=Group)
+def invalidate_group_pages(sender, instance, created, **kwargs):
+    slugs = {instance._loaded_slug, instance.slug} - {None}
+    instance._loaded_slug = instance.slug
+    lookups.groups.evict(instance.pk, *slugs)
+    if created:
+        conditional.touch([counts.ALL, counts.group_scope(instance.pk)])
+        return
+    # Название группы печатают и профили её авторов.
+    authors = group_authors(instance.pk)
+    conditional.touch([counts.ALL, counts.group_scope(instance.pk)] + [
+        counts.author_scope(author_id) for author_id, _ in authors
+    ])
+    fragments.bump([counts.group_scope(instance.pk)])
+    cards.rename_group(instance)
+    if settings.POSTS_PAGE_CACHE:
+        # При смене slug страницы старого адреса тоже сбрасываются.
+        page_cache.invalidate(
+            [page_cache.global_scope()]
+            + [page_cache.group_scope(slug) for slug in slugs]
+            + [page_cache.author_scope(name) for _, name in authors]
+        )
+
+
+@receiver(pre_delete, sender=Group)
+def detach_cards(sender, instance, **kwargs):
+    # Посты группы останутся без неё (SET_NULL) без сигналов post_save,
+    # поэтому её авторов запоминаем, пока посты ещё в группе.
+    instance._authors = group_authors(instance.pk)
+    cards.detach_group(instance.pk)
+
+
+@receiver(post_delete, sender=Group)
+def evict_group(sender, instance, **kwargs):
+    lookups.groups.evict(instance.pk, instance.slug)
+    conditional.touch([counts.ALL, counts.group_scope(instance.pk)] + [
+        counts.author_scope(author_id) for author_id, _ in instance._authors
+    ])
+    if settings.POSTS_PAGE_CACHE:
+        # Общая лента и профили ссылались на удалённую группу.
+        page_cache.invalidate(
+            [page_cache.global_scope(), page_cache.group_scope(instance.slug)]
+            + [page_cache.author_scope(name) for _, name in instance._authors]
+        )
+
+
+@receiver(post_delete, sender=User)
+def evict_author(sender, instance, **kwargs):
+    lookups.authors.evict(instance.pk, instance.username)
+
+
+def author_names(user):
+    """Поля пользователя, которые печатают ленты и профиль."""
+    return tuple(
+        user.__dict__.get(field)
+        for field in ('username', 'first_name', 'last_name')
+    )
+
+
+@receiver(post_init, sender=User)
+def remember_names(sender, instance, **kwargs):
+    """Запоминает имя и логин, с которыми пользователь был загружен."""
+    instance._loaded_names = author_names(instance)
+
+
+@receiver(post_save, sender=User)
+def invalidate_author_pages(sender, instance, created, update_fields,
+                            **kwargs):
+    if update_fields and set(update_fields) == {'last_login'}:
+        return
+    loaded_names, instance._loaded_names = (
+        instance._loaded_names, author_names(instance)
+    )
+    lookups.authors.evict(instance.pk, instance.username, loaded_names[0])
+    conditional.touch([counts.author_scope(instance.pk)])
+    if created or loaded_names == instance._loaded_names:
+        return
+    fragments.bump([counts.author_scope(instance.pk)])
+    cards.rename_author(instance)
+    # Имя автора печатают общая лента и ленты его групп: их ETag
+    # и кэш страниц сбрасываются, а при смене логина — и профиль
+    # по старому адресу.
+    groups = list(Group.objects.filter(
+        posts__author=instance
+    ).distinct().values_list('pk', 'slug'))
+    conditional.touch([counts.ALL] + [
+        counts.group_scope(group_id) for group_id, _ in groups
+    ])
+    if settings.POSTS_PAGE_CACHE:
+        usernames = {loaded_names[0], instance.username} - {None}
+        page_cache.invalidate(
+            [page_cache.global_scope()]
+            + [page_cache.author_scope(name) for name in usernames]
+            + [page_cache.group_scope(slug) for _, slug in groups]
+        )
+
+
+@receiver(post_save, sender=Follow)
+def add_to_timeline(sender, instance, created, **kwargs):
+    if not created:
+        return
+    stats.change_follower_count(instance.author_id, 1)
+    lookups.authors.evict(instance.author_id)
+    timeline.backfill(
+        instance.user_id, instance.author_id,
+        follower_count(instance.author_id)
+    )
+    # Профиль показывает кнопку подписки: его ETag должен смениться.
+    conditional.touch([counts.author_scope(instance.author_id)])
+
+
+@receiver(post_delete, sender=Follow)
+def remove_from_timeline(sender, instance, **kwargs):
+    stats.change_follower_count(instance.author_id, -1)
+    lookups.authors.evict(instance.author_id)
+    timeline.remove(instance.user_id, instance.author_id)
+    conditional.touch([counts.author_scope(instance.author_id)])
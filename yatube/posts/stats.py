@@ -0,0 +1,74 @@
+"""Хранимые счётчики: Group.post_count и AuthorStats.
+
+Сигналы Post и Follow сдвигают их F()-выражениями, команда
+rebuild_post_counters пересчитывает с нуля.
+"""
+from django.db import transaction
+from django.db.models import Count, F
+
+from .models import AuthorStats, Follow, Group, Post
+
+
+def _shift(queryset, delta, field='post_count'):
+    if delta < 0:
+        # Не уходим в минус, если счётчик отстал от данных,
+        # например после bulk_create в обход сигналов.
+        queryset = queryset.filter(**{f'{field}__gte': -delta})
+    return queryset.update(**{field: F(field) + delta})
+
+
+def change_group_count(group_id, delta):
+    if group_id is not None:
+        _shift(Group.objects.filter(pk=group_id), delta)
+
+
+def _change_author_stats(author_id, delta, field):
+    stats = AuthorStats.objects.filter(author_id=author_id)
+    if _shift(stats, delta, field):
+        return
+    if delta > 0:
+        _, created = AuthorStats.objects.get_or_create(
+            author_id=author_id, defaults={field: delta}
+        )
+        if not created:
+            _shift(stats, delta, field)
+
+
+def change_author_count(author_id, delta):
+    _change_author_stats(author_id, delta, 'post_count')
+
+
+def change_follower_count(author_id, delta):
+    _change_author_stats(author_id, delta, 'follower_count')
+
+
+def _counts(model, field):
+    return (
+        model.objects.order_by().values(field)
+        .annotate(count=Count('id')).values_list(field, 'count')
+    )
+
+
+@transaction.atomic
+def rebuild():
+    """Пересчитывает все счётчики по таблицам постов и подписок.
+
+    Возвращает количество обновлённых групп и авторов.
+    """
+    group_counts = dict(_counts(Post, 'group'))
+    groups = list(Group.objects.all())
+    for group in groups:
+        group.post_count = group_counts.get(group.pk, 0)
+    Group.objects.bulk_update(groups, ['post_count'], batch_size=500)
+
+    post_counts = dict(_counts(Post, 'author'))
+    follower_counts = dict(_counts(Follow, 'author'))
+    AuthorStats.objects.all().delete()
+    author_stats = AuthorStats.objects.bulk_create(
+        [AuthorStats(author_id=author_id,
+                     post_count=post_counts.get(author_id, 0),
+                     follower_count=follower_counts.get(author_id, 0))
+         for author_id in post_counts.keys() | follower_counts.keys()],
+        batch_size=500
+    )
+    return len(groups), len(author_stats)
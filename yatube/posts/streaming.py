@@ -0,0 +1,56 @@
+"""Потоковая отдача страниц лент (POSTS_STREAMING_FEEDS).
+
+Страница рендерится в представлении целиком, но с feed_marker
+в контексте шаблон ленты выводит вместо списка постов эту метку.
+Всё до метки — head, шапка, заголовок ленты — уходит клиенту первым
+куском ответа, затем карточки по одной, по мере того как итератор
+queryset читает строки, и в конце навигация и подвал. Запрос постов
+выполняется уже после возврата из представления, так что время
+до первого байта его не включает, а в памяти воркера не лежит вся
+страница сразу.
+
+Сессия и пользователь читаются при рендеринге в представлении, поэтому
+заголовки Vary и куки ставятся как обычно. Запрос постов не попадает
+в метрики запроса: он идёт, когда MetricsMiddleware уже отработала.
+"""
+from django.conf import settings
+from django.db.models.query import QuerySet
+from django.http import HttpResponse, StreamingHttpResponse
+from django.shortcuts import render
+from django.template.loader import get_template, render_to_string
+from django.utils.safestring import mark_safe
+
+FEED_MARKER = mark_safe('<!-- feed -->')
+SEPARATOR = '<hr>'
+
+
+def render_feed(request, template_name, context):
+    """render() для лент: с POSTS_STREAMING_FEEDS отдаёт ответ потоком."""
+    if not settings.POSTS_STREAMING_FEEDS:
+        return render(request, template_name, context)
+    page = render_to_string(
+        template_name, {**context, 'feed_marker': FEED_MARKER}, request
+    )
+    if FEED_MARKER not in page:
+        # Шаблон сам решил не отдавать ленту потоком (пустая лента
+        # со своим сообщением).
+        return HttpResponse(page)
+    head, tail = page.split(FEED_MARKER, 1)
+    posts = context['page_obj'].object_list
+    if isinstance(posts, QuerySet):
+        # Строки читаются после ReplicaRoutingMiddleware: база
+        # выбирается сейчас, пока маршрутизация запроса действует.
+        posts = posts.using(posts.db).iterator()
+    return StreamingHttpResponse(
+        stream(head, posts, context.get('show_group', True), tail)
+    )
+
+
+def stream(head, posts, show_group, tail):
+    yield head
+    card = get_template('includes/post_card.html')
+    for number, post in enumerate(posts):
+        if number:
+            yield SEPARATOR
+        yield card.render({'post': post, 'show_group': show_group})
+    yield tail
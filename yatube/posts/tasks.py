@@ -0,0 +1,32 @@
+"""Задачи очереди jobs для приложения posts.
+
+Пересчёт рейтинга популярных постов ставит себя в очередь снова
+через POSTS_POPULAR_REFRESH_INTERVAL секунд, так что достаточно один
+раз выполнить refresh_popular_posts --enqueue при запущенном
+run_worker.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from jobs.models import Job
+from jobs.queue import task
+
+from . import popularity
+
+REFRESH_TASK = 'posts.refresh_popularity'
+
+
+@task(name=REFRESH_TASK)
+def refresh_popularity(full=False):
+    popularity.refresh(full=full)
+    interval = settings.POSTS_POPULAR_REFRESH_INTERVAL
+    # Следующий прогон ставится, только если его ещё нет в очереди:
+    # повторный --enqueue не заводит вторую цепочку.
+    if interval and not Job.objects.filter(
+        task=REFRESH_TASK, status=Job.QUEUED
+    ).exists():
+        refresh_popularity.enqueue(
+            run_at=timezone.now() + timedelta(seconds=interval)
+        )
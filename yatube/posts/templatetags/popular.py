@@ -0,0 +1,15 @@
+from django import template
+from django.conf import settings
+
+from posts import popularity
+
+register = template.Library()
+
+
+@register.inclusion_tag('includes/popular_posts.html')
+def popular_posts(limit=None):
+    """Блок популярных постов; POSTS_POPULAR_SIDEBAR = 0 его скрывает."""
+    limit = limit or settings.POSTS_POPULAR_SIDEBAR
+    if not limit:
+        return {'posts': ()}
+    return {'posts': popularity.top(limit)}
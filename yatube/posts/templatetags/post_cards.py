@@ -0,0 +1,11 @@
+from django import template
+
+from posts import fragments
+
+register = template.Library()
+
+
+@register.simple_tag
+def card_version(post):
+    """Версия автора и группы для ключа кэша карточки."""
+    return fragments.card_version(post.author_id, post.group_id)
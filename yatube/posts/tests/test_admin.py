@@ -0,0 +1,89 @@
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..admin import PostAdmin
+from ..models import Group, Post, User
+
+USER_USERNAME = 'Anonimus'
+ADMIN_USERNAME = 'Admin'
+GROUP_COUNT = 30
+POST_TEXT = 'Тестовая запись для тестового поста номер'
+
+
+class PostAdminTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.admin = User.objects.create_superuser(
+            username=ADMIN_USERNAME, email='admin@test.ru', password='pass'
+        )
+        cls.groups = [
+            Group.objects.create(
+                title=f'Группа {i}', slug=f'group-{i}', description='-'
+            )
+            for i in range(GROUP_COUNT)
+        ]
+        cls.url = reverse('admin:posts_post_changelist')
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def create_posts(self, number):
+        start = User.objects.count()
+        authors = [
+            User.objects.create(username=f'{USER_USERNAME}{start + i}')
+            for i in range(number)
+        ]
+        Post.objects.bulk_create([
+            Post(text=POST_TEXT, author=author, group=self.groups[i])
+            for i, author in enumerate(authors)
+        ])
+
+    def changelist_queries(self, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, params)
+        return response, len(queries)
+
+    def test_query_count_does_not_grow(self):
+        """Число запросов списка постов не зависит от числа строк."""
+        self.create_posts(2)
+        _, few = self.changelist_queries()
+        self.create_posts(20)
+        response, many = self.changelist_queries()
+        self.assertEqual(len(response.context['cl'].result_list), 22)
+        self.assertEqual(few, many)
+
+    def test_no_full_count(self):
+        """Список не считает всю таблицу повторно для «Показать все»."""
+        self.create_posts(2)
+        response, _ = self.changelist_queries(group__id__exact=1)
+        self.assertIsNone(response.context['cl'].full_result_count)
+
+    def test_group_select_renders_only_selected(self):
+        """Выпадающий список группы не перечисляет все группы."""
+        self.create_posts(1)
+        response, _ = self.changelist_queries()
+        self.assertContains(response, self.groups[0].title)
+        self.assertNotContains(response, self.groups[-1].title)
+
+    @override_settings(POSTS_ADMIN_COUNT_THRESHOLD=2)
+    def test_filtered_count_is_capped(self):
+        """Отфильтрованный список считает строки не дальше порога,
+        а страницы за порогом остаются доступны."""
+        self.create_posts(5)
+        with mock.patch.object(PostAdmin, 'list_per_page', 1):
+            response, _ = self.changelist_queries(
+                pub_date__year=Post.objects.first().pub_date.year, p=3
+            )
+        cl = response.context['cl']
+        self.assertEqual(cl.result_count, 3)
+        self.assertTrue(cl.paginator.is_approximate)
+        self.assertEqual(len(cl.result_list), 1)
+        # Номера в админке с нуля: открыта четвёртая страница из пяти,
+        # ссылка ведёт на пятую.
+        self.assertEqual(cl.paginator.num_pages, 5)
+        self.assertContains(response, 'p=4')
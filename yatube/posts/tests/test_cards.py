@@ -0,0 +1,140 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import Group, Post, PostCard, User
+
+GROUP_TITLE = 'Тестовая группа'
+GROUP_SLUG = 'test-slug'
+USER_USERNAME = 'Anonimus'
+POST_TEXT = 'Тестовая запись для тестового поста номер'
+POSTS_NUMBER = 13
+
+
+class PostCardTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username=USER_USERNAME, first_name='Иван', last_name='Петров'
+        )
+        cls.group = Group.objects.create(
+            title=GROUP_TITLE, slug=GROUP_SLUG, description='-'
+        )
+        cls.post = Post.objects.create(
+            text=POST_TEXT, author=cls.user, group=cls.group
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_card_follows_post(self):
+        card = PostCard.objects.get(post=self.post)
+        self.assertEqual(card.author.get_full_name(), 'Иван Петров')
+        self.assertEqual(card.group, (GROUP_SLUG, GROUP_TITLE))
+        post = Post.objects.get(pk=self.post.pk)
+        post.text = 'Исправленный текст'
+        post.group = None
+        post.save()
+        card = PostCard.objects.get(post=self.post)
+        self.assertEqual(card.excerpt, 'Исправленный текст')
+        self.assertIsNone(card.group)
+
+    def test_renames_reach_cards(self):
+        """Смена имени автора и названия группы видна в карточках."""
+        user = User.objects.get(pk=self.user.pk)
+        user.first_name = 'Пётр'
+        user.save()
+        group = Group.objects.get(pk=self.group.pk)
+        group.title = 'Новое название'
+        group.save()
+        card = PostCard.objects.get(post=self.post)
+        self.assertEqual(card.author_full_name, 'Пётр Петров')
+        self.assertEqual(card.group_title, 'Новое название')
+        group.delete()
+        self.assertIsNone(PostCard.objects.get(post=self.post).group)
+
+    def test_rebuild_command(self):
+        PostCard.objects.all().delete()
+        call_command('rebuild_post_cards', batch_size=1, stdout=StringIO())
+        card = PostCard.objects.get()
+        self.assertEqual(card.pk, self.post.pk)
+        self.assertEqual(card.author_full_name, 'Иван Петров')
+        self.assertEqual(card.group_slug, GROUP_SLUG)
+
+
+@override_settings(POSTS_CARD_FEEDS=True)
+class CardFeedsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=USER_USERNAME)
+        cls.group = Group.objects.create(
+            title=GROUP_TITLE, slug=GROUP_SLUG, description='-'
+        )
+        for i in range(POSTS_NUMBER):
+            Post.objects.create(
+                text=f'{POST_TEXT} {i}', author=cls.user, group=cls.group
+            )
+        cls.urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', args=[GROUP_SLUG]),
+            reverse('posts:profile', args=[USER_USERNAME]),
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_feeds_read_cards_without_joins(self):
+        for url in self.urls:
+            with self.subTest(url=url):
+                with CaptureQueriesContext(connection) as context:
+                    response = self.client.get(url)
+                page_obj = response.context['page_obj']
+                self.assertIsInstance(page_obj[0], PostCard)
+                self.assertContains(response, GROUP_TITLE)
+                self.assertContains(
+                    response, f'{POST_TEXT} {POSTS_NUMBER - 1}'
+                )
+                feed_queries = [
+                    query['sql'] for query in context.captured_queries
+                    if 'posts_postcard' in query['sql']
+                ]
+                self.assertTrue(feed_queries)
+                for sql in feed_queries:
+                    self.assertNotIn('JOIN', sql)
+
+    def test_feeds_show_renames(self):
+        """После переименования ленты не отдают старую карточку."""
+        for url in self.urls:
+            self.client.get(url)
+        card = PostCard.objects.first()
+        user = User.objects.get(pk=self.user.pk)
+        user.first_name = 'Новое'
+        user.last_name = 'Имя'
+        user.save()
+        group = Group.objects.get(pk=self.group.pk)
+        group.title = 'Новое название'
+        group.save()
+        self.assertGreater(
+            PostCard.objects.get(pk=card.pk).updated, card.updated
+        )
+        for url in self.urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertContains(response, 'Новое Имя')
+                self.assertContains(response, 'Новое название')
+                self.assertNotContains(response, GROUP_TITLE)
+
+    @override_settings(POSTS_KEYSET_PAGINATION=True)
+    def test_keyset_pagination(self):
+        response = self.client.get(self.urls[0])
+        response = self.client.get(
+            self.urls[0], {'after': response.context['page_obj'].next_cursor}
+        )
+        self.assertContains(response, f'{POST_TEXT} 0')
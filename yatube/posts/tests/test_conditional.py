@@ -0,0 +1,142 @@
+from http import HTTPStatus
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from .. import checks, conditional, view_counts
+from ..models import Group, Post, User
+
+GROUP_TITLE = 'Тестовая группа'
+GROUP_SLUG = 'test-slug'
+GROUP_DESCRIPTION = 'Тест описание'
+USER_USERNAME = 'Anonimus'
+POST_TEXT = 'Тестовая запись для тестового поста номер'
+
+
+@override_settings(POSTS_CONDITIONAL_GET=True)
+class ConditionalGetTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=USER_USERNAME)
+        cls.group = Group.objects.create(
+            title=GROUP_TITLE,
+            slug=GROUP_SLUG,
+            description=GROUP_DESCRIPTION,
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.post = Post.objects.create(
+            text=POST_TEXT, author=self.user, group=self.group
+        )
+        self.urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': GROUP_SLUG}),
+            reverse('posts:profile', kwargs={'username': USER_USERNAME}),
+            reverse('posts:post_detail', kwargs={'post_id': self.post.pk}),
+        )
+
+    def test_matching_etag_returns_304(self):
+        """Совпавший ETag даёт 304 без запроса страницы и шаблона."""
+        # Лентам нужна самая новая запись (группе и профилю ещё поиск
+        # их объекта), посту — его дата изменения.
+        queries = (1, 2, 2, 1)
+        for url, number in zip(self.urls, queries):
+            with self.subTest(url=url):
+                etag = self.client.get(url)['ETag']
+                with self.assertNumQueries(number):
+                    response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(
+                    response.status_code, HTTPStatus.NOT_MODIFIED
+                )
+                self.assertFalse(response.templates)
+
+    def test_if_modified_since(self):
+        """Last-Modified принимается в If-Modified-Since."""
+        for url in self.urls:
+            with self.subTest(url=url):
+                last_modified = self.client.get(url)['Last-Modified']
+                response = self.client.get(
+                    url, HTTP_IF_MODIFIED_SINCE=last_modified
+                )
+                self.assertEqual(
+                    response.status_code, HTTPStatus.NOT_MODIFIED
+                )
+
+    def test_edit_changes_validators(self):
+        """Правка поста меняет ETag лент и страницы поста."""
+        etags = {url: self.client.get(url)['ETag'] for url in self.urls}
+        self.post.text = 'Исправленный текст'
+        self.post.save()
+        for url, etag in etags.items():
+            with self.subTest(url=url):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_etag_depends_on_user(self):
+        """Анонимный и авторизованный читатели получают разные ETag."""
+        etag = self.client.get(self.urls[0])['ETag']
+        self.client.force_login(self.user)
+        response = self.client.get(self.urls[0], HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_author_rename_changes_validators(self):
+        """Новое имя автора меняет ETag общей ленты и ленты группы."""
+        etags = {url: self.client.get(url)['ETag'] for url in self.urls}
+        user = User.objects.get(pk=self.user.pk)
+        user.first_name = 'Новое'
+        user.save()
+        for url, etag in etags.items():
+            with self.subTest(url=url):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_view_flush_changes_post_validators(self):
+        """Сброс просмотров меняет ETag страницы поста."""
+        url = self.urls[3]
+        view_counts.write({self.post.pk: 1})
+        etag = self.client.get(url)['ETag']
+        view_counts.write({self.post.pk: 1})
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertContains(response, 'Просмотров: 2')
+
+    def test_group_rename_changes_profile_validators(self):
+        """Новое название группы меняет ETag профилей её авторов."""
+        etags = {url: self.client.get(url)['ETag'] for url in self.urls}
+        group = Group.objects.get(pk=self.group.pk)
+        group.title = 'Новое название'
+        group.save()
+        for url, etag in etags.items():
+            with self.subTest(url=url):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertContains(response, 'Новое название')
+
+    def test_group_delete_changes_validators(self):
+        """После удаления группы ленты не ссылаются на неё из 304."""
+        urls = (self.urls[0], self.urls[2])
+        etags = {url: self.client.get(url)['ETag'] for url in urls}
+        Group.objects.get(pk=self.group.pk).delete()
+        for url, etag in etags.items():
+            with self.subTest(url=url):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+                self.assertNotContains(response, GROUP_SLUG)
+
+    def test_new_post_changes_validators_without_touch(self):
+        """Новый пост меняет ETag ленты, даже если отметку изменения
+        видел только другой процесс."""
+        url = self.urls[0]
+        etag = self.client.get(url)['ETag']
+        with mock.patch.object(conditional, 'touch'):
+            Post.objects.create(text=POST_TEXT, author=self.user)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_process_local_cache_is_rejected(self):
+        self.assertEqual(
+            [error.id for error in checks.check_conditional_get_cache(None)],
+            ['posts.E002']
+        )
@@ -0,0 +1,124 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from .. import counts
+from ..models import Group, Post, User
+
+GROUP_TITLE = 'Тестовая группа'
+GROUP_SLUG = 'test-slug'
+GROUP_DESCRIPTION = 'Тест описание'
+USER_USERNAME = 'Anonimus'
+POST_TEXT = 'Тестовая запись для тестового поста номер'
+
+
+@override_settings(POSTS_COUNT_CACHE=True)
+class CachedCountTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=USER_USERNAME)
+        cls.group = Group.objects.create(
+            title=GROUP_TITLE,
+            slug=GROUP_SLUG,
+            description=GROUP_DESCRIPTION,
+        )
+        cls.other_group = Group.objects.create(
+            title=f'{GROUP_TITLE} 2',
+            slug=f'{GROUP_SLUG}_2',
+            description=GROUP_DESCRIPTION,
+        )
+        cls.post = Post.objects.create(
+            text=POST_TEXT,
+            author=cls.user,
+            group=cls.group,
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.scopes = {
+            counts.ALL: Post.objects.all(),
+            counts.group_scope(self.group.pk): self.group.posts.all(),
+            counts.group_scope(self.other_group.pk):
+                self.other_group.posts.all(),
+            counts.author_scope(self.user.pk): self.user.posts.all(),
+        }
+        for scope, queryset in self.scopes.items():
+            counts.get_count(queryset, scope)
+
+    def assertCountsMatch(self):
+        for scope, queryset in self.scopes.items():
+            with self.subTest(scope=scope):
+                self.assertEqual(
+                    counts.get_count(queryset, scope), queryset.count()
+                )
+
+    def test_count_is_cached(self):
+        """Повторный запрос количества не обращается к базе."""
+        with self.assertNumQueries(0):
+            counts.get_count(Post.objects.all(), counts.ALL)
+
+    def test_signals_keep_counts(self):
+        """Создание, смена группы и удаление поста сдвигают счётчики."""
+        post = Post.objects.create(
+            text=POST_TEXT, author=self.user, group=self.group
+        )
+        self.assertCountsMatch()
+        post.group = self.other_group
+        post.save()
+        self.assertCountsMatch()
+        post = Post.objects.get(pk=post.pk)
+        post.group = None
+        post.save()
+        self.assertCountsMatch()
+        post.delete()
+        self.assertCountsMatch()
+
+    def test_feed_skips_count_query(self):
+        """Лента с тёплым кэшем обходится без COUNT(*)."""
+        self.client.get(reverse('posts:index'))
+        with self.assertNumQueries(1):
+            self.client.get(reverse('posts:index'))
+
+    @override_settings(POSTS_COUNT_APPROXIMATE_THRESHOLD=2)
+    def test_approximate_count(self):
+        """Выше порога количество не считается точно."""
+        cache.clear()
+        Post.objects.bulk_create(
+            [Post(text=POST_TEXT, author=self.user) for _ in range(5)]
+        )
+        count = counts.get_count(Post.objects.all(), counts.ALL)
+        self.assertEqual(count, 3)
+        self.assertTrue(counts.is_approximate(count))
+        # «Больше порога» не кэшируется и не сдвигается сигналами.
+        self.assertIsNone(cache.get(counts.CACHE_KEY.format(counts.ALL)))
+
+    @override_settings(POSTS_COUNT_APPROXIMATE_THRESHOLD=2)
+    def test_counter_over_threshold_is_dropped(self):
+        counts.get_count(Post.objects.all(), counts.ALL)
+        Post.objects.create(text=POST_TEXT, author=self.user)
+        self.assertEqual(cache.get(counts.CACHE_KEY.format(counts.ALL)), 2)
+        Post.objects.create(text=POST_TEXT, author=self.user)
+        self.assertIsNone(cache.get(counts.CACHE_KEY.format(counts.ALL)))
+
+    @override_settings(POSTS_COUNT_APPROXIMATE_THRESHOLD=2, POST_COUNT=1)
+    def test_pages_past_threshold_are_reachable(self):
+        """Номер страницы за порогом не сводится к последней."""
+        Post.objects.bulk_create(
+            [Post(text=f'{POST_TEXT} {i}', author=self.user)
+             for i in range(5)]
+        )
+        cache.clear()
+        oldest = Post.objects.order_by('pub_date', 'pk').first()
+        url = reverse('posts:index')
+        response = self.client.get(url, {'page': 6})
+        page_obj = response.context['page_obj']
+        self.assertEqual(page_obj.number, 6)
+        self.assertEqual(list(page_obj), [oldest])
+        self.assertFalse(page_obj.has_next())
+        self.assertNotContains(response, 'Последняя')
+        response = self.client.get(url, {'page': 5})
+        self.assertTrue(response.context['page_obj'].has_next())
+        self.assertContains(response, '?page=6')
+        response = self.client.get(url, {'page': 7})
+        self.assertEqual(response.context['page_obj'].number, 3)
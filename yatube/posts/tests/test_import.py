@@ -0,0 +1,125 @@
+import json
+import os
+import tempfile
+from datetime import datetime, timezone
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+
+from posts.management.commands.import_posts import Command
+
+from .. import counts, search
+from ..models import Follow, Group, Post, PostCard, TimelineEntry, User
+
+GROUP_SLUG = 'test-slug'
+USER_USERNAME = 'Anonimus'
+POST_TEXT = 'Тестовая запись для тестового поста номер'
+PUB_DATE = '2020-01-02T03:04:05+00:00'
+
+
+class ImportPostsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=USER_USERNAME)
+        cls.group = Group.objects.create(
+            title='Тестовая группа', slug=GROUP_SLUG, description='-'
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def import_file(self, content, suffix, **options):
+        handle, path = tempfile.mkstemp(suffix=suffix)
+        self.addCleanup(os.remove, path)
+        with os.fdopen(handle, 'w', encoding='utf-8') as file:
+            file.write(content)
+        call_command('import_posts', path, stdout=StringIO(), **options)
+
+    def test_import_ndjson(self):
+        """Посты из NDJSON загружаются с автором, группой и датой."""
+        rows = [
+            {'text': f'{POST_TEXT} {i}', 'author': USER_USERNAME,
+             'group': GROUP_SLUG, 'pub_date': PUB_DATE}
+            for i in range(5)
+        ]
+        rows.append({'text': POST_TEXT, 'author': 'nobody'})
+        self.import_file(
+            '\n'.join(map(json.dumps, rows)), '.ndjson', batch_size=2
+        )
+        posts = Post.objects.filter(group=self.group)
+        self.assertEqual(posts.count(), 5)
+        post = posts.first()
+        self.assertEqual(post.author, self.user)
+        self.assertEqual(
+            post.pub_date, datetime(2020, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+        )
+        self.assertTrue(post.text_html.startswith('<p>'))
+
+    def test_import_csv(self):
+        """CSV без группы и даты тоже загружается."""
+        self.import_file(
+            f'text,author\n{POST_TEXT},{USER_USERNAME}\n', '.csv'
+        )
+        self.assertEqual(Post.objects.get().group, None)
+
+    def test_derived_data_updated(self):
+        """После загрузки пересчитаны счётчики и поисковый индекс."""
+        counts.get_count(Post.objects.all(), counts.ALL)
+        reader = User.objects.create_user(username='Reader')
+        Follow.objects.create(user=reader, author=self.user)
+        self.import_file(
+            json.dumps({'text': 'Загруженная запись', 'author': USER_USERNAME,
+                        'group': GROUP_SLUG}),
+            '.ndjson'
+        )
+        self.group.refresh_from_db()
+        self.assertEqual(self.group.post_count, 1)
+        self.assertEqual(self.user.stats.post_count, 1)
+        self.assertEqual(counts.get_count(Post.objects.all(), counts.ALL), 1)
+        self.assertEqual(
+            TimelineEntry.objects.get(user=reader).post, Post.objects.get()
+        )
+        self.assertEqual(PostCard.objects.get().group_slug, GROUP_SLUG)
+        if search.available():
+            self.assertEqual(
+                len(search.SearchResults('загруженная')), 1
+            )
+
+    def test_posts_saved_during_import(self):
+        """Пост, сохранённый через сайт во время импорта, не ломает
+        догрузку карточек и поиска и не учитывается дважды."""
+        reader = User.objects.create_user(username='Reader')
+        Follow.objects.create(user=reader, author=self.user)
+        insert = Command.insert
+
+        def insert_and_post(command, posts):
+            insert(command, posts)
+            # Импорт отключает auto_now_add, дату задаём сами.
+            Post.objects.create(
+                text='Запись с сайта', author=self.user, group=self.group,
+                pub_date=datetime.now(timezone.utc)
+            )
+
+        rows = [
+            {'text': f'{POST_TEXT} {i}', 'author': USER_USERNAME,
+             'group': GROUP_SLUG}
+            for i in range(4)
+        ]
+        with mock.patch.object(Command, 'insert', insert_and_post):
+            self.import_file(
+                '\n'.join(map(json.dumps, rows)), '.ndjson', batch_size=2
+            )
+        self.group.refresh_from_db()
+        self.assertEqual(self.group.post_count, 6)
+        self.assertEqual(
+            User.objects.get(pk=self.user.pk).stats.post_count, 6
+        )
+        self.assertEqual(PostCard.objects.count(), 6)
+        self.assertEqual(TimelineEntry.objects.filter(user=reader).count(), 6)
+        if search.available():
+            self.assertEqual(len(search.SearchResults('тестовая')), 4)
+            self.assertEqual(len(search.SearchResults('сайта')), 2)
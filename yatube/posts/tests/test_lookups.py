@@ -0,0 +1,143 @@
+from django.core.cache import cache
+from django.http import Http404
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core import metrics
+
+from .. import lookups
+from ..models import Follow, Group, Post, User
+
+GROUP_SLUG = 'test-slug'
+GROUP_TITLE = 'Тестовая группа'
+USER_USERNAME = 'Anonimus'
+POST_TEXT = 'Тестовая запись для тестового поста номер'
+
+
+class LRUCacheTest(TestCase):
+    def setUp(self):
+        self.now = 0
+        self.cache = lookups.LRUCache(2, 10, clock=lambda: self.now)
+
+    def test_least_recently_used_is_evicted(self):
+        self.cache.set('a', 1)
+        self.cache.set('b', 2)
+        self.cache.get('a')
+        self.cache.set('c', 3)
+        self.assertIs(self.cache.get('b'), lookups.MISSING)
+        self.assertEqual(self.cache.get('a'), 1)
+        self.assertEqual(self.cache.stats()['evictions'], 1)
+
+    def test_entry_expires(self):
+        self.cache.set('a', 1)
+        self.now = 9
+        self.assertEqual(self.cache.get('a'), 1)
+        self.now = 10
+        self.assertIs(self.cache.get('a'), lookups.MISSING)
+        self.assertEqual(self.cache.stats()['hit_rate'], 0.5)
+
+    def test_index_follows_entries(self):
+        cache = lookups.LRUCache(2, 10, clock=lambda: self.now, index=abs)
+        for value in (1, -1, 2, 3):
+            cache.set(str(value), value)
+        self.assertEqual(cache.stats()['indexed'], 2)
+        self.assertEqual(cache.delete_indexed(3), {'3'})
+        self.assertIs(cache.get('3'), lookups.MISSING)
+        self.now = 10
+        cache.get('2')
+        self.assertEqual(cache.stats()['indexed'], 0)
+
+
+@override_settings(POSTS_LOOKUP_CACHE=True)
+class LookupCacheTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=USER_USERNAME)
+        cls.group = Group.objects.create(
+            title=GROUP_TITLE, slug=GROUP_SLUG, description='-'
+        )
+
+    def setUp(self):
+        cache.clear()
+        lookups.clear()
+
+    def test_repeated_lookup_skips_database(self):
+        lookups.get_group(GROUP_SLUG)
+        with self.assertNumQueries(0):
+            group = lookups.get_group(GROUP_SLUG)
+        self.assertEqual(group, self.group)
+        self.assertEqual(lookups.stats()['group']['hits'], 1)
+        with self.assertRaises(Http404):
+            lookups.get_group('missing')
+
+    def test_group_save_evicts(self):
+        """Переименованная группа видна сразу, старый slug — 404."""
+        self.client.get(reverse('posts:group_list', args=[GROUP_SLUG]))
+        group = Group.objects.get(pk=self.group.pk)
+        group.slug = 'new-slug'
+        group.title = 'Новое название'
+        group.save()
+        response = self.client.get(
+            reverse('posts:group_list', args=['new-slug'])
+        )
+        self.assertEqual(response.context['group'].title, 'Новое название')
+        with self.assertRaises(Http404):
+            lookups.get_group(GROUP_SLUG)
+
+    def test_author_stats_stay_fresh(self):
+        """Новые посты и подписчики сбрасывают автора из кэша."""
+        lookups.get_author(USER_USERNAME)
+        Post.objects.create(text=POST_TEXT, author=self.user)
+        self.assertEqual(lookups.get_author(USER_USERNAME).stats.post_count, 1)
+        reader = User.objects.create_user(username='Reader')
+        Follow.objects.create(user=reader, author=self.user)
+        self.assertEqual(
+            lookups.get_author(USER_USERNAME).stats.follower_count, 1
+        )
+        User.objects.get(pk=self.user.pk).delete()
+        with self.assertRaises(Http404):
+            lookups.get_author(USER_USERNAME)
+
+    @override_settings(POSTS_LOOKUP_SHARED_CACHE=True)
+    def test_shared_cache(self):
+        lookups.get_author(USER_USERNAME)
+        lookups.authors.cache.clear()
+        with self.assertNumQueries(0):
+            lookups.get_author(USER_USERNAME)
+        user = User.objects.get(pk=self.user.pk)
+        user.first_name = 'Имя'
+        user.save()
+        lookups.authors.cache.clear()
+        self.assertEqual(lookups.get_author(USER_USERNAME).first_name, 'Имя')
+
+    @override_settings(POSTS_LOOKUP_SHARED_CACHE=True)
+    def test_shared_cache_keeps_public_fields(self):
+        """В общий кэш не попадают хеш пароля и почта."""
+        lookups.get_author(USER_USERNAME)
+        author = cache.get(lookups.SHARED_KEY.format('author', USER_USERNAME))
+        self.assertEqual(author.username, USER_USERNAME)
+        self.assertNotIn('password', author.__dict__)
+        self.assertNotIn('email', author.__dict__)
+        response = self.client.get(
+            reverse('posts:profile', args=[USER_USERNAME])
+        )
+        self.assertContains(response, 'Всего постов: 0')
+
+    @override_settings(POSTS_LOOKUP_SHARED_CACHE=True)
+    def test_rename_evicts_old_username(self):
+        lookups.get_author(USER_USERNAME)
+        lookups.authors.cache.clear()
+        user = User.objects.get(pk=self.user.pk)
+        user.username = 'Renamed'
+        user.save()
+        with self.assertRaises(Http404):
+            lookups.get_author(USER_USERNAME)
+        self.assertEqual(lookups.get_author('Renamed').pk, self.user.pk)
+
+    def test_stats_exported(self):
+        lookups.get_group(GROUP_SLUG)
+        self.assertIn(
+            'yatube_lookup_cache_misses_total{cache="group"} 1',
+            metrics.render()
+        )
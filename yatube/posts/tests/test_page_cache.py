@@ -0,0 +1,131 @@
+from http import HTTPStatus
+
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from .. import page_cache
+from ..models import Group, Post, User
+
+GROUP_TITLE = 'Тестовая группа'
+GROUP_SLUG = 'test-slug'
+GROUP_DESCRIPTION = 'Тест описание'
+USER_USERNAME = 'Anonimus'
+USER_USERNAME1 = 'Vasya'
+POST_TEXT = 'Тестовая запись для тестового поста номер'
+
+
+@override_settings(POSTS_PAGE_CACHE=True)
+class PageCacheTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=USER_USERNAME)
+        cls.other_user = User.objects.create_user(username=USER_USERNAME1)
+        cls.group = Group.objects.create(
+            title=GROUP_TITLE,
+            slug=GROUP_SLUG,
+            description=GROUP_DESCRIPTION,
+        )
+        cls.post = Post.objects.create(
+            text=POST_TEXT,
+            author=cls.user,
+            group=cls.group,
+        )
+        cls.index_url = reverse('posts:index')
+        cls.group_url = reverse(
+            'posts:group_list', kwargs={'slug': GROUP_SLUG}
+        )
+        cls.profile_url = reverse(
+            'posts:profile', kwargs={'username': USER_USERNAME}
+        )
+        cls.other_profile_url = reverse(
+            'posts:profile', kwargs={'username': USER_USERNAME1}
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_anonymous_page_is_cached(self):
+        """Повторная анонимная страница отдаётся из кэша без запросов."""
+        for url in (self.index_url, self.group_url, self.profile_url):
+            with self.subTest(url=url):
+                first = self.client.get(url)
+                with self.assertNumQueries(0):
+                    second = self.client.get(url)
+                self.assertEqual(first.content, second.content)
+        self.assertEqual(page_cache.stats()['hits'], 3)
+        self.assertEqual(page_cache.stats()['misses'], 3)
+
+    def test_page_token_is_part_of_key(self):
+        """Разные страницы ленты кэшируются отдельно."""
+        self.client.get(self.index_url)
+        response = self.client.get(self.index_url, {'page': 2})
+        self.assertIsNotNone(response.context)
+
+    def test_authorized_user_bypasses_cache(self):
+        """Авторизованный пользователь не читает и не пишет кэш."""
+        self.authorized_client.get(self.index_url)
+        self.authorized_client.get(self.index_url)
+        self.assertEqual(page_cache.stats()['hits'], 0)
+        self.assertEqual(page_cache.stats()['misses'], 0)
+
+    def test_post_change_invalidates_only_its_scopes(self):
+        """Новый пост сбрасывает свои ленты, но не чужой профиль."""
+        for url in (self.index_url, self.group_url, self.profile_url,
+                    self.other_profile_url):
+            self.client.get(url)
+        Post.objects.create(
+            text=f'{POST_TEXT} новый', author=self.user, group=self.group
+        )
+        for url in (self.index_url, self.group_url, self.profile_url):
+            with self.subTest(url=url):
+                self.assertContains(self.client.get(url), 'новый')
+        with self.assertNumQueries(0):
+            self.client.get(self.other_profile_url)
+        self.assertEqual(page_cache.stats()['invalidations'], 3)
+
+    def test_author_rename_invalidates_feeds(self):
+        """Смена имени сбрасывает общую ленту и ленты групп автора,
+        а профиль по старому логину больше не отдаётся."""
+        for url in (self.index_url, self.group_url, self.profile_url):
+            self.client.get(url)
+        user = User.objects.get(pk=self.user.pk)
+        user.username = 'Renamed'
+        user.first_name = 'Новое'
+        user.last_name = 'Имя'
+        user.save()
+        for url in (self.index_url, self.group_url):
+            with self.subTest(url=url):
+                self.assertContains(self.client.get(url), 'Новое Имя')
+        response = self.client.get(self.profile_url)
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    def test_group_slug_change_invalidates_old_address(self):
+        """Страница группы по старому slug больше не отдаётся из кэша."""
+        self.client.get(self.group_url)
+        group = Group.objects.get(pk=self.group.pk)
+        group.slug = 'new-slug'
+        group.save()
+        response = self.client.get(self.group_url)
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    def test_group_rename_invalidates_author_profiles(self):
+        """Новое название группы видно в профиле её автора."""
+        self.client.get(self.profile_url)
+        group = Group.objects.get(pk=self.group.pk)
+        group.title = 'Новое название'
+        group.save()
+        response = self.client.get(self.profile_url)
+        self.assertContains(response, 'Новое название')
+
+    def test_group_delete_invalidates_feeds(self):
+        """После удаления группы ленты не ссылаются на неё из кэша."""
+        for url in (self.index_url, self.profile_url):
+            self.client.get(url)
+        Group.objects.get(pk=self.group.pk).delete()
+        for url in (self.index_url, self.profile_url):
+            with self.subTest(url=url):
+                self.assertNotContains(self.client.get(url), self.group_url)
@@ -0,0 +1,91 @@
+from django.conf import settings
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from ..models import Group, Post, User
+from ..paginators import KeysetPaginator, decode_cursor, encode_cursor
+
+GROUP_TITLE = 'Тестовая группа'
+GROUP_SLUG = 'test-slug'
+GROUP_DESCRIPTION = 'Тест описание'
+USER_USERNAME = 'Anonimus'
+POST_TEXT = 'Тестовая запись для тестового поста номер'
+SECOND_PAGE_COUNT = 3
+
+
+class KeysetPaginatorTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=USER_USERNAME)
+        cls.group = Group.objects.create(
+            title=GROUP_TITLE,
+            slug=GROUP_SLUG,
+            description=GROUP_DESCRIPTION,
+        )
+        Post.objects.bulk_create(
+            [Post(text=f'{POST_TEXT} {i}',
+                  author=cls.user,
+                  group=cls.group)
+             for i in range(settings.POST_COUNT + SECOND_PAGE_COUNT)]
+        )
+        cls.posts = list(Post.objects.order_by('-pub_date', '-id'))
+
+    def test_cursor_round_trip(self):
+        """Токен курсора однозначно восстанавливает ключ."""
+        post = self.posts[0]
+        self.assertEqual(
+            decode_cursor(encode_cursor(post.pub_date, post.pk)),
+            (post.pub_date, post.pk)
+        )
+        for token in ('', 'garbage', '!!!', 'bnVsbA'):
+            with self.subTest(token=token):
+                self.assertIsNone(decode_cursor(token))
+
+    def test_pages_follow_each_other(self):
+        """Страницы по after/before идут без пропусков и повторов."""
+        paginator = KeysetPaginator(Post.objects.all(), settings.POST_COUNT)
+        first = paginator.get_page()
+        self.assertEqual(list(first), self.posts[:settings.POST_COUNT])
+        self.assertFalse(first.has_previous())
+        self.assertTrue(first.has_next())
+
+        second = paginator.get_page(after_token=first.next_cursor)
+        self.assertEqual(list(second), self.posts[settings.POST_COUNT:])
+        self.assertTrue(second.has_previous())
+        self.assertFalse(second.has_next())
+
+        back = paginator.get_page(before_token=second.previous_cursor)
+        self.assertEqual(list(back), list(first))
+        self.assertFalse(back.has_previous())
+
+    def test_page_cost_is_one_query(self):
+        """Глубокая страница стоит один запрос без COUNT(*)."""
+        paginator = KeysetPaginator(Post.objects.all(), settings.POST_COUNT)
+        token = encode_cursor(self.posts[-2].pub_date, self.posts[-2].pk)
+        with self.assertNumQueries(1):
+            page = paginator.get_page(after_token=token)
+            self.assertEqual(list(page), self.posts[-1:])
+
+    @override_settings(POSTS_KEYSET_PAGINATION=True)
+    def test_feeds_use_keyset_pages(self):
+        """Ленты отдают курсорные страницы, когда режим включён."""
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', kwargs={'slug': GROUP_SLUG}),
+            reverse('posts:profile', kwargs={'username': USER_USERNAME}),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                page_obj = response.context['page_obj']
+                self.assertEqual(len(page_obj), settings.POST_COUNT)
+                self.assertContains(
+                    response, f'?after={page_obj.next_cursor}'
+                )
+                response = self.client.get(
+                    url, {'after': page_obj.next_cursor}
+                )
+                self.assertEqual(
+                    len(response.context['page_obj']), SECOND_PAGE_COUNT
+                )
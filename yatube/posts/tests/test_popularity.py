@@ -0,0 +1,131 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from jobs.models import Job
+
+from .. import popularity, view_counts
+from ..models import Group, Post, PostPopularity, PostViewCount, User
+
+GROUP_SLUG = 'test-slug'
+GROUP_TITLE = 'Тестовая группа'
+USER_USERNAME = 'Anonimus'
+POST_TEXT = 'Тестовая запись для тестового поста номер'
+POSTS_NUMBER = 3
+
+
+class PopularityTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=USER_USERNAME)
+        cls.group = Group.objects.create(
+            title=GROUP_TITLE, slug=GROUP_SLUG, description='-'
+        )
+        Post.objects.bulk_create(
+            Post(author=cls.user, text=f'{POST_TEXT} {number}')
+            for number in range(POSTS_NUMBER)
+        )
+        # Посты опубликованы и изменены давно, с одинаковой датой:
+        # рейтинг решают просмотры и группа.
+        cls.long_ago = timezone.now() - timedelta(hours=2)
+        Post.objects.update(pub_date=cls.long_ago, updated=cls.long_ago)
+        cls.first, cls.second, cls.third = Post.objects.order_by('pk')
+
+    def ranking(self):
+        return list(
+            PostPopularity.objects.order_by('-score', '-post_id')
+            .values_list('post', flat=True)
+        )
+
+    def age_ranking(self):
+        """Делает вид, что прошлый прогон был час назад, а просмотры
+        до него записаны ещё раньше."""
+        PostPopularity.objects.update(
+            refreshed=timezone.now() - timedelta(hours=1)
+        )
+        PostViewCount.objects.update(updated=self.long_ago)
+
+    def test_views_and_group_raise_score(self):
+        view_counts.write({self.first.pk: 5, self.second.pk: 5})
+        Post.objects.filter(pk=self.second.pk).update(group=self.group)
+        self.assertEqual(popularity.refresh(), POSTS_NUMBER)
+        self.assertEqual(
+            self.ranking(), [self.second.pk, self.first.pk, self.third.pk]
+        )
+        second = PostPopularity.objects.get(post=self.second)
+        self.assertEqual((second.views, second.group_activity), (5, 1))
+
+    def test_refresh_is_incremental(self):
+        popularity.refresh()
+        self.age_ranking()
+        self.assertEqual(popularity.refresh(), 0)
+        view_counts.write({self.third.pk: 1})
+        self.assertEqual(popularity.refresh(), 1)
+        self.assertEqual(self.ranking()[0], self.third.pk)
+        self.age_ranking()
+        post = Post.objects.create(author=self.user, text=POST_TEXT)
+        self.assertEqual(popularity.refresh(), 1)
+        # Два часа свежести весят меньше, чем удвоение просмотров.
+        self.assertEqual(self.ranking()[:2], [self.third.pk, post.pk])
+        self.assertEqual(popularity.refresh(full=True), POSTS_NUMBER + 1)
+
+    def test_new_group_post_rescores_group(self):
+        Post.objects.filter(pk=self.first.pk).update(
+            group=self.group, pub_date=timezone.now()
+        )
+        popularity.refresh()
+        self.age_ranking()
+        Post.objects.create(
+            author=self.user, text=POST_TEXT, group=self.group
+        )
+        self.assertEqual(popularity.refresh(), 2)
+        first = PostPopularity.objects.get(post=self.first)
+        self.assertEqual(first.group_activity, 2)
+
+    @override_settings(POSTS_POPULAR_SIDEBAR=2)
+    def test_popular_feed_and_sidebar(self):
+        view_counts.write({self.third.pk: 3, self.second.pk: 1})
+        popularity.refresh()
+        response = self.client.get(reverse('posts:popular'))
+        self.assertEqual(
+            [post.pk for post in response.context['page_obj']],
+            [self.third.pk, self.second.pk, self.first.pk]
+        )
+        response = self.client.get(
+            reverse('posts:post_detail', args=[self.first.pk])
+        )
+        self.assertContains(response, 'Популярное')
+        self.assertContains(
+            response, reverse('posts:post_detail', args=[self.third.pk])
+        )
+        self.assertNotContains(
+            response, reverse('posts:post_detail', args=[self.first.pk])
+            + '"'
+        )
+
+    def test_empty_ranking_message(self):
+        """Пока рейтинга нет, страница говорит об этом и потоком."""
+        for streaming in (False, True):
+            with self.subTest(streaming=streaming), override_settings(
+                POSTS_STREAMING_FEEDS=streaming
+            ):
+                response = self.client.get(reverse('posts:popular'))
+                self.assertIn(
+                    'Рейтинг ещё не посчитан.', response.getvalue().decode()
+                )
+
+    @override_settings(POSTS_POPULAR_REFRESH_INTERVAL=60)
+    def test_refresh_task_reschedules_itself(self):
+        call_command('refresh_popular_posts', enqueue=True, stdout=StringIO())
+        call_command(
+            'run_worker', once=True, threads=1, stdout=StringIO()
+        )
+        self.assertEqual(PostPopularity.objects.count(), POSTS_NUMBER)
+        job = Job.objects.get()
+        self.assertEqual(job.task, 'posts.refresh_popularity')
+        self.assertGreater(job.run_at, timezone.now())
@@ -0,0 +1,84 @@
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.test import TestCase
+from django.urls import reverse
+
+from .. import fragments
+from ..models import Group, Post, User
+
+GROUP_TITLE = 'Тестовая группа'
+GROUP_SLUG = 'test-slug'
+GROUP_DESCRIPTION = 'Тест описание'
+USER_USERNAME = 'Anonimus'
+POST_TEXT = 'Тестовая запись для тестового поста номер'
+
+
+class PostCardCacheTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=USER_USERNAME)
+        cls.group = Group.objects.create(
+            title=GROUP_TITLE,
+            slug=GROUP_SLUG,
+            description=GROUP_DESCRIPTION,
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.post = Post.objects.create(
+            text=POST_TEXT, author=self.user, group=self.group
+        )
+
+    def card_key(self, post, show_group=True):
+        version = fragments.card_version(post.author_id, post.group_id)
+        return make_template_fragment_key(
+            'post_card', [post.id, post.updated, show_group, version]
+        )
+
+    def test_card_is_shared_between_feeds(self):
+        """Карточка, собранная на главной, переиспользуется в профиле."""
+        self.client.get(reverse('posts:index'))
+        card = cache.get(self.card_key(self.post))
+        self.assertIn(POST_TEXT, card)
+        cache.set(self.card_key(self.post), 'из кэша')
+        response = self.client.get(
+            reverse('posts:profile', kwargs={'username': USER_USERNAME})
+        )
+        self.assertContains(response, 'из кэша')
+
+    def test_group_feed_has_own_card(self):
+        """В ленте группы карточка без ссылки на группу."""
+        self.client.get(
+            reverse('posts:group_list', kwargs={'slug': GROUP_SLUG})
+        )
+        card = cache.get(self.card_key(self.post, show_group=False))
+        self.assertNotIn(
+            reverse('posts:group_list', kwargs={'slug': GROUP_SLUG}), card
+        )
+
+    def test_save_changes_card_version(self):
+        """После редактирования поста карточка собирается заново."""
+        self.client.get(reverse('posts:index'))
+        self.post.text = 'Исправленный текст'
+        self.post.save()
+        response = self.client.get(reverse('posts:index'))
+        self.assertContains(response, 'Исправленный текст')
+
+    def test_rename_changes_card_version(self):
+        """Новые имя автора и группа видны в ленте без правки поста."""
+        self.client.get(reverse('posts:index'))
+        user = User.objects.get(pk=self.user.pk)
+        user.first_name = 'Новое'
+        user.last_name = 'Имя'
+        user.save()
+        group = Group.objects.get(pk=self.group.pk)
+        group.title = 'Новая группа'
+        group.slug = 'new-slug'
+        group.save()
+        response = self.client.get(reverse('posts:index'))
+        self.assertContains(response, 'Новое Имя')
+        self.assertContains(response, 'Новая группа')
+        self.assertContains(
+            response, reverse('posts:group_list', args=['new-slug'])
+        )
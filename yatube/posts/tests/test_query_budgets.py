@@ -0,0 +1,100 @@
+from http import HTTPStatus
+
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core.testing import max_queries
+
+from .. import popularity, view_counts
+from ..models import Group, Post, User
+
+USER_USERNAME = 'Anonimus'
+GROUP_SLUG = 'test-slug'
+POST_TEXT = 'Тестовая запись для тестового поста номер'
+AUTHORS = 5
+GROUPS = 3
+POSTS = 15
+
+
+class PostsQueryBudgetTest(TestCase):
+    """Страницы posts укладываются в бюджет запросов.
+
+    Постов больше страницы, у них разные авторы и группы, так что
+    запрос на каждую карточку ленты сразу превысит бюджет.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        users = [
+            User.objects.create_user(username=f'{USER_USERNAME}{i}')
+            for i in range(AUTHORS)
+        ]
+        groups = [
+            Group.objects.create(
+                title=f'Группа {i}', slug=f'{GROUP_SLUG}-{i}',
+                description='-'
+            )
+            for i in range(GROUPS)
+        ]
+        for i in range(POSTS):
+            Post.objects.create(
+                text=POST_TEXT, author=users[i % AUTHORS],
+                group=groups[i % GROUPS]
+            )
+        cls.post = Post.objects.first()
+        view_counts.write({cls.post.pk: 1})
+        popularity.refresh(full=True)
+        cls.author_client = Client()
+        cls.author_client.force_login(cls.post.author)
+
+    def test_guest_pages(self):
+        budgets = {
+            reverse('posts:index'): 2,
+            reverse('posts:group_list', args=[f'{GROUP_SLUG}-0']): 3,
+            reverse('posts:profile', args=[f'{USER_USERNAME}0']): 3,
+            reverse('posts:post_detail', args=[self.post.pk]): 1,
+            reverse('posts:search') + '?q=запись': 3,
+            reverse('posts:popular'): 2,
+        }
+        for url, budget in budgets.items():
+            with self.subTest(url=url), max_queries(budget):
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_author_pages(self):
+        # Сессия и пользователь добавляют к каждой странице два запроса.
+        budgets = {
+            reverse('posts:index'): 4,
+            reverse('posts:post_detail', args=[self.post.pk]): 3,
+            reverse('posts:post_create'): 3,
+            reverse('posts:post_edit', args=[self.post.pk]): 5,
+            reverse('posts:follow_index'): 4,
+            reverse('posts:profile', args=[f'{USER_USERNAME}1']): 6,
+        }
+        for url, budget in budgets.items():
+            with self.subTest(url=url), max_queries(budget):
+                response = self.author_client.get(url)
+            self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_follow_views(self):
+        # Подписка в том же запросе сдвигает счётчик подписчиков
+        # и одной вставкой раскладывает посты автора в ленту: число
+        # запросов не зависит от того, сколько у автора постов.
+        budgets = (
+            ('posts:profile_follow', 11),
+            ('posts:profile_unfollow', 7),
+        )
+        for name, budget in budgets:
+            url = reverse(name, args=[f'{USER_USERNAME}1'])
+            with self.subTest(url=url), max_queries(budget):
+                response = self.author_client.get(url)
+            self.assertEqual(response.status_code, HTTPStatus.FOUND)
+
+    @override_settings(POSTS_POPULAR_SIDEBAR=5)
+    def test_popular_sidebar(self):
+        # Блок популярных постов — один запрос к рейтингу с карточками.
+        url = reverse('posts:post_detail', args=[self.post.pk])
+        with max_queries(2):
+            response = self.client.get(url)
+        self.assertContains(response, '<h5 class="mt-4">Популярное</h5>')
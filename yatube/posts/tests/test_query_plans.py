@@ -0,0 +1,134 @@
+import re
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .. import cards, popularity
+from ..models import Follow, Group, Post, User
+
+GROUP_TITLE = 'Тестовая группа'
+GROUP_SLUG = 'test-slug'
+GROUP_DESCRIPTION = 'Тест описание'
+USER_USERNAME = 'Anonimus'
+POST_TEXT = 'Тестовая запись для тестового поста номер'
+POSTS_NUMBER = 30
+
+# Полный проход таблицы без индекса: «SCAN posts_post» или
+# «SCAN TABLE posts_post» в старых версиях SQLite.
+FULL_SCAN = re.compile(r'\bSCAN (TABLE )?posts_post\b(?!.*\bINDEX\b)')
+TIMELINE_SCAN = re.compile(
+    r'\bSCAN (TABLE )?posts_timelineentry\b(?!.*\bINDEX\b)'
+)
+CARD_SCAN = re.compile(r'\bSCAN (TABLE )?posts_postcard\b(?!.*\bINDEX\b)')
+POPULARITY_SCAN = re.compile(
+    r'\bSCAN (TABLE )?posts_postpopularity\b(?!.*\bINDEX\b)'
+)
+TEMP_SORT = 'USE TEMP B-TREE'
+
+
+class FeedQueryPlanTest(TestCase):
+    """Запросы лент из posts.views не сортируют во временном B-дереве
+    и не сканируют posts_post целиком."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=USER_USERNAME)
+        cls.group = Group.objects.create(
+            title=GROUP_TITLE,
+            slug=GROUP_SLUG,
+            description=GROUP_DESCRIPTION,
+        )
+        Post.objects.bulk_create(
+            [Post(text=POST_TEXT, author=cls.user, group=cls.group)
+             for _ in range(POSTS_NUMBER)]
+        )
+        cls.post = Post.objects.first()
+
+    def feed_queries(self):
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:index') + '?page=2',
+            reverse('posts:group_list', kwargs={'slug': GROUP_SLUG}),
+            reverse('posts:profile', kwargs={'username': USER_USERNAME}),
+            reverse('posts:post_detail', kwargs={'post_id': self.post.pk}),
+        )
+        with CaptureQueriesContext(connection) as context:
+            for url in urls:
+                response = self.client.get(url)
+                next_cursor = getattr(
+                    response.context['page_obj'], 'next_cursor', None
+                ) if 'page_obj' in response.context else None
+                if next_cursor:
+                    self.client.get(url, {'after': next_cursor})
+        return [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('SELECT')
+            and 'posts_post' in query['sql']
+        ]
+
+    def assertPlansUseIndexes(self, queries, full_scan=FULL_SCAN):
+        self.assertTrue(queries)
+        with connection.cursor() as cursor:
+            for sql in queries:
+                cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+                plan = '\n'.join(row[-1] for row in cursor.fetchall())
+                with self.subTest(sql=sql):
+                    self.assertNotIn(TEMP_SORT, plan)
+                    self.assertIsNone(full_scan.search(plan), plan)
+
+    def test_paginated_feed_plans(self):
+        self.assertPlansUseIndexes(self.feed_queries())
+
+    @override_settings(POSTS_KEYSET_PAGINATION=True)
+    def test_keyset_feed_plans(self):
+        self.assertPlansUseIndexes(self.feed_queries())
+
+    @override_settings(POSTS_CARD_FEEDS=True)
+    def test_card_feed_plans(self):
+        cards.rebuild()
+        queries = self.feed_queries()
+        self.assertPlansUseIndexes(queries, CARD_SCAN)
+        with self.settings(POSTS_KEYSET_PAGINATION=True):
+            self.assertPlansUseIndexes(self.feed_queries(), CARD_SCAN)
+
+    @override_settings(POSTS_POPULAR_SIDEBAR=5)
+    def test_popular_feed_plans(self):
+        """Популярное читается с конца индекса по рейтингу."""
+        popularity.refresh()
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(reverse('posts:popular'), {'page': 2})
+            self.client.get(
+                reverse('posts:post_detail', args=[self.post.pk])
+            )
+        queries = [
+            query['sql'] for query in context.captured_queries
+            if 'posts_postpopularity' in query['sql']
+        ]
+        self.assertPlansUseIndexes(queries, POPULARITY_SCAN)
+
+    def test_follow_feed_plans(self):
+        """Лента подписок читается по индексу (user, pub_date, post)."""
+        reader = User.objects.create_user(username='Reader')
+        Follow.objects.create(user=reader, author=self.user)
+        self.client.force_login(reader)
+        url = reverse('posts:follow_index')
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+            self.client.get(url, {'after': response.context[
+                'page_obj'
+            ].next_cursor})
+        queries = [
+            query['sql'] for query in context.captured_queries
+            if 'posts_timelineentry' in query['sql']
+        ]
+        self.assertTrue(queries)
+        with connection.cursor() as cursor:
+            for sql in queries:
+                cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+                plan = '\n'.join(row[-1] for row in cursor.fetchall())
+                with self.subTest(sql=sql):
+                    self.assertNotIn(TEMP_SORT, plan)
+                    self.assertIsNone(TIMELINE_SCAN.search(plan), plan)
@@ -0,0 +1,82 @@
+from importlib import import_module
+from io import StringIO
+
+from django.apps import apps
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from ..models import EXCERPT_LENGTH, Post, PostCard, User
+
+USER_USERNAME = 'Anonimus'
+POST_TEXT = 'Первый абзац <b>поста</b>\n\nВторой абзац'
+POST_HTML = (
+    '<p>Первый абзац &lt;b&gt;поста&lt;/b&gt;</p>\n\n<p>Второй абзац</p>'
+)
+
+
+class RenderedTextTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=USER_USERNAME)
+
+    def setUp(self):
+        self.post = Post.objects.create(text=POST_TEXT, author=self.user)
+
+    def test_text_rendered_on_save(self):
+        """При сохранении пост получает HTML и выдержку."""
+        self.assertEqual(self.post.text_html, POST_HTML)
+        long_post = Post.objects.create(
+            text='слово ' * EXCERPT_LENGTH, author=self.user
+        )
+        self.assertEqual(len(long_post.excerpt), EXCERPT_LENGTH)
+
+    def test_form_save_renders_text(self):
+        """Редактирование через форму обновляет сохранённый HTML."""
+        client = self.client
+        client.force_login(self.user)
+        client.post(
+            reverse('posts:post_edit', kwargs={'post_id': self.post.pk}),
+            data={'text': 'Новый текст'}
+        )
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.text_html, '<p>Новый текст</p>')
+
+    def test_pages_read_stored_fields(self):
+        """Пост показывает сохранённый HTML, лента не грузит text."""
+        response = self.client.get(
+            reverse('posts:post_detail', kwargs={'post_id': self.post.pk})
+        )
+        self.assertContains(response, POST_HTML, html=True)
+        response = self.client.get(reverse('posts:index'))
+        post = response.context['page_obj'][0]
+        self.assertEqual(
+            post.get_deferred_fields(), {'text', 'text_html'}
+        )
+
+    def test_backfill_command(self):
+        """Команда заполняет HTML постов, созданных в обход save()."""
+        Post.objects.bulk_create(
+            [Post(text=POST_TEXT, author=self.user) for _ in range(3)]
+        )
+        call_command('render_post_text', batch_size=2, stdout=StringIO())
+        self.assertFalse(Post.objects.filter(text_html='').exists())
+        self.assertEqual(
+            set(Post.objects.values_list('excerpt', flat=True)),
+            {POST_TEXT}
+        )
+
+    def test_migration_backfills_existing_posts(self):
+        """Миграция заполняет HTML и выдержку постов до 0013."""
+        Post.objects.update(text_html='', excerpt='')
+        PostCard.objects.update(excerpt='')
+        migration = import_module(
+            'posts.migrations.0019_backfill_rendered_text'
+        )
+        migration.render_text(apps, None)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.text_html, POST_HTML)
+        self.assertEqual(self.post.excerpt, POST_TEXT)
+        self.assertEqual(PostCard.objects.get().excerpt, POST_TEXT)
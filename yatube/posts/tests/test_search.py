@@ -0,0 +1,79 @@
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from .. import search
+from ..models import Post, User
+
+USER_USERNAME = 'Anonimus'
+ADMIN_USERNAME = 'Admin'
+
+
+class SearchTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=USER_USERNAME)
+        cls.admin = User.objects.create_superuser(
+            username=ADMIN_USERNAME, email='admin@test.ru', password='pass'
+        )
+        cls.apple = Post.objects.create(
+            text='Яблоки и груши растут в саду', author=cls.user
+        )
+        cls.apples = Post.objects.create(
+            text='Яблоки, яблоки и ещё раз яблоки', author=cls.user
+        )
+        cls.pear = Post.objects.create(text='Груши спелые', author=cls.user)
+
+    def search(self, text, **params):
+        response = self.client.get(
+            reverse('posts:search'), {'q': text, **params}
+        )
+        return list(response.context['page_obj'])
+
+    def test_search_ranks_results(self):
+        """Более релевантный пост идёт первым."""
+        self.assertEqual(self.search('яблоки'), [self.apples, self.apple])
+        self.assertEqual(self.search('груши сад'), [self.apple])
+
+    def test_index_follows_posts(self):
+        """Правка и удаление поста сразу видны в поиске."""
+        self.pear.text = 'Сливы спелые'
+        self.pear.save()
+        self.assertEqual(self.search('груши'), [self.apple])
+        self.assertEqual(self.search('сливы'), [self.pear])
+        self.pear.delete()
+        self.assertEqual(self.search('сливы'), [])
+
+    def test_user_input_is_quoted(self):
+        """Операторы FTS5 в запросе не ломают поиск."""
+        for text in ('"', 'яблоки OR', 'NEAR(', '*', '   '):
+            with self.subTest(text=text):
+                self.search(text)
+
+    def test_search_is_paginated(self):
+        """Результаты поиска разбиты на страницы с сохранением запроса."""
+        Post.objects.bulk_create(
+            [Post(text='Вишня', author=self.user)
+             for _ in range(settings.POST_COUNT + 1)]
+        )
+        call_command('rebuild_search_index', stdout=StringIO())
+        self.assertEqual(len(self.search('вишня')), settings.POST_COUNT)
+        self.assertEqual(len(self.search('вишня', page=2)), 1)
+        response = self.client.get(reverse('posts:search'), {'q': 'вишня'})
+        self.assertContains(response, '?q=%D0%B2%D0%B8%D1%88%D0%BD%D1%8F&amp;')
+
+    def test_admin_uses_index(self):
+        """Поиск в админке идёт через полнотекстовый индекс."""
+        client = Client()
+        client.force_login(self.admin)
+        response = client.get(
+            reverse('admin:posts_post_changelist'), {'q': 'груши'}
+        )
+        self.assertEqual(
+            set(response.context['cl'].result_list), {self.apple, self.pear}
+        )
+        self.assertIn(search.TABLE, str(response.context['cl'].queryset.query))
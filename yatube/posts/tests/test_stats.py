@@ -0,0 +1,77 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from ..models import AuthorStats, Group, Post, User
+
+GROUP_TITLE = 'Тестовая группа'
+GROUP_SLUG = 'test-slug'
+GROUP_DESCRIPTION = 'Тест описание'
+USER_USERNAME = 'Anonimus'
+POST_TEXT = 'Тестовая запись для тестового поста номер'
+
+
+class PostCountersTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=USER_USERNAME)
+        cls.group = Group.objects.create(
+            title=GROUP_TITLE,
+            slug=GROUP_SLUG,
+            description=GROUP_DESCRIPTION,
+        )
+        cls.other_group = Group.objects.create(
+            title=f'{GROUP_TITLE} 2',
+            slug=f'{GROUP_SLUG}_2',
+            description=GROUP_DESCRIPTION,
+        )
+
+    def assertCounters(self, author, group, other_group):
+        self.group.refresh_from_db()
+        self.other_group.refresh_from_db()
+        self.assertEqual(
+            AuthorStats.objects.get(author=self.user).post_count, author
+        )
+        self.assertEqual(self.group.post_count, group)
+        self.assertEqual(self.other_group.post_count, other_group)
+
+    def test_signals_update_counters(self):
+        """Счётчики следят за созданием, сменой группы и удалением."""
+        post = Post.objects.create(
+            text=POST_TEXT, author=self.user, group=self.group
+        )
+        Post.objects.create(text=POST_TEXT, author=self.user)
+        self.assertCounters(2, 1, 0)
+        post.group = self.other_group
+        post.save()
+        self.assertCounters(2, 0, 1)
+        post.delete()
+        self.assertCounters(1, 0, 0)
+
+    def test_rebuild_command(self):
+        """Команда пересчитывает счётчики после bulk_create."""
+        Post.objects.bulk_create(
+            [Post(text=POST_TEXT, author=self.user, group=self.group)
+             for _ in range(3)]
+        )
+        call_command('rebuild_post_counters', stdout=StringIO())
+        self.assertCounters(3, 3, 0)
+
+    def test_pages_read_stored_counter(self):
+        """Профиль и пост выводят счётчик без отдельного COUNT(*)."""
+        post = Post.objects.create(text=POST_TEXT, author=self.user)
+        # Профиль: автор со счётчиком, COUNT(*) пагинатора и посты.
+        pages = {
+            reverse('posts:profile', kwargs={'username': USER_USERNAME}): 3,
+            reverse('posts:post_detail', kwargs={'post_id': post.pk}): 1,
+        }
+        for url, queries in pages.items():
+            with self.subTest(url=url):
+                with self.assertNumQueries(queries):
+                    response = self.client.get(url)
+                self.assertRegex(
+                    response.content.decode(), r'постов[^<]*(<span>)?1'
+                )
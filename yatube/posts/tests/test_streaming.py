@@ -0,0 +1,78 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import Group, Post, User
+
+GROUP_TITLE = 'Тестовая группа'
+GROUP_SLUG = 'test-slug'
+USER_USERNAME = 'Anonimus'
+POST_TEXT = 'Тестовая запись для тестового поста номер'
+POSTS_NUMBER = 13
+
+
+def page_queries(queries):
+    return [
+        query['sql'] for query in queries
+        if query['sql'].startswith('SELECT') and 'LIMIT' in query['sql']
+    ]
+
+
+@override_settings(POSTS_STREAMING_FEEDS=True)
+class StreamingFeedsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=USER_USERNAME)
+        cls.group = Group.objects.create(
+            title=GROUP_TITLE, slug=GROUP_SLUG, description='-'
+        )
+        for i in range(POSTS_NUMBER):
+            Post.objects.create(
+                text=f'{POST_TEXT} {i}', author=cls.user, group=cls.group
+            )
+        cls.urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', args=[GROUP_SLUG]),
+            reverse('posts:profile', args=[USER_USERNAME]),
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_posts_are_read_while_streaming(self):
+        """Посты выбираются после того, как шапка уже отдана."""
+        for url in self.urls:
+            with self.subTest(url=url):
+                with CaptureQueriesContext(connection) as context:
+                    response = self.client.get(url)
+                self.assertTrue(response.streaming)
+                self.assertEqual(page_queries(context.captured_queries), [])
+                chunks = iter(response.streaming_content)
+                self.assertIn(b'<header', next(chunks))
+                with CaptureQueriesContext(connection) as context:
+                    content = b''.join(chunks).decode()
+                self.assertEqual(
+                    len(page_queries(context.captured_queries)), 1
+                )
+                self.assertEqual(content.count('<article>'), 10)
+                self.assertEqual(content.count('<hr>'), 9)
+                self.assertLess(
+                    content.index(f'{POST_TEXT} {POSTS_NUMBER - 1}'),
+                    content.index(f'{POST_TEXT} {POSTS_NUMBER - 2}'),
+                )
+                self.assertIn('page=2', content)
+
+    def test_group_feed_hides_group_link(self):
+        response = self.client.get(self.urls[1])
+        content = b''.join(response.streaming_content).decode()
+        self.assertNotIn(f'Все записи группы {GROUP_TITLE}', content)
+
+    @override_settings(POSTS_KEYSET_PAGINATION=True)
+    def test_keyset_pagination(self):
+        response = self.client.get(self.urls[0])
+        content = b''.join(response.streaming_content).decode()
+        self.assertEqual(content.count('<article>'), 10)
+        self.assertIn('after=', content)
@@ -0,0 +1,74 @@
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TransactionTestCase, override_settings
+
+from .. import thumbnails
+from ..models import Post, User
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+USER_USERNAME = 'Anonimus'
+POST_TEXT = 'Тестовая запись для тестового поста номер'
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class EagerThumbnailsTest(TransactionTestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.user = User.objects.create_user(username=USER_USERNAME)
+        shutil.rmtree(
+            os.path.join(TEMP_MEDIA_ROOT, 'cache'), ignore_errors=True
+        )
+
+    def create_post(self):
+        return Post.objects.create(
+            text=POST_TEXT,
+            author=self.user,
+            image=SimpleUploadedFile(
+                name='small.gif', content=SMALL_GIF, content_type='image/gif'
+            ),
+        )
+
+    def thumbnail_files(self):
+        cache_dir = os.path.join(TEMP_MEDIA_ROOT, 'cache')
+        return [
+            name for _, _, names in os.walk(cache_dir) for name in names
+        ]
+
+    def test_thumbnails_built_after_save(self):
+        """Миниатюры всех размеров готовы сразу после сохранения."""
+        self.create_post()
+        self.assertEqual(
+            len(self.thumbnail_files()),
+            len(settings.POST_THUMBNAIL_GEOMETRIES)
+        )
+
+    @override_settings(POSTS_EAGER_THUMBNAILS=False)
+    def test_backfill_builds_thumbnails(self):
+        """Досборка строит миниатюры для постов без них."""
+        post = self.create_post()
+        Post.objects.create(text=POST_TEXT, author=self.user)
+        self.assertEqual(self.thumbnail_files(), [])
+        self.assertEqual(
+            thumbnails.generate_for_posts(
+                Post.objects.values_list('pk', flat=True)
+            ),
+            (1, 0)
+        )
+        self.assertEqual(len(self.thumbnail_files()), 1)
+        self.assertTrue(post.image)
@@ -0,0 +1,105 @@
+from django.conf import settings
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..models import AuthorStats, Follow, Post, TimelineEntry, User
+
+USER_USERNAME = 'Anonimus'
+AUTHOR_USERNAME = 'Vasya'
+STAR_USERNAME = 'Star'
+POST_TEXT = 'Тестовая запись для тестового поста номер'
+
+
+class TimelineTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=USER_USERNAME)
+        cls.author = User.objects.create_user(username=AUTHOR_USERNAME)
+        cls.star = User.objects.create_user(username=STAR_USERNAME)
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def follow(self, author):
+        self.client.get(
+            reverse('posts:profile_follow', args=[author.username])
+        )
+
+    def feed(self, **params):
+        response = self.client.get(reverse('posts:follow_index'), params)
+        return response.context['page_obj']
+
+    def test_follow_and_unfollow(self):
+        """Подписка добавляет посты автора в ленту, отписка убирает."""
+        old_post = Post.objects.create(text=POST_TEXT, author=self.author)
+        self.follow(self.author)
+        self.assertEqual(self.author.stats.follower_count, 1)
+        new_post = Post.objects.create(text=POST_TEXT, author=self.author)
+        Post.objects.create(text=POST_TEXT, author=self.star)
+        self.assertEqual(list(self.feed()), [new_post, old_post])
+        self.client.get(
+            reverse('posts:profile_unfollow', args=[AUTHOR_USERNAME])
+        )
+        self.assertEqual(list(self.feed()), [])
+        self.assertFalse(TimelineEntry.objects.exists())
+
+    def test_cannot_follow_self(self):
+        self.follow(self.user)
+        self.assertFalse(Follow.objects.exists())
+
+    def test_profile_shows_follow_state(self):
+        url = reverse('posts:profile', args=[AUTHOR_USERNAME])
+        self.assertFalse(self.client.get(url).context['following'])
+        self.follow(self.author)
+        self.assertTrue(self.client.get(url).context['following'])
+
+    @override_settings(FOLLOW_FANOUT_LIMIT=1)
+    def test_popular_authors_merged_at_read_time(self):
+        """Посты автора без раскладки подмешиваются в ленту по порядку."""
+        other = User.objects.create_user(username='Other')
+        Follow.objects.create(user=other, author=self.star)
+        self.follow(self.star)
+        self.follow(self.author)
+        posts = [
+            Post.objects.create(
+                text=POST_TEXT, author=(self.star, self.author)[i % 2]
+            )
+            for i in range(settings.POST_COUNT + 5)
+        ]
+        self.assertFalse(
+            TimelineEntry.objects.filter(author=self.star).exists()
+        )
+        posts.reverse()
+        first = self.feed()
+        self.assertEqual(list(first), posts[:settings.POST_COUNT])
+        second = self.feed(after=first.next_cursor)
+        self.assertEqual(list(second), posts[settings.POST_COUNT:])
+        self.assertFalse(second.has_next())
+        back = self.feed(before=second.previous_cursor)
+        self.assertEqual(list(back), posts[:settings.POST_COUNT])
+
+    @override_settings(FOLLOW_FANOUT_BATCH_SIZE=2)
+    def test_fan_out_in_batches(self):
+        """Пост раскладывается всем подписчикам пачками."""
+        readers = [
+            User.objects.create_user(username=f'reader{i}') for i in range(5)
+        ]
+        Follow.objects.bulk_create(
+            [Follow(user=reader, author=self.author) for reader in readers]
+        )
+        AuthorStats.objects.filter(author=self.author).update(
+            follower_count=len(readers)
+        )
+        post = Post.objects.create(text=POST_TEXT, author=self.author)
+        self.assertEqual(
+            set(post.timeline_entries.values_list('user', flat=True)),
+            {reader.pk for reader in readers}
+        )
+
+    def test_feed_requires_login(self):
+        response = Client().get(reverse('posts:follow_index'))
+        self.assertRedirects(
+            response,
+            reverse('users:login') + '?next=' + reverse('posts:follow_index')
+        )
@@ -0,0 +1,114 @@
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from .. import checks, view_counts
+from ..models import Post, PostViewCount, User
+
+USER_USERNAME = 'Anonimus'
+POST_TEXT = 'Тестовая запись для тестового поста номер'
+
+
+@override_settings(POSTS_VIEW_COUNTER='memory', POSTS_VIEW_FLUSH_INTERVAL=0)
+class ViewCounterTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=USER_USERNAME)
+        cls.post = Post.objects.create(author=cls.user, text=POST_TEXT)
+        cls.url = reverse('posts:post_detail', args=[cls.post.pk])
+
+    def setUp(self):
+        cache.clear()
+        view_counts._counters.clear()
+        view_counts._started = False
+        patcher = mock.patch.object(view_counts, 'atexit')
+        self.atexit = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def views(self):
+        return PostViewCount.objects.get(post=self.post).count
+
+    def test_views_are_written_in_one_query(self):
+        for _ in range(3):
+            self.client.get(self.url)
+        self.assertFalse(PostViewCount.objects.exists())
+        with self.assertNumQueries(1):
+            self.assertEqual(view_counts.flush(), 3)
+        self.client.get(self.url)
+        view_counts.flush()
+        self.assertEqual(self.views(), 4)
+        response = self.client.get(self.url)
+        self.assertContains(response, 'Просмотров: 4')
+
+    @override_settings(POSTS_VIEW_COUNTER='cache')
+    def test_cache_counter(self):
+        """Команда в отдельном процессе сбрасывает просмотры из кэша."""
+        self.client.get(self.url)
+        self.client.get(self.url)
+        # Процесс команды ничего не знает о счётчиках веб-процессов.
+        view_counts._counters.clear()
+        call_command('flush_post_views', stdout=StringIO())
+        self.assertEqual(self.views(), 2)
+        self.assertEqual(view_counts.flush(), 0)
+        self.client.get(self.url)
+        view_counts._counters.clear()
+        self.assertEqual(view_counts.flush(), 1)
+        self.assertEqual(self.views(), 3)
+
+    @override_settings(POSTS_VIEW_COUNTER='cache')
+    def test_cache_journal_per_bucket(self):
+        """Пост попадает в журнал корзины один раз, старые корзины
+        при следующем сбросе не перечитываются."""
+        now = [1000.0]
+        counter = view_counts.CacheCounter(clock=lambda: now[0])
+        for _ in range(3):
+            counter.add(self.post.pk)
+        bucket = counter.bucket()
+        self.assertEqual(cache.get(view_counts.JOURNAL_KEY.format(bucket)), 1)
+        self.assertEqual(counter.take(), {self.post.pk: 3})
+        now[0] += view_counts.JOURNAL_SECONDS
+        counter.add(self.post.pk)
+        self.assertEqual(counter.take(), {self.post.pk: 1})
+        self.assertEqual(cache.get(view_counts.FLUSHED_KEY), bucket)
+
+    def test_flush_at_exit_without_thread(self):
+        """При POSTS_VIEW_FLUSH_INTERVAL = 0 остаток сливается при выходе."""
+        self.client.get(self.url)
+        self.client.get(self.url)
+        self.atexit.register.assert_called_once_with(view_counts.flush)
+
+    def test_deleted_post_is_skipped(self):
+        post = Post.objects.create(author=self.user, text=POST_TEXT)
+        view_counts.record(post.pk)
+        view_counts.record(self.post.pk)
+        post.delete()
+        view_counts.flush()
+        self.assertEqual(
+            list(PostViewCount.objects.values_list('post', 'count')),
+            [(self.post.pk, 1)]
+        )
+
+    @override_settings(POSTS_VIEW_COUNTER=None)
+    def test_counter_is_off_by_default(self):
+        self.client.get(self.url)
+        self.assertEqual(view_counts._counters, {})
+
+    @override_settings(POSTS_VIEW_COUNTER='cache')
+    def test_evicting_cache_is_rejected(self):
+        """Режим 'cache' не принимает кэш, который вытесняет ключи."""
+        errors = checks.check_view_counter_cache(None)
+        self.assertEqual([error.id for error in errors], ['posts.E001'])
+        with override_settings(
+            CACHES={
+                'default': settings.CACHES['default'],
+                'views': {'BACKEND': 'django_redis.cache.RedisCache'},
+            },
+            POSTS_VIEW_CACHE='views',
+        ):
+            self.assertEqual(checks.check_view_counter_cache(None), [])
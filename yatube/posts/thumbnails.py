@@ -0,0 +1,32 @@
+"""Заранее подготовленные миниатюры картинок постов.
+
+Шаблоны вызывают {% thumbnail %} лениво, и первый читатель поста
+платит за декодирование и масштабирование картинки. Здесь миниатюры
+всех размеров из POST_THUMBNAIL_GEOMETRIES строятся сразу после
+сохранения поста, а для старых постов есть команда
+generate_thumbnails.
+"""
+from django.conf import settings
+from sorl.thumbnail import get_thumbnail
+
+from .models import Post
+
+
+def generate(image):
+    """Строит миниатюры всех настроенных размеров для картинки."""
+    for geometry, options in settings.POST_THUMBNAIL_GEOMETRIES:
+        get_thumbnail(image, geometry, **options)
+
+
+def generate_for_posts(post_ids):
+    """Строит миниатюры для постов; возвращает (готово, ошибки)."""
+    done = failed = 0
+    posts = Post.objects.filter(pk__in=post_ids).exclude(image='')
+    for post in posts.only('pk', 'image'):
+        try:
+            generate(post.image)
+        except Exception:
+            failed += 1
+        else:
+            done += 1
+    return done, failed
@@ -0,0 +1,158 @@
+"""Лента подписок с раскладкой постов при публикации.
+
+Новый пост сразу записывается в TimelineEntry каждого подписчика
+автора пачками по FOLLOW_FANOUT_BATCH_SIZE, и лента /follow/ читается
+по одному индексу (user, pub_date, post) курсорной пагинацией.
+
+У авторов, чьих подписчиков больше FOLLOW_FANOUT_LIMIT, посты не
+раскладываются: одна публикация стоила бы миллиона вставок. Их посты
+TimelinePaginator подмешивает при чтении тем же курсором.
+"""
+from itertools import islice
+
+from django.conf import settings
+from django.db import connection
+from django.utils.functional import cached_property
+
+from .models import AuthorStats, Follow, Post, TimelineEntry
+from .paginators import KeysetPaginator
+
+# Ленте хватает выдержки: полный текст и его HTML не загружаются.
+DEFERRED_FIELDS = ('text', 'text_html')
+
+
+def _batches(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def is_fanned_out(follower_count):
+    return follower_count <= settings.FOLLOW_FANOUT_LIMIT
+
+
+def fan_out(post, follower_count):
+    """Раскладывает пост по лентам подписчиков; возвращает их число."""
+    if not is_fanned_out(follower_count):
+        return 0
+    followers = (
+        Follow.objects.filter(author_id=post.author_id)
+        .order_by('user_id').values_list('user_id', flat=True)
+    )
+    added = 0
+    for batch in _batches(
+        followers.iterator(), settings.FOLLOW_FANOUT_BATCH_SIZE
+    ):
+        TimelineEntry.objects.bulk_create(
+            [TimelineEntry(user_id=user_id, post_id=post.pk,
+                           author_id=post.author_id, pub_date=post.pub_date)
+             for user_id in batch],
+            ignore_conflicts=True
+        )
+        added += len(batch)
+    return added
+
+
+def fan_out_after(after_pk, until_pk):
+    """Раскладывает одним запросом посты с id в (after_pk, until_pk].
+
+    Для загрузки в обход сигналов (import_posts). Посты, сохранённые
+    за это время через сайт, сигнал уже разложил: их записи
+    пропускаются.
+    """
+    table = TimelineEntry._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {table} '
+            f'(user_id, post_id, author_id, pub_date) '
+            f'SELECT f.user_id, p.id, p.author_id, p.pub_date '
+            f'FROM {Post._meta.db_table} p '
+            f'JOIN {Follow._meta.db_table} f ON f.author_id = p.author_id '
+            f'LEFT JOIN {AuthorStats._meta.db_table} s '
+            f'ON s.author_id = p.author_id '
+            f'WHERE p.id > %s AND p.id <= %s '
+            f'AND COALESCE(s.follower_count, 0) <= %s '
+            f'AND NOT EXISTS (SELECT 1 FROM {table} t '
+            f'WHERE t.user_id = f.user_id AND t.post_id = p.id)',
+            [after_pk, until_pk, settings.FOLLOW_FANOUT_LIMIT]
+        )
+        return cursor.rowcount
+
+
+def backfill(user_id, author_id, follower_count):
+    """Добавляет в ленту нового подписчика последние посты автора."""
+    if not is_fanned_out(follower_count):
+        return
+    posts = (
+        Post.objects.filter(author_id=author_id)
+        .order_by('-pub_date', '-id')
+        .values_list('pk', 'pub_date')[:settings.FOLLOW_BACKFILL]
+    )
+    TimelineEntry.objects.bulk_create(
+        [TimelineEntry(user_id=user_id, post_id=post_id,
+                       author_id=author_id, pub_date=pub_date)
+         for post_id, pub_date in posts],
+        ignore_conflicts=True
+    )
+
+
+def remove(user_id, author_id):
+    TimelineEntry.objects.filter(
+        user_id=user_id, author_id=author_id
+    ).delete()
+
+
+class TimelinePaginator(KeysetPaginator):
+    """Курсорная пагинация ленты подписок пользователя.
+
+    Страница собирается из записей TimelineEntry и постов авторов
+    без раскладки, выбранных тем же курсором; курсор у обоих
+    источников — (pub_date, id поста).
+    """
+
+    def __init__(self, user, per_page):
+        super().__init__(
+            TimelineEntry.objects.filter(user=user).select_related(
+                'post__author', 'post__group'
+            ).defer(*(f'post__{field}' for field in DEFERRED_FIELDS)),
+            per_page,
+            fields=('pub_date', 'post_id'),
+        )
+        self.cursor_fields = ('pub_date', 'id')
+        self.user = user
+
+    @cached_property
+    def merged_authors(self):
+        return list(
+            Follow.objects.filter(
+                user=self.user,
+                author__stats__follower_count__gt=(
+                    settings.FOLLOW_FANOUT_LIMIT
+                ),
+            ).values_list('author_id', flat=True)
+        )
+
+    def fetch(self, cursor, newer, limit):
+        posts = {
+            entry.post_id: entry.post
+            for entry in super().fetch(cursor, newer, limit)
+        }
+        if self.merged_authors:
+            merged = KeysetPaginator(
+                Post.objects.filter(author__in=self.merged_authors)
+                .select_related('author', 'group').defer(*DEFERRED_FIELDS),
+                self.per_page
+            )
+            for post in merged.fetch(cursor, newer, limit):
+                posts.setdefault(post.pk, post)
+        # Берём limit ближайших к курсору постов из обоих источников.
+        ordered = sorted(
+            posts.values(), key=lambda post: (post.pub_date, post.pk),
+            reverse=not newer
+        )[:limit]
+        if newer:
+            ordered.reverse()
+        return ordered
@@ -7,8 +7,21 @@ app_name = 'posts'
 urlpatterns = [
     path('', views.index, name='index'),
     path('profile/<str:username>/', views.profile, name='profile'),
+    path(
+        'profile/<str:username>/follow/',
+        views.profile_follow,
+        name='profile_follow'
+    ),
+    path(
+        'profile/<str:username>/unfollow/',
+        views.profile_unfollow,
+        name='profile_unfollow'
+    ),
     path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
     path('create/', views.post_create, name='post_create'),
     path('posts/<post_id>/edit/', views.post_edit, name='post_edit'),
     path('group/<slug:slug>/', views.group_posts, name='group_list'),
+    path('search/', views.search_posts, name='search'),
+    path('popular/', views.popular, name='popular'),
+    path('follow/', views.follow_index, name='follow_index'),
 ]
@@ -0,0 +1,226 @@
+"""Счётчик просмотров постов с отложенной записью в базу.
+
+post_detail не пишет в базу на каждый просмотр: приращения копятся
+в памяти процесса (POSTS_VIEW_COUNTER = 'memory') или в общем кэше
+('cache'), а фоновый поток раз в POSTS_VIEW_FLUSH_INTERVAL секунд
+сливает их в PostViewCount одним INSERT ... ON CONFLICT DO UPDATE.
+При штатной остановке процесса накопленное сливается через atexit;
+команда flush_post_views делает то же вручную или по расписанию.
+Ответы 304 при POSTS_CONDITIONAL_GET представление не вызывают
+и просмотром не считаются.
+
+В режиме 'cache' приращения живут в кэше POSTS_VIEW_CACHE и переживают
+падение процесса. Кэш для этого должен быть общим и не вытеснять ключи
+(Redis с maxmemory-policy noeviction): LocMem, файловый кэш, кэш в базе
+и Memcached при переполнении молча выбрасывают ключи вместе
+с просмотрами, поэтому проверка posts.E001 их не принимает. Какие
+посты ждут сброса,
+тоже знает кэш: первый просмотр поста в корзине из JOURNAL_SECONDS
+секунд записывает его id в журнал этой корзины. Сброс читает журналы
+корзин с прошлого сброса, поэтому flush_post_views в отдельном
+процессе видит просмотры, накопленные веб-процессами. Приращение
+забирается под блокировкой поста: значение читается и вычитается,
+так что параллельные просмотры и сбросы не теряются друг из-за друга
+и не считаются дважды.
+"""
+import atexit
+import logging
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DatabaseError, connection
+from django.utils import timezone
+
+from .models import Post, PostViewCount
+
+logger = logging.getLogger(__name__)
+
+CACHE_KEY = 'posts:views:{}'
+SEEN_KEY = 'posts:views:seen:{}:{}'
+JOURNAL_KEY = 'posts:views:journal:{}'
+SLOT_KEY = 'posts:views:journal:{}:{}'
+LOCK_KEY = 'posts:views:lock:{}'
+FLUSHED_KEY = 'posts:views:flushed'
+JOURNAL_SECONDS = 10
+# Журналы старше суток пропадают: сброс должен успеть раньше.
+JOURNAL_TIMEOUT = 24 * 60 * 60
+LOCK_TIMEOUT = 60
+
+
+def _incr(cache, key, delta=1):
+    try:
+        return cache.incr(key, delta)
+    except ValueError:
+        cache.add(key, 0, None)
+        return cache.incr(key, delta)
+
+
+class MemoryCounter:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = Counter()
+
+    def add(self, post_id, delta=1):
+        with self._lock:
+            self._pending[post_id] += delta
+
+    def take(self):
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+        return pending
+
+
+class CacheCounter:
+    def __init__(self, clock=time.time):
+        self.clock = clock
+
+    @property
+    def cache(self):
+        return caches[settings.POSTS_VIEW_CACHE]
+
+    def bucket(self):
+        return int(self.clock()) // JOURNAL_SECONDS
+
+    def add(self, post_id, delta=1):
+        cache = self.cache
+        _incr(cache, CACHE_KEY.format(post_id), delta)
+        bucket = self.bucket()
+        if cache.add(SEEN_KEY.format(bucket, post_id), 1, JOURNAL_TIMEOUT):
+            slot = _incr(cache, JOURNAL_KEY.format(bucket))
+            cache.set(SLOT_KEY.format(bucket, slot), post_id, JOURNAL_TIMEOUT)
+
+    def pending_ids(self):
+        """Посты из журналов корзин с прошлого сброса."""
+        cache = self.cache
+        current = self.bucket()
+        flushed = cache.get(FLUSHED_KEY)
+        if flushed is None:
+            flushed = current - JOURNAL_TIMEOUT // JOURNAL_SECONDS
+        buckets = range(flushed + 1, current + 1)
+        sizes = cache.get_many([JOURNAL_KEY.format(b) for b in buckets])
+        slots = [
+            SLOT_KEY.format(bucket, slot)
+            for bucket in buckets
+            for slot in range(1, sizes.get(JOURNAL_KEY.format(bucket), 0) + 1)
+        ]
+        # Текущую корзину ещё дописывают: её прочитает и следующий сброс.
+        return set(cache.get_many(slots).values()), current - 1
+
+    def take(self):
+        cache = self.cache
+        post_ids, flushed = self.pending_ids()
+        pending = Counter()
+        for post_id in post_ids:
+            lock = LOCK_KEY.format(post_id)
+            if not cache.add(lock, 1, LOCK_TIMEOUT):
+                # Пост сейчас забирает другой процесс.
+                continue
+            try:
+                key = CACHE_KEY.format(post_id)
+                delta = cache.get(key)
+                if delta:
+                    cache.decr(key, delta)
+                    pending[post_id] = delta
+            finally:
+                cache.delete(lock)
+        cache.set(FLUSHED_KEY, flushed, None)
+        return pending
+
+
+COUNTERS = {'memory': MemoryCounter, 'cache': CacheCounter}
+
+_counters = {}
+_started = False
+_flusher_lock = threading.Lock()
+
+
+def get_counter():
+    mode = settings.POSTS_VIEW_COUNTER
+    if mode not in _counters:
+        _counters[mode] = COUNTERS[mode]()
+    return _counters[mode]
+
+
+def write(deltas):
+    """Добавляет приращения к PostViewCount одним запросом.
+
+    Посты, удалённые до сброса, пропускаются соединением с posts_post.
+    """
+    if not deltas:
+        return
+    values = ', '.join(['(%s, %s)'] * len(deltas))
+    params = [value for item in deltas.items() for value in item]
+    params.append(connection.ops.adapt_datetimefield_value(timezone.now()))
+    table = PostViewCount._meta.db_table
+    with connection.cursor() as cursor:
+        # WHERE 1 нужен SQLite, чтобы ON CONFLICT не принимался за
+        # часть соединения в SELECT.
+        cursor.execute(
+            f'WITH deltas (post_id, delta) AS (VALUES {values}) '
+            f'INSERT INTO {table} (post_id, count, updated) '
+            f'SELECT d.post_id, d.delta, %s FROM deltas d '
+            f'JOIN {Post._meta.db_table} p ON p.id = d.post_id WHERE 1 = 1 '
+            f'ON CONFLICT (post_id) DO UPDATE '
+            f'SET count = {table}.count + excluded.count, '
+            f'updated = excluded.updated',
+            params
+        )
+
+
+def flush():
+    """Сливает накопленные просмотры в базу; возвращает их число."""
+    if settings.POSTS_VIEW_COUNTER:
+        # Журнал 'cache' общий: сбрасывать его можно и из процесса,
+        # который сам просмотров не считал.
+        get_counter()
+    total = 0
+    for counter in list(_counters.values()):
+        deltas = counter.take()
+        try:
+            write(deltas)
+        except DatabaseError:
+            # Вернём приращения, следующий сброс попробует снова.
+            for post_id, delta in deltas.items():
+                counter.add(post_id, delta)
+            logger.exception('Не удалось записать просмотры постов')
+            continue
+        total += sum(deltas.values())
+    return total
+
+
+def _flush_periodically(interval):
+    while True:
+        time.sleep(interval)
+        try:
+            flush()
+        except Exception:
+            logger.exception('Сброс просмотров постов упал')
+        finally:
+            connection.close()
+
+
+def _start_flusher():
+    global _started
+    with _flusher_lock:
+        if _started:
+            return
+        _started = True
+        atexit.register(flush)
+        interval = settings.POSTS_VIEW_FLUSH_INTERVAL
+        if interval:
+            threading.Thread(
+                target=_flush_periodically, args=(interval,), daemon=True,
+                name='post-view-flusher'
+            ).start()
+
+
+def record(post_id):
+    """Засчитывает просмотр поста, если счётчик включён."""
+    if not settings.POSTS_VIEW_COUNTER:
+        return
+    get_counter().add(post_id)
+    if not _started:
+        _start_flusher()
@@ -1,66 +1,177 @@
+from urllib.parse import urlencode
+
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
 from django.shortcuts import render, get_object_or_404, redirect
 from django.core.paginator import Paginator
 
+from . import (
+    conditional, counts, lookups, page_cache, popularity, search, streaming,
+    timeline, view_counts
+)
 from .forms import PostForm
-from .models import Group, Post, User
+from .models import Follow, Post, PostCard
+from .paginators import CachedCountPaginator, KeysetPaginator
+
+
+# Лентам хватает выдержки: полный текст и его HTML не загружаются.
+LIST_DEFERRED_FIELDS = ('text', 'text_html')
+
+
+def index_validators(request):
+    return conditional.feed_validators(
+        request, Post.objects.all(), counts.ALL
+    )
 
-POST_COUNT = 10
+
+def group_validators(request, slug):
+    group = lookups.get_group(slug)
+    return conditional.feed_validators(
+        request, group.posts.all(), counts.group_scope(group.pk)
+    )
+
+
+def profile_validators(request, username):
+    author = lookups.get_author(username)
+    return conditional.feed_validators(
+        request, author.posts.all(), counts.author_scope(author.pk)
+    )
 
 
-def get_page(request, post_list):
-    paginator = Paginator(post_list, POST_COUNT)
+def feed_posts(owner=None, select_related=()):
+    """Посты общей ленты или ленты owner — группы либо автора.
+
+    С POSTS_CARD_FEEDS вместо постов отдаются карточки PostCard,
+    которые читаются без соединений.
+    """
+    if settings.POSTS_CARD_FEEDS:
+        cards = PostCard.objects.all()
+        if owner is not None:
+            field = owner.posts.field.name
+            cards = cards.filter(**{f'{field}_id': owner.pk})
+        return cards
+    posts = Post.objects if owner is None else owner.posts
+    return posts.select_related(*select_related).defer(
+        *LIST_DEFERRED_FIELDS
+    )
+
+
+def get_page(request, post_list, scope=counts.ALL):
+    if settings.POSTS_KEYSET_PAGINATION:
+        paginator = KeysetPaginator(
+            post_list, settings.POST_COUNT,
+            fields=('pub_date', post_list.model._meta.pk.attname)
+        )
+        return paginator.get_page(
+            request.GET.get('after'), request.GET.get('before')
+        )
+    if settings.POSTS_COUNT_CACHE:
+        paginator = CachedCountPaginator(
+            post_list, settings.POST_COUNT, scope
+        )
+    else:
+        paginator = Paginator(post_list, settings.POST_COUNT)
     page_number = request.GET.get('page')
     return paginator.get_page(page_number)
 
 
+@conditional.conditional_page(index_validators)
+@page_cache.cache_anonymous_page(page_cache.global_scope)
 def index(request):
-    post_list = Post.objects.all().select_related('author', 'group')
+    post_list = feed_posts(select_related=('author', 'group'))
     page_obj = get_page(request, post_list)
     template = 'posts/index.html'
     context = {
         'page_obj': page_obj,
+        'show_group': True,
     }
-    return render(request, template, context)
+    return streaming.render_feed(request, template, context)
 
 
+@conditional.conditional_page(group_validators)
+@page_cache.cache_anonymous_page(page_cache.group_scope)
 def group_posts(request, slug):
-    group = get_object_or_404(Group, slug=slug)
-    posts = group.posts.select_related('author')
-    page_obj = get_page(request, posts)
+    group = lookups.get_group(slug)
+    posts = feed_posts(group, ('author',))
+    page_obj = get_page(request, posts, counts.group_scope(group.pk))
     template = 'posts/group_list.html'
     context = {
         'group': group,
         'page_obj': page_obj,
+        'show_group': False,
     }
-    return render(request, template, context)
+    return streaming.render_feed(request, template, context)
 
 
+@conditional.conditional_page(profile_validators)
+@page_cache.cache_anonymous_page(page_cache.author_scope)
 def profile(request, username):
-    author = get_object_or_404(User, username=username)
-    author_posts = author.posts.all()
-    page_obj = get_page(request, author_posts)
+    author = lookups.get_author(username)
+    author_posts = feed_posts(author, ('group',))
+    page_obj = get_page(
+        request, author_posts, counts.author_scope(author.pk)
+    )
+    following = request.user.is_authenticated and Follow.objects.filter(
+        user=request.user, author=author
+    ).exists()
     template = 'posts/profile.html'
     context = {
         'author': author,
-        'page_obj': page_obj
+        'page_obj': page_obj,
+        'following': following,
+        'show_group': True,
     }
-    return render(request, template, context)
+    return streaming.render_feed(request, template, context)
+
+
+def popular(request):
+    paginator = Paginator(popularity.top(), settings.POST_COUNT)
+    page_obj = paginator.get_page(request.GET.get('page'))
+    template = 'posts/popular.html'
+    context = {
+        'page_obj': page_obj,
+        'show_group': True,
+    }
+    return streaming.render_feed(request, template, context)
 
 
+@conditional.conditional_page(conditional.post_validators)
 def post_detail(request, post_id):
     post = get_object_or_404(
-        Post.objects.select_related('author', 'group'), id=post_id
+        Post.objects.select_related(
+            'author__stats', 'group', 'view_count'
+        ).defer('text'),
+        id=post_id
     )
+    view_counts.record(post.pk)
     template = 'posts/post_detail.html'
     context = {'post': post}
     return render(request, template, context)
 
 
+def search_posts(request):
+    query = request.GET.get('q', '').strip()
+    results = search.SearchResults(
+        query,
+        Post.objects.select_related('author', 'group').defer(
+            *LIST_DEFERRED_FIELDS
+        )
+    )
+    paginator = Paginator(results, settings.POST_COUNT)
+    page_obj = paginator.get_page(request.GET.get('page'))
+    template = 'posts/search.html'
+    context = {
+        'query': query,
+        'page_obj': page_obj,
+        'page_query': urlencode({'q': query}) + '&',
+    }
+    return render(request, template, context)
+
+
 @login_required
 def post_create(request):
     template = 'posts/create_post.html'
-    form = PostForm(request.POST or None)
+    form = PostForm(request.POST or None, files=request.FILES or None)
     context = {'form': form}
     if not form.is_valid():
         return render(request, template, context)
@@ -81,7 +192,7 @@ def post_edit(request, post_id):
     form = PostForm(request.POST or None,
                     files=request.FILES or None,
                     instance=post)
-    if not form.is_valid():
+    if form.is_valid():
         form.save()
         return redirect('posts:post_detail', post_id)
     context = {
@@ -91,3 +202,31 @@ def post_edit(request, post_id):
     }
     template = 'posts/create_post.html'
     return render(request, template, context)
+
+
+@login_required
+def follow_index(request):
+    paginator = timeline.TimelinePaginator(request.user, settings.POST_COUNT)
+    page_obj = paginator.get_page(
+        request.GET.get('after'), request.GET.get('before')
+    )
+    template = 'posts/follow.html'
+    context = {
+        'page_obj': page_obj,
+    }
+    return render(request, template, context)
+
+
+@login_required
+def profile_follow(request, username):
+    author = lookups.get_author(username)
+    if author != request.user:
+        Follow.objects.get_or_create(user=request.user, author=author)
+    return redirect('posts:profile', username)
+
+
+@login_required
+def profile_unfollow(request, username):
+    author = lookups.get_author(username)
+    Follow.objects.filter(user=request.user, author=author).delete()
+    return redirect('posts:profile', username)
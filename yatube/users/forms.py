@@ -1,10 +1,43 @@
-from django.contrib.auth.forms import UserCreationForm
+from django.contrib.auth.forms import PasswordResetForm, UserCreationForm
 from django.contrib.auth import get_user_model
 
+from .tasks import send_password_reset
+
 User = get_user_model()
 
+# Поля контекста письма, которые обработчик строит сам.
+RESET_CONTEXT_FIELDS = (
+    'email', 'domain', 'site_name', 'uid', 'user', 'token', 'protocol'
+)
+
 
 class CreationForm(UserCreationForm):
     class Meta(UserCreationForm.Meta):
         model = User
         fields = ('first_name', 'last_name', 'username', 'email')
+
+
+class QueuedPasswordResetForm(PasswordResetForm):
+    """Письмо для сброса пароля уходит через очередь jobs.
+
+    В задачу попадает только id пользователя: ссылку с токеном
+    собирает обработчик (users.tasks.send_password_reset).
+    """
+
+    def send_mail(self, subject_template_name, email_template_name,
+                  context, from_email, to_email,
+                  html_email_template_name=None):
+        send_password_reset.enqueue(
+            user_id=context['user'].pk,
+            from_email=from_email,
+            domain=context['domain'],
+            site_name=context['site_name'],
+            protocol=context['protocol'],
+            subject_template_name=subject_template_name,
+            email_template_name=email_template_name,
+            html_email_template_name=html_email_template_name,
+            extra_context={
+                key: value for key, value in context.items()
+                if key not in RESET_CONTEXT_FIELDS
+            },
+        )
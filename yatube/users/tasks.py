@@ -0,0 +1,51 @@
+"""Письмо для сброса пароля, которое собирает обработчик очереди.
+
+В очередь кладутся только id пользователя и параметры шаблонов:
+ссылка со сбросом пароля в Job.payload не попадает и не видна
+в админке задач. Токен строится при отправке default_token_generator,
+поэтому он действует столько же, сколько при синхронной отправке.
+Адрес берётся из пользователя, а не из задачи: правка задачи в админке
+не отправит ссылку на чужой ящик.
+"""
+from django.contrib.auth import get_user_model
+from django.contrib.auth.tokens import default_token_generator
+from django.template import loader
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+
+from jobs.queue import task
+from jobs.tasks import send_email
+
+User = get_user_model()
+
+
+@task(name='users.send_password_reset')
+def send_password_reset(user_id, from_email, domain, site_name, protocol,
+                        subject_template_name, email_template_name,
+                        html_email_template_name=None, extra_context=None):
+    user = User.objects.filter(pk=user_id, is_active=True).first()
+    if user is None or not user.email:
+        return
+    context = {
+        'email': user.email,
+        'domain': domain,
+        'site_name': site_name,
+        'uid': urlsafe_base64_encode(force_bytes(user.pk)),
+        'user': user,
+        'token': default_token_generator.make_token(user),
+        'protocol': protocol,
+        **(extra_context or {}),
+    }
+    subject = loader.render_to_string(subject_template_name, context)
+    html = None
+    if html_email_template_name is not None:
+        html = loader.render_to_string(html_email_template_name, context)
+    [error] = send_email([{
+        'subject': ''.join(subject.splitlines()),
+        'body': loader.render_to_string(email_template_name, context),
+        'from_email': from_email,
+        'to': [user.email],
+        'html': html,
+    }])
+    if error is not None:
+        raise error
@@ -0,0 +1,45 @@
+from http import HTTPStatus
+
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from core.testing import max_queries
+
+from ..forms import User
+
+
+class UsersQueryBudgetTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Anonimus')
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_guest_pages(self):
+        budgets = {
+            reverse('users:signup'): 0,
+            reverse('users:login'): 0,
+            reverse('users:password_reset'): 0,
+            reverse('users:password_reset_done'): 0,
+            reverse('users:password_reset_confirm',
+                    args=['MQ', 'bad-token']): 1,
+            reverse('users:password_reset_complete'): 0,
+        }
+        for url, budget in budgets.items():
+            with self.subTest(url=url), max_queries(budget):
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_authorized_pages(self):
+        budgets = {
+            reverse('users:password_change'): 2,
+            reverse('users:password_change_done'): 2,
+            reverse('users:logout'): 4,
+        }
+        for url, budget in budgets.items():
+            with self.subTest(url=url), max_queries(budget):
+                response = self.authorized_client.get(url)
+            self.assertEqual(response.status_code, HTTPStatus.OK)
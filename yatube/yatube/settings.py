@@ -40,6 +40,7 @@ INSTALLED_APPS = [
     'core.apps.CoreConfig',
     'users.apps.UsersConfig',
     'posts.apps.PostsConfig',
+    'jobs.apps.JobsConfig',
     'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
@@ -50,6 +51,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.MetricsMiddleware',
+    'core.middleware.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -65,7 +68,7 @@ TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'core.template_backends.TimedDjangoTemplates',
         'DIRS': [TEMPLATES_DIR],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -93,6 +96,48 @@ DATABASES = {
     }
 }
 
+# Прагмы SQLite для каждого нового соединения (core/signals.py).
+# Боевой профиль: WAL, чтобы запись не блокировала читателей,
+# synchronous=NORMAL (в WAL это безопасно при падении процесса),
+# чтение через mmap, кэш страниц 64 МБ на соединение и ожидание
+# блокировки вместо мгновенной ошибки «database is locked».
+SQLITE_PRODUCTION_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,
+    'busy_timeout': 5000,
+    'temp_store': 'MEMORY',
+}
+SQLITE_PRAGMAS = {}
+# YATUBE_DB_PROFILE=production включает боевой профиль и держит
+# соединения открытыми между запросами
+if os.environ.get('YATUBE_DB_PROFILE') == 'production':
+    SQLITE_PRAGMAS = SQLITE_PRODUCTION_PRAGMAS
+    DATABASES['default']['CONN_MAX_AGE'] = 600
+
+# Реплика для чтения. Локально её заменяет второй файл SQLite:
+# YATUBE_REPLICA_DB=replica.sqlite3 \
+#     python manage.py test core.tests.TwoDatabasesTest
+if os.environ.get('YATUBE_REPLICA_DB'):
+    DATABASES['replica'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ['YATUBE_REPLICA_DB'],
+        'TEST': {'NAME': os.environ['YATUBE_REPLICA_DB'] + '.test'},
+    }
+# Алиасы из DATABASES, с которых читают ленты и страницы постов
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+DATABASE_ROUTERS = ['core.routers.PrimaryReplicaRouter']
+# Сколько секунд после записи браузер читает с основной базы
+REPLICA_PIN_SECONDS = 15
+
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
@@ -140,8 +185,100 @@ LOGIN_REDIRECT_URL = 'posts:index'
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 # указываем директорию, в которую будут складываться файлы писем
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
+# Бэкенд, через который обработчик очереди отправляет письма
+# из jobs.tasks.send_email
+JOBS_EMAIL_BACKEND = EMAIL_BACKEND
 
 CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+
+# Количество постов на странице ленты
+POST_COUNT = 10
+# Курсорная пагинация (?after=/?before=) вместо номеров страниц:
+# без COUNT(*) и OFFSET, страница стоит одинаково на любой глубине
+POSTS_KEYSET_PAGINATION = False
+# Брать количество постов для Paginator из кэша (posts.counts),
+# а не считать COUNT(*) на каждый запрос
+POSTS_COUNT_CACHE = False
+POSTS_COUNT_CACHE_TIMEOUT = 60 * 60 * 24
+# Выше этого порога точное количество не считается: лента листается
+# дальше без номера последней страницы. None — считать точно
+POSTS_COUNT_APPROXIMATE_THRESHOLD = None
+# Порог подсчёта строк в отфильтрованном списке постов админки
+# (posts.paginators.EstimatedCountPaginator); всегда задан, чтобы
+# фильтр или поиск по большой таблице не считали её целиком
+POSTS_ADMIN_COUNT_THRESHOLD = 10000
+# Кэш целых страниц лент для анонимных читателей (posts.page_cache)
+POSTS_PAGE_CACHE = False
+POSTS_PAGE_CACHE_TIMEOUT = 60 * 10
+# Кэш групп по slug и авторов по username в памяти процесса
+# (posts.lookups). С POSTS_LOOKUP_SHARED_CACHE промахи сначала ищутся
+# в общем кэше Django
+POSTS_LOOKUP_CACHE = False
+POSTS_LOOKUP_CACHE_SIZE = 1000
+POSTS_LOOKUP_CACHE_TTL = 60
+POSTS_LOOKUP_SHARED_CACHE = False
+# Общая лента, группы и профили читают карточки PostCard без
+# соединений (posts.cards). Перед включением заполните таблицу:
+# python manage.py rebuild_post_cards
+POSTS_CARD_FEEDS = False
+# Ленты отдаются потоком (posts.streaming): шапка страницы уходит
+# до запроса постов, карточки — по мере чтения строк
+POSTS_STREAMING_FEEDS = False
+# Счётчик просмотров постов (posts.view_counts): None — выключен,
+# 'memory' — приращения копятся в процессе, 'cache' — в общем кэше
+# POSTS_VIEW_CACHE, который не вытесняет ключи (проверка posts.E001).
+# В базу они сливаются раз в POSTS_VIEW_FLUSH_INTERVAL секунд
+# (0 — только командой flush_post_views и при остановке)
+POSTS_VIEW_COUNTER = None
+POSTS_VIEW_CACHE = 'default'
+POSTS_VIEW_FLUSH_INTERVAL = 10
+# Рейтинг популярных постов (posts.popularity): сколько секунд
+# свежести стоят e-кратного числа просмотров, вес активности группы
+# и окно в секундах, за которое она считается
+POSTS_POPULAR_RECENCY = 60 * 60 * 12
+POSTS_POPULAR_GROUP_WEIGHT = 0.5
+POSTS_POPULAR_GROUP_WINDOW = 60 * 60 * 24 * 7
+# Сколько постов в ленте /popular/ и в блоке на странице поста
+# (0 — блок не показывается); пересчёт через очередь jobs раз
+# в POSTS_POPULAR_REFRESH_INTERVAL секунд (0 — только командой)
+POSTS_POPULAR_LIMIT = 100
+POSTS_POPULAR_SIDEBAR = 0
+POSTS_POPULAR_REFRESH_INTERVAL = 60 * 5
+# ETag/Last-Modified и ответ 304 для лент и страницы поста
+# (posts.conditional). Нужен общий для процессов кэш default
+# (проверка posts.E002)
+POSTS_CONDITIONAL_GET = False
+# Миниатюры картинок постов строятся сразу после сохранения.
+# Размеры должны совпадать с {% thumbnail %} в шаблонах.
+POSTS_EAGER_THUMBNAILS = True
+POST_THUMBNAIL_GEOMETRIES = (
+    ('960x339', {'crop': 'center', 'upscale': True}),
+)
+# Лента подписок (posts.timeline). Посты авторов, у которых больше
+# FOLLOW_FANOUT_LIMIT подписчиков, не раскладываются по лентам,
+# а подмешиваются при чтении
+FOLLOW_FANOUT_LIMIT = 10000
+FOLLOW_FANOUT_BATCH_SIZE = 1000
+# Сколько последних постов автора попадает в ленту при подписке
+FOLLOW_BACKFILL = 100
+# Очередь отложенных задач (jobs.queue) и обработчик run_worker
+JOBS_WORKER_THREADS = 2
+# Сколько задач обработчик забирает за раз
+JOBS_BATCH_SIZE = 20
+# Пауза между опросами пустой очереди, секунды
+JOBS_POLL_INTERVAL = 1
+JOBS_MAX_ATTEMPTS = 5
+# Задержка перед повтором удваивается с каждой попыткой
+JOBS_RETRY_DELAY = 30
+JOBS_RETRY_MAX_DELAY = 60 * 60
+# Задача в running дольше этого времени считается брошенной
+JOBS_LOCK_TIMEOUT = 60 * 10
+# Метрики запросов в памяти процесса и страница /metrics/ (core.metrics)
+METRICS_ENABLED = True
+# Адреса, которым /metrics/ доступна без входа staff. За обратным
+# прокси на той же машине все запросы приходят с 127.0.0.1, поэтому
+# по умолчанию список пуст
+METRICS_ALLOWED_IPS = ()